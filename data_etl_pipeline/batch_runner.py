@@ -0,0 +1,260 @@
+"""
+Offline batch ETL runner for a ticker universe.
+
+Fans per-ticker extraction and RDF generation out over a process pool and
+writes a JSON checkpoint per ticker, so a rerun after a crash or a rate-limit
+stop resumes with the tickers that have not finished.
+
+Usage:
+    python -m data_etl_pipeline.batch_runner AAPL MSFT GOOG --years 5 --workers 4
+    python -m data_etl_pipeline.batch_runner --tickers-file universe.txt --output-dir rdf_data
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+DEFAULT_OUTPUT_DIR = "rdf_data"
+DEFAULT_CHECKPOINT_DIR = os.path.join("rdf_data", "checkpoints")
+
+RATE_LIMIT_MARKERS = ("429", "too many requests", "rate limit")
+
+# Articles already appended to a {ticker}_news.nt file in the output directory
+INGEST_INDEX_NAME = "ingest_index.sqlite3"
+
+
+def _write_json_atomic(path, data):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as handle:
+        json.dump(data, handle, indent=2, default=str)
+    os.replace(tmp_path, path)
+
+
+def checkpoint_path(checkpoint_dir, ticker, years):
+    return os.path.join(checkpoint_dir, f"{ticker}_{years}y.json")
+
+
+def load_checkpoint(checkpoint_dir, ticker, years):
+    path = checkpoint_path(checkpoint_dir, ticker, years)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def process_ticker(ticker, years, output_dir):
+    """
+    Extracts and generates RDF for one ticker (runs in a worker process).
+
+    Writes the same {ticker}_{years}y.ttl (plus price sidecar) that
+    /rdf-stock-data serves, and a {ticker}_linked.ttl built with
+    create_rdf_graph_with_links. Recent news articles not seen in an earlier
+    run are appended to {ticker}_news.nt and then recorded in the output
+    directory's SeenIndex; a failed news fetch is reported but does not fail
+    the ticker.
+
+    Returns:
+        dict: Per-ticker stats for the checkpoint.
+    """
+    from data_etl_pipeline.data_extraction import (
+        StockPriceExtractor, YahooFinanceExtractor, financial_metrics, recent_news_articles
+    )
+    from rdflib.namespace import RDF
+
+    from data_etl_pipeline.data_transformation import (
+        VILCORP, create_rdf_graph, create_rdf_graph_with_links, mark_news_ingested
+    )
+    from data_etl_pipeline.generate_rdf import build_stock_graph
+    from data_etl_pipeline.ingest_index import SeenIndex
+    from data_etl_pipeline.price_sidecar import PriceSidecar, sidecar_path_for
+    from data_etl_pipeline.streaming_pipeline import NTriplesFileSink, clean_articles, score_sentiment
+
+    start = time.perf_counter()
+    try:
+        # Info and history are fetched once, uncaught, and shared by both graphs,
+        # so rate-limit errors reach the handler below instead of being swallowed
+        info = YahooFinanceExtractor(ticker).get_info()
+        stock_prices = StockPriceExtractor(ticker, None, None).fetch_price_series(period=f"{years}y")
+        company_name = info.get("longName", ticker)
+
+        rdf_path = os.path.join(output_dir, f"{ticker}_{years}y.ttl")
+        rdf_graph = build_stock_graph(ticker, stock_prices, info)
+        rdf_graph.serialize(destination=rdf_path, format="turtle")
+        PriceSidecar.from_series(stock_prices).save(sidecar_path_for(rdf_path))
+
+        linked_graph = create_rdf_graph_with_links(
+            stock_prices,
+            None,
+            [{"metricName": name, "metricValue": value} for name, value in financial_metrics(info).items() if value is not None],
+            None,
+            company_name,
+            ticker=ticker,
+        )
+        linked_path = os.path.join(output_dir, f"{ticker}_linked.ttl")
+        linked_graph.serialize(destination=linked_path, format="turtle")
+
+        result = {
+            "status": "done",
+            "rdf_file": rdf_path,
+            "linked_file": linked_path,
+            "price_bars": len(stock_prices),
+            "triples": len(rdf_graph) + len(linked_graph),
+        }
+        try:
+            articles = list(score_sentiment(clean_articles(recent_news_articles(company_name), company_name)))
+        except Exception as e:
+            result["news_error"] = str(e)
+        else:
+            seen_index = SeenIndex(os.path.join(output_dir, INGEST_INDEX_NAME))
+            try:
+                news_graph = create_rdf_graph(None, articles, None, None, company_name, ticker=ticker, seen_index=seen_index)
+                news_path = os.path.join(output_dir, f"{ticker}_news.nt")
+                if (None, RDF.type, VILCORP.NewsArticle) in news_graph:
+                    # Appended rather than rewritten: earlier runs' articles are skipped above
+                    sink = NTriplesFileSink(news_path)
+                    try:
+                        sink.write(news_graph)
+                        sink.flush()
+                    finally:
+                        sink.close()
+                    result["triples"] += len(news_graph)
+                result["news_file"] = news_path
+                result["news_articles"] = mark_news_ingested(seen_index, news_graph, company_name, ticker)
+            finally:
+                seen_index.close()
+
+        result["seconds"] = round(time.perf_counter() - start, 3)
+        return result
+    except Exception as e:
+        message = str(e)
+        rate_limited = "RateLimit" in type(e).__name__ or any(marker in message.lower() for marker in RATE_LIMIT_MARKERS)
+        return {
+            "status": "rate_limited" if rate_limited else "failed",
+            "error": message,
+            "seconds": round(time.perf_counter() - start, 3),
+        }
+
+
+def run_batch(tickers, years=5, output_dir=DEFAULT_OUTPUT_DIR, checkpoint_dir=DEFAULT_CHECKPOINT_DIR,
+              max_workers=None, retry_failed=False, progress_every=10):
+    """
+    Runs process_ticker over a ticker list, skipping tickers already checkpointed as done.
+
+    On a rate-limit error no further tickers are submitted; in-flight ones are
+    allowed to finish and the run stops so it can be resumed later.
+
+    Returns:
+        dict: Progress summary with counts and throughput.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    os.makedirs(checkpoint_dir, exist_ok=True)
+
+    tickers = list(dict.fromkeys(ticker.strip().upper() for ticker in tickers if ticker.strip()))
+    pending = []
+    skipped = 0
+    for ticker in tickers:
+        checkpoint = load_checkpoint(checkpoint_dir, ticker, years)
+        if checkpoint and (checkpoint["status"] == "done" or (checkpoint["status"] == "failed" and not retry_failed)):
+            skipped += 1
+            continue
+        pending.append(ticker)
+
+    print(f"Batch run: {len(tickers)} tickers, {skipped} already checkpointed, {len(pending)} to process.")
+
+    counts = {"done": 0, "failed": 0, "rate_limited": 0}
+    triples = 0
+    start = time.perf_counter()
+    stopped = False
+
+    workers = max_workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        queue = iter(pending)
+        in_flight = {}
+
+        def submit_next():
+            ticker = next(queue, None)
+            if ticker is not None:
+                in_flight[executor.submit(process_ticker, ticker, years, output_dir)] = ticker
+
+        for _ in range(workers):
+            submit_next()
+
+        while in_flight:
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                ticker = in_flight.pop(future)
+                result = future.result()
+                result.update({"ticker": ticker, "years": years, "finished_at": time.time()})
+                _write_json_atomic(checkpoint_path(checkpoint_dir, ticker, years), result)
+
+                counts[result["status"]] += 1
+                triples += result.get("triples", 0)
+                if result["status"] == "rate_limited" and not stopped:
+                    stopped = True
+                    print(f"Rate limited on {ticker}; stopping after in-flight tickers finish. Rerun to resume.")
+                elif result["status"] == "failed":
+                    print(f"ERROR {ticker}: {result['error']}")
+
+                completed = sum(counts.values())
+                if completed % progress_every == 0:
+                    elapsed = time.perf_counter() - start
+                    print(f"Progress: {completed}/{len(pending)} tickers, "
+                          f"{completed / elapsed:.2f} tickers/s, {triples / elapsed:.0f} triples/s")
+
+                if not stopped:
+                    submit_next()
+
+    elapsed = time.perf_counter() - start
+    processed = sum(counts.values())
+    summary = {
+        "tickers": len(tickers),
+        "skipped": skipped,
+        "processed": processed,
+        "remaining": len(pending) - processed + counts["rate_limited"],
+        **counts,
+        "triples": triples,
+        "seconds": round(elapsed, 3),
+        "tickers_per_second": round(processed / elapsed, 3) if elapsed > 0 else None,
+        "triples_per_second": round(triples / elapsed, 1) if elapsed > 0 else None,
+        "stopped_on_rate_limit": stopped,
+    }
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch RDF generation for a ticker universe.")
+    parser.add_argument("tickers", nargs="*", help="Tickers to process.")
+    parser.add_argument("--tickers-file", help="File with one ticker per line (or comma-separated).")
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+    parser.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR)
+    parser.add_argument("--checkpoint-dir", default=DEFAULT_CHECKPOINT_DIR)
+    parser.add_argument("--retry-failed", action="store_true", help="Reprocess tickers checkpointed as failed.")
+    args = parser.parse_args(argv)
+
+    tickers = list(args.tickers)
+    if args.tickers_file:
+        with open(args.tickers_file, encoding="utf-8") as handle:
+            tickers += [ticker for line in handle for ticker in line.replace(",", " ").split()]
+    if not tickers:
+        parser.error("No tickers given.")
+
+    summary = run_batch(
+        tickers,
+        years=args.years,
+        output_dir=args.output_dir,
+        checkpoint_dir=args.checkpoint_dir,
+        max_workers=args.workers,
+        retry_failed=args.retry_failed,
+    )
+    print(json.dumps(summary, indent=2))
+    if summary["stopped_on_rate_limit"]:
+        return 75  # EX_TEMPFAIL: resume later
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
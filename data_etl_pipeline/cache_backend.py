@@ -0,0 +1,482 @@
+"""
+Pluggable cache backends shared by the API and the extractors.
+
+    memory  per-process LRU (default)
+    shared  one file per entry under a directory all worker processes share,
+            $XDG_RUNTIME_DIR or /dev/shm when available so entries live in memory
+
+Select with VILCORP_CACHE_BACKEND=memory|shared; VILCORP_CACHE_DIR and
+VILCORP_CACHE_MAX_MB override the shared directory and its size limit.
+
+The shared directory must be owned by the current user and closed to everyone
+else (mode 0700); entries are pickles signed with HMAC-SHA256 under a key kept
+in that directory (or VILCORP_CACHE_SECRET), and unsigned or tampered files are
+treated as misses rather than unpickled.
+"""
+import abc
+import hashlib
+import hmac
+import os
+import pickle
+import secrets
+import stat
+import tempfile
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from threading import Event, Lock, RLock
+
+try:
+    import fcntl
+except ImportError:  # Windows: cross-process locking degrades to per-process locks
+    fcntl = None
+
+from data_etl_pipeline.instrumentation import record_cache
+
+CACHE_BACKEND_ENV = "VILCORP_CACHE_BACKEND"
+CACHE_DIR_ENV = "VILCORP_CACHE_DIR"
+CACHE_MAX_MB_ENV = "VILCORP_CACHE_MAX_MB"
+CACHE_SECRET_ENV = "VILCORP_CACHE_SECRET"
+
+DEFAULT_MAX_MB = 256
+DEFAULT_MAX_ENTRIES = 4096
+DEFAULT_TTL = 15 * 60
+LOCK_STRIPES = 64
+EVICT_CHECK_EVERY = 64  # shared backend: writes between size checks
+COMPUTE_LEASE = 60  # seconds other callers wait on an in-flight computation before computing themselves
+NEGATIVE_TTL = 30  # empty or error-shaped results are kept at most this long
+
+# Seconds entries stay valid per namespace; None never expires (eviction still applies).
+NAMESPACE_TTLS = {
+    "graph-version": None,
+    "sparql-results": 60 * 60,
+    "graph-layout": 24 * 60 * 60,
+    "ontology-subgraph": 15 * 60,
+    "yahoo-info": 15 * 60,
+    "price-history": 15 * 60,
+    "news": 30 * 60,
+}
+
+_MISSING = object()
+
+
+def namespace_ttl(namespace, ttl=_MISSING):
+    if ttl is not _MISSING:
+        return ttl
+    return NAMESPACE_TTLS.get(namespace, DEFAULT_TTL)
+
+
+def _key_digest(namespace, key):
+    return hashlib.sha256(repr((namespace, key)).encode("utf-8")).hexdigest()
+
+
+def is_negative_result(value):
+    """True for results not worth keeping long: None, empty frames/collections and {"error": ...} dicts."""
+    if value is None:
+        return True
+    if isinstance(value, dict):
+        return not value or "error" in value
+    empty = getattr(value, "empty", None)
+    if isinstance(empty, bool):
+        return empty
+    if isinstance(value, (list, tuple)):
+        return not value
+    return False
+
+
+def negative_ttl(ttl):
+    return NEGATIVE_TTL if ttl is None else min(ttl, NEGATIVE_TTL)
+
+
+class _CacheBackend(abc.ABC):
+    def __init__(self):
+        self._stripes = [RLock() for _ in range(LOCK_STRIPES)]
+
+    @abc.abstractmethod
+    def get(self, namespace, key, default=None):
+        """Returns the live entry for key, or default."""
+
+    @abc.abstractmethod
+    def set(self, namespace, key, value, ttl=_MISSING):
+        """Stores value for key; ttl defaults to the namespace's TTL."""
+
+    def _acquire_shared(self, namespace, stripe):
+        """Cross-process part of a key lock; nothing to do for per-process backends."""
+        yield
+
+    @contextmanager
+    def _key_lock(self, namespace, key):
+        stripe = int(_key_digest(namespace, key)[:8], 16) % LOCK_STRIPES
+        with self._stripes[stripe]:
+            yield from self._acquire_shared(namespace, stripe)
+
+    @abc.abstractmethod
+    def _claim(self, namespace, key):
+        """Marks a computation for key as in flight; False if another caller holds a live claim. Called under the key lock."""
+
+    @abc.abstractmethod
+    def _release(self, namespace, key):
+        """Drops the claim on key and wakes its waiters."""
+
+    @abc.abstractmethod
+    def _wait(self, namespace, key):
+        """Blocks until the in-flight computation for key finishes or its lease runs out."""
+
+    def get_or_set(self, namespace, key, compute, ttl=_MISSING):
+        """
+        Returns the cached value, computing and storing it on a miss.
+
+        Concurrent misses for the same key wait on one computation (across
+        processes for the shared backend), so a cold start fetches upstream once.
+        The key lock only guards the check-and-claim; compute() runs without it,
+        and waiters give up after COMPUTE_LEASE seconds. Empty or error-shaped
+        results are kept for at most NEGATIVE_TTL seconds.
+        """
+        value = self.get(namespace, key, _MISSING)
+        if value is not _MISSING:
+            record_cache(namespace, True)
+            return value
+        waited = False
+        while True:
+            with self._key_lock(namespace, key):
+                value = self.get(namespace, key, _MISSING)
+                if value is not _MISSING:  # filled by whoever held the claim
+                    record_cache(namespace, True)
+                    return value
+                claimed = self._claim(namespace, key)
+            if claimed or waited:  # one wait per caller; if the value is still missing, compute it here
+                break
+            self._wait(namespace, key)
+            waited = True
+
+        try:
+            value = compute()
+            if is_negative_result(value):
+                ttl = negative_ttl(namespace_ttl(namespace, ttl))
+            self.set(namespace, key, value, ttl)
+        finally:
+            if claimed:
+                self._release(namespace, key)
+        record_cache(namespace, False)
+        return value
+
+    def incr(self, namespace, key, amount=1):
+        """Atomically increments an integer entry (missing counts as 0) and returns the new value."""
+        with self._key_lock(namespace, key):
+            value = self.get(namespace, key, 0) + amount
+            self.set(namespace, key, value)
+        return value
+
+
+class MemoryCacheBackend(_CacheBackend):
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        """Per-process LRU with per-namespace TTLs."""
+        super().__init__()
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = Lock()
+        self._in_flight = {}
+
+    def get(self, namespace, key, default=None):
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[(namespace, key)]
+                return default
+            self._entries.move_to_end((namespace, key))
+            return value
+
+    def set(self, namespace, key, value, ttl=_MISSING):
+        ttl = namespace_ttl(namespace, ttl)
+        with self._lock:
+            self._entries[(namespace, key)] = (time.time() + ttl if ttl is not None else None, value)
+            self._entries.move_to_end((namespace, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, namespace, key):
+        with self._lock:
+            self._entries.pop((namespace, key), None)
+
+    def _claim(self, namespace, key):
+        with self._lock:
+            if (namespace, key) in self._in_flight:
+                return False
+            self._in_flight[(namespace, key)] = Event()
+            return True
+
+    def _release(self, namespace, key):
+        with self._lock:
+            done = self._in_flight.pop((namespace, key), None)
+        if done is not None:
+            done.set()
+
+    def _wait(self, namespace, key):
+        with self._lock:
+            done = self._in_flight.get((namespace, key))
+        if done is not None:
+            done.wait(COMPUTE_LEASE)
+
+    def clear(self, namespace=None):
+        with self._lock:
+            if namespace is None:
+                self._entries.clear()
+            else:
+                for entry_key in [k for k in self._entries if k[0] == namespace]:
+                    del self._entries[entry_key]
+
+    def stats(self):
+        with self._lock:
+            namespaces = {}
+            for namespace, _ in self._entries:
+                namespaces[namespace] = namespaces.get(namespace, 0) + 1
+        return {"backend": "memory", "entries": sum(namespaces.values()), "namespaces": namespaces}
+
+
+def default_shared_directory():
+    """A per-user directory: under $XDG_RUNTIME_DIR, else /dev/shm or the temp dir suffixed with the uid."""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return os.path.join(runtime_dir, "vilcorp-cache")
+    suffix = f"vilcorp-cache-{os.getuid()}" if hasattr(os, "getuid") else "vilcorp-cache"
+    if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        return os.path.join("/dev/shm", suffix)
+    return os.path.join(tempfile.gettempdir(), suffix)
+
+
+def ensure_private_directory(directory):
+    """Creates directory with mode 0700, refusing one owned by another user or open to group/others."""
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    info = os.lstat(directory)
+    if not stat.S_ISDIR(info.st_mode):
+        raise PermissionError(f"Cache directory {directory} is not a directory")
+    if hasattr(os, "getuid"):
+        if info.st_uid != os.getuid():
+            raise PermissionError(f"Cache directory {directory} is owned by uid {info.st_uid}, not {os.getuid()}")
+        if info.st_mode & 0o077:
+            raise PermissionError(f"Cache directory {directory} has mode {stat.S_IMODE(info.st_mode):o}; expected 700")
+    return directory
+
+
+def load_or_create_secret(directory, name=".key"):
+    """Returns the signing key kept in directory, creating it atomically (0600) on first use."""
+    path = os.path.join(directory, name)
+    if not os.path.exists(path):
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")  # mkstemp creates it 0600
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(secrets.token_bytes(32))
+            os.link(tmp_path, path)  # fails if another process created the key first
+        except FileExistsError:
+            pass
+        finally:
+            SharedFileCacheBackend._remove(tmp_path)
+    with open(path, "rb") as handle:
+        return handle.read()
+
+
+class SharedFileCacheBackend(_CacheBackend):
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_MB * 1024 * 1024):
+        """
+        Cache shared by every process that points at the same directory.
+
+        Each entry is one HMAC-signed pickle file written atomically (temp
+        file + rename), so readers never see partial data and never unpickle
+        a file this cache did not write. Expired entries are dropped on read;
+        when the directory grows past max_bytes the least recently read
+        entries are evicted.
+
+        Raises:
+            PermissionError: The directory belongs to another user or is
+                accessible to group/others.
+        """
+        super().__init__()
+        self.directory = ensure_private_directory(directory or default_shared_directory())
+        self.max_bytes = max_bytes
+        secret = os.environ.get(CACHE_SECRET_ENV)
+        self._secret = secret.encode("utf-8") if secret else load_or_create_secret(self.directory)
+        self._writes = 0
+        self._lock = Lock()
+
+    def _path(self, namespace, key):
+        return os.path.join(self.directory, namespace, _key_digest(namespace, key) + ".pkl")
+
+    def _sign(self, payload):
+        return hmac.new(self._secret, payload, hashlib.sha256).digest()
+
+    def get(self, namespace, key, default=None):
+        path = self._path(namespace, key)
+        try:
+            with open(path, "rb") as handle:
+                data = handle.read()
+        except OSError:
+            return default
+        signature, payload = data[:32], data[32:]
+        if len(signature) < 32 or not hmac.compare_digest(signature, self._sign(payload)):
+            return default
+        try:
+            expires_at, stored_key, value = pickle.loads(payload)
+        except (EOFError, pickle.UnpicklingError, ValueError):
+            return default
+        if stored_key != repr(key):
+            return default
+        if expires_at is not None and expires_at <= time.time():
+            self._remove(path)
+            return default
+        try:
+            os.utime(path, (time.time(), os.stat(path).st_mtime))  # atime drives LRU eviction
+        except OSError:
+            pass
+        return value
+
+    def set(self, namespace, key, value, ttl=_MISSING):
+        ttl = namespace_ttl(namespace, ttl)
+        path = self._path(namespace, key)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        payload = pickle.dumps((time.time() + ttl if ttl is not None else None, repr(key), value),
+                               protocol=pickle.HIGHEST_PROTOCOL)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(self._sign(payload))
+                handle.write(payload)
+            os.replace(tmp_path, path)
+        except BaseException:
+            self._remove(tmp_path)
+            raise
+
+        with self._lock:
+            self._writes += 1
+            check = self._writes % EVICT_CHECK_EVERY == 0
+        if check:
+            self.evict()
+
+    def delete(self, namespace, key):
+        self._remove(self._path(namespace, key))
+
+    def clear(self, namespace=None):
+        for path, _ in self._entry_files(namespace):
+            self._remove(path)
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _entry_files(self, namespace=None):
+        namespaces = [namespace] if namespace else os.listdir(self.directory)
+        for name in namespaces:
+            directory = os.path.join(self.directory, name)
+            if not os.path.isdir(directory):
+                continue
+            for entry in os.scandir(directory):
+                if entry.name.endswith(".pkl"):
+                    try:
+                        yield entry.path, entry.stat()
+                    except OSError:
+                        continue
+
+    def evict(self):
+        """Deletes least recently read entries until the cache is under 90% of max_bytes."""
+        files = list(self._entry_files())
+        total = sum(stat.st_size for _, stat in files)
+        if total <= self.max_bytes:
+            return 0
+        removed = 0
+        for path, stat in sorted(files, key=lambda item: item[1].st_atime):
+            if total <= self.max_bytes * 0.9:
+                break
+            self._remove(path)
+            total -= stat.st_size
+            removed += 1
+        return removed
+
+    def _lease_path(self, namespace, key):
+        return os.path.join(self.directory, namespace, _key_digest(namespace, key) + ".lease")
+
+    def _lease_active(self, path):
+        try:
+            return os.stat(path).st_mtime + COMPUTE_LEASE > time.time()
+        except OSError:
+            return False
+
+    def _claim(self, namespace, key):
+        path = self._lease_path(namespace, key)
+        if self._lease_active(path):
+            return False
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w"):
+            pass
+        os.utime(path)  # an expired lease is taken over with a fresh mtime
+        return True
+
+    def _release(self, namespace, key):
+        self._remove(self._lease_path(namespace, key))
+
+    def _wait(self, namespace, key):
+        path = self._lease_path(namespace, key)
+        while self._lease_active(path):
+            time.sleep(0.05)
+
+    def _acquire_shared(self, namespace, stripe):
+        if fcntl is None:
+            yield
+            return
+        directory = os.path.join(self.directory, namespace)
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f".lock{stripe}"), "a") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def stats(self):
+        namespaces = {}
+        total = 0
+        for path, stat in self._entry_files():
+            name = os.path.basename(os.path.dirname(path))
+            namespaces[name] = namespaces.get(name, 0) + 1
+            total += stat.st_size
+        return {
+            "backend": "shared",
+            "directory": self.directory,
+            "entries": sum(namespaces.values()),
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+            "namespaces": namespaces,
+        }
+
+
+_default_backend = None
+_default_backend_lock = Lock()
+
+
+def create_cache_backend(kind=None):
+    kind = (kind or os.environ.get(CACHE_BACKEND_ENV, "memory")).lower()
+    if kind == "memory":
+        return MemoryCacheBackend()
+    if kind == "shared":
+        max_mb = float(os.environ.get(CACHE_MAX_MB_ENV, DEFAULT_MAX_MB))
+        return SharedFileCacheBackend(os.environ.get(CACHE_DIR_ENV), max_bytes=int(max_mb * 1024 * 1024))
+    raise ValueError(f"Unknown cache backend '{kind}' (expected 'memory' or 'shared')")
+
+
+def get_cache_backend():
+    """Returns the process-wide cache backend configured through the environment."""
+    global _default_backend
+    with _default_backend_lock:
+        if _default_backend is None:
+            _default_backend = create_cache_backend()
+        return _default_backend
+
+
+def cached_call(namespace, key, compute, ttl=_MISSING):
+    """Shorthand for get_cache_backend().get_or_set(...)."""
+    return get_cache_backend().get_or_set(namespace, key, compute, ttl)
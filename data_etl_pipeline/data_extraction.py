@@ -1,7 +1,15 @@
-import yfinance as yf
-from newsapi import NewsApiClient
+import os
+from datetime import date, timedelta
+
 import pandas as pd
 
+from data_etl_pipeline.cache_backend import cached_call
+from data_etl_pipeline.price_series import PriceSeries
+from data_etl_pipeline.providers import news_everything, price_history, ticker_info
+
+NEWSAPI_KEY = os.environ.get("NEWSAPI_KEY", "d745b20dc64046fb9e52cc8e407427b2")
+NEWS_LOOKBACK_DAYS = 30
+
 class StockPriceExtractor:
     def __init__(self, ticker, start_date, end_date):
         """Initializes the StockPriceExtractor."""
@@ -16,63 +24,114 @@ class StockPriceExtractor:
         if self.start_date and self.end_date and self.start_date > self.end_date:
             raise ValueError("Start date must be before end date.")
 
+    def fetch_price_series(self, period="1y"):
+        """Fetches stock prices as a PriceSeries viewing the cached history (no copy)."""
+        #  Shared across workers, so the series must not be modified
+        return PriceSeries.from_history(cached_call(
+            "price-history", (self.ticker, period), lambda: price_history(self.ticker, period=period)
+        ))
+
     def fetch_stock_prices(self, period="1y"):
         """Fetches stock prices and ensures output is always a DataFrame."""
         try:
-            stock = yf.Ticker(self.ticker)
-            historical_data = stock.history(period=period)
+            prices = self.fetch_price_series(period)
 
             #  Check if data is empty
-            if historical_data.empty:
+            if prices.empty:
                 print(f"⚠️ No stock price data found for {self.ticker}. Returning empty DataFrame.")
                 return pd.DataFrame(columns=["isRecordedOn", "priceValue", "volume"])
 
-            #  Ensure DataFrame format
-            historical_data.reset_index(inplace=True)
-            historical_data.rename(columns={"Date": "isRecordedOn", "Close": "priceValue", "Volume": "volume"}, inplace=True)
-
-            return historical_data[["isRecordedOn", "priceValue", "volume"]]
+            return prices.to_frame()
 
         except Exception as e:
             print(f"ERROR fetching stock prices for {self.ticker}: {e}")
             return pd.DataFrame(columns=["isRecordedOn", "priceValue", "volume"])  #  Always return DataFrame
 
+    def iter_price_rows(self, window_days=365):
+        """Yields (date, close, volume) bars one history window at a time to bound memory."""
+        end = pd.Timestamp(self.end_date) if self.end_date else pd.Timestamp.today().normalize()
+        start = pd.Timestamp(self.start_date) if self.start_date else end - pd.DateOffset(years=1)
+
+        window_start = start
+        while window_start < end:
+            window_end = min(window_start + pd.Timedelta(days=window_days), end)
+            history = price_history(self.ticker, start=window_start.strftime("%Y-%m-%d"), end=window_end.strftime("%Y-%m-%d"))
+            if not history.empty:
+                yield from zip(history.index, history["Close"], history["Volume"])
+            window_start = window_end
+
 class NewsAPIExtractor:
     def __init__(self, api_key, company, start_date, end_date):
         self.api_key = api_key
         self.company = company
         self.start_date = start_date
         self.end_date = end_date
+        from newsapi import NewsApiClient
         self.newsapi = NewsApiClient(api_key=self.api_key)
 
     def fetch_news_articles(self):
-        articles = self.newsapi.get_everything(
+        articles = cached_call("news", (self.company, self.start_date, self.end_date), lambda: news_everything(
+            self.newsapi,
             q=self.company,
             from_param=self.start_date,
             to=self.end_date,
             language="en",
             sort_by="relevancy",
-        )
+        ))
         return [
             {"title": article["title"], "url": article["url"], "publicationDate": article.get("publishedAt")}
             for article in articles["articles"]
         ]
 
+    def iter_news_articles(self, page_size=100, max_pages=None):
+        """Yields articles page by page instead of building the full list."""
+        page = 1
+        while max_pages is None or page <= max_pages:
+            response = news_everything(
+                self.newsapi,
+                q=self.company,
+                from_param=self.start_date,
+                to=self.end_date,
+                language="en",
+                sort_by="relevancy",
+                page=page,
+                page_size=page_size,
+            )
+            articles = response.get("articles", [])
+            for article in articles:
+                yield {"title": article["title"], "url": article["url"], "publicationDate": article.get("publishedAt")}
+
+            if len(articles) < page_size or page * page_size >= response.get("totalResults", 0):
+                break
+            page += 1
+
+def recent_news_articles(company_name, days=NEWS_LOOKBACK_DAYS):
+    """Fetches the company's NewsAPI articles from the last `days` days."""
+    end_date = date.today()
+    start_date = end_date - timedelta(days=days)
+    return NewsAPIExtractor(NEWSAPI_KEY, company_name, start_date.isoformat(), end_date.isoformat()).fetch_news_articles()
+
+def financial_metrics(info):
+    """Picks the headline financial metrics out of a ticker info dict."""
+    return {
+        "PE Ratio": info.get("forwardPE"),
+        "EPS": info.get("trailingEps"),
+        "Market Cap": info.get("marketCap"),
+        "Revenue": info.get("totalRevenue"),
+        "Profit Margin": info.get("profitMargins"),
+    }
+
 class YahooFinanceExtractor:
     def __init__(self, ticker):
         self.ticker = ticker
-        self.stock = yf.Ticker(ticker)
+
+    def get_info(self):
+        """Returns the ticker's info dict, shared through the cache backend."""
+        return cached_call("yahoo-info", self.ticker, lambda: ticker_info(self.ticker))
 
     def fetch_financial_metrics(self):
         try:
-            financial_data = self.stock.get_info()
-            return {
-                "PE Ratio": financial_data.get("forwardPE"),
-                "EPS": financial_data.get("trailingEps"),
-                "Market Cap": financial_data.get("marketCap"),
-                "Revenue": financial_data.get("totalRevenue"),
-                "Profit Margin": financial_data.get("profitMargins"),
-            }
+            return financial_metrics(self.get_info())
         except Exception as e:
             print(f"Error fetching financial metrics: {e}")
             return {}  # Return an empty dictionary if an error occurs
@@ -80,7 +139,9 @@ class YahooFinanceExtractor:
     def fetch_performance_overview(self):
         try:
             # Fetch historical data for the last 10 years
-            historical_data = self.stock.history(period="max")
+            historical_data = cached_call(
+                "price-history", (self.ticker, "max"), lambda: price_history(self.ticker, period="max")
+            ).copy()
 
             if historical_data.empty:
                 raise ValueError(f"No historical data found for {self.ticker}.")
@@ -154,7 +215,7 @@ class YahooFinanceExtractor:
         """
         try:
             # Get the statistics from the Ticker object's `info` attribute
-            info = self.stock.info
+            info = self.get_info()
 
             # Extract relevant metrics
             statistics = {
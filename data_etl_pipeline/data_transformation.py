@@ -1,36 +1,102 @@
+import hashlib
+
 from rdflib import Graph, Namespace, URIRef, Literal
 from rdflib.namespace import RDF, XSD
 from rdflib.namespace import OWL
 from data_etl_pipeline.sparql_queries import fetch_wikidata_id
 from data_etl_pipeline.graph_funcations import enhance_rdf_with_links
+from data_etl_pipeline.fuseki_loader import ticker_graph_uri
+from data_etl_pipeline.price_series import PriceSeries
 
 VILCORP = Namespace("http://www.semanticweb.org/viljo/ontologies/2024/10/untitled-ontology-3/")
 
-def create_rdf_graph(stock_data, news_data, financial_metrics, performance_data, company_name):
+NEWS_NAMESPACE = "news"
+
+
+def _normalize_text(value):
+    return " ".join(str(value or "").split()).lower()
+
+
+def article_id(article):
+    """Deterministic content-addressed identifier for a news article.
+
+    A digest of the normalized headline, URL and publication date, so the
+    same article maps to the same URI in every process and run.
+    """
+    publication_date = str(article.get("publicationDate") or "")[:10]
+    key = "\x1f".join([_normalize_text(article.get("title")), str(article.get("url") or "").strip(), publication_date])
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+
+
+def news_namespace(company_name, ticker=None):
+    """SeenIndex namespace for a company's articles, scoped like its stock price URIs."""
+    return f"{NEWS_NAMESPACE}:{ticker or company_name.replace(' ', '_')}"
+
+
+def company_uri_for(company_name):
+    return URIRef(f"{VILCORP}Company/{company_name.replace(' ', '_')}")
+
+
+def company_triples(company_uri, company_name):
+    yield (company_uri, RDF.type, VILCORP.Company)
+    yield (company_uri, VILCORP.hasName, Literal(company_name, datatype=XSD.string))
+
+
+def stock_price_triples(company_uri, price_scope, recorded_on, price, volume):
+    """Yields the triples for one daily price bar."""
+    date = recorded_on.date() if hasattr(recorded_on, "date") else recorded_on
+    stock_price_uri = URIRef(f"{VILCORP}StockPrice/{price_scope}/{date}")
+    yield (stock_price_uri, RDF.type, VILCORP.StockPrice)
+    yield (stock_price_uri, VILCORP.isRecordedOn, Literal(date, datatype=XSD.date))
+    yield (stock_price_uri, VILCORP.priceValue, Literal(price, datatype=XSD.float))
+    yield (stock_price_uri, VILCORP.volume, Literal(volume, datatype=XSD.integer))
+    yield (company_uri, VILCORP.hasStockPrice, stock_price_uri)
+
+
+def news_article_triples(company_uri, news_id, article):
+    """Yields the triples for one news article."""
+    news_uri = URIRef(f"{VILCORP}NewsArticle/{news_id}")
+    yield (news_uri, RDF.type, VILCORP.NewsArticle)
+    yield (news_uri, VILCORP.headline, Literal(article['title'], datatype=XSD.string))
+    yield (news_uri, VILCORP.publicationDate, Literal(article["publicationDate"], datatype=XSD.dateTime))
+    yield (news_uri, VILCORP.hasSentiment, Literal(article.get('sentimentScore', 0), datatype=XSD.float))
+    yield (news_uri, VILCORP.mentionsCompany, company_uri)
+
+
+def create_rdf_graph(stock_data, news_data, financial_metrics, performance_data, company_name, materializer=None,
+                     ticker=None, seen_index=None):
+    """Builds the RDF graph for one company.
+
+    stock_data is a PriceSeries or a frame in the extractor layout
+    (isRecordedOn, priceValue, volume). Stock price URIs are scoped by ticker
+    (or company name when no ticker is given). When a SeenIndex is passed, articles already ingested in an
+    earlier run are skipped. The new ones are not recorded here: call
+    mark_news_ingested once the graph has been persisted, so a failed write
+    does not leave articles marked as seen that were never stored.
+    """
     graph = Graph()
     graph.bind("vilcorp", VILCORP)
 
-    company_uri = URIRef(f"{VILCORP}Company/{company_name.replace(' ', '_')}")
-    graph.add((company_uri, RDF.type, VILCORP.Company))
-    graph.add((company_uri, VILCORP.hasName, Literal(company_name, datatype=XSD.string)))
+    company_uri = company_uri_for(company_name)
+    price_scope = ticker or company_name.replace(' ', '_')
+    for triple in company_triples(company_uri, company_name):
+        graph.add(triple)
 
     if stock_data is not None:
-        for _, row in stock_data.iterrows():
-            stock_price_uri = URIRef(f"{VILCORP}StockPrice/{row['isRecordedOn'].date()}")
-            graph.add((stock_price_uri, RDF.type, VILCORP.StockPrice))
-            graph.add((stock_price_uri, VILCORP.isRecordedOn, Literal(row["isRecordedOn"].date(), datatype=XSD.date)))
-            graph.add((stock_price_uri, VILCORP.priceValue, Literal(row["priceValue"], datatype=XSD.float)))
-            graph.add((stock_price_uri, VILCORP.volume, Literal(row["volume"], datatype=XSD.integer)))
-            graph.add((company_uri, VILCORP.hasStockPrice, stock_price_uri))
+        if not isinstance(stock_data, PriceSeries):
+            stock_data = PriceSeries.from_frame(stock_data)
+        for recorded_on, price, volume in stock_data.iter_bars():
+            for triple in stock_price_triples(company_uri, price_scope, recorded_on, price, volume):
+                graph.add(triple)
 
     if news_data:
+        articles = {}
         for article in news_data:
-            news_uri = URIRef(f"{VILCORP}NewsArticle/{hash(article['title'])}")
-            graph.add((news_uri, RDF.type, VILCORP.NewsArticle))
-            graph.add((news_uri, VILCORP.headline, Literal(article['title'], datatype=XSD.string)))
-            graph.add((news_uri, VILCORP.publicationDate, Literal(article["publicationDate"], datatype=XSD.dateTime)))
-            graph.add((news_uri, VILCORP.hasSentiment, Literal(article.get('sentimentScore', 0), datatype=XSD.float)))
-            graph.add((news_uri, VILCORP.mentionsCompany, company_uri))
+            articles.setdefault(article_id(article), article)
+        new_ids = seen_index.unseen(news_namespace(company_name, ticker), articles) if seen_index is not None else list(articles)
+        for news_id in new_ids:
+            for triple in news_article_triples(company_uri, news_id, articles[news_id]):
+                graph.add(triple)
 
     if financial_metrics:
         for metric in financial_metrics:
@@ -40,15 +106,28 @@ def create_rdf_graph(stock_data, news_data, financial_metrics, performance_data,
             graph.add((metric_uri, VILCORP.metricValue, Literal(metric["metricValue"], datatype=XSD.float)))
             graph.add((company_uri, VILCORP.hasFinancialMetric, metric_uri))
 
+    # Keep the RDFS closure up to date with the new triples
+    if materializer is not None:
+        materializer.add(graph, ticker_graph_uri(price_scope))
+
     return graph
 
 
-def create_rdf_graph_with_links(stock_data, news_data, financial_metrics, performance_data, company_name):
-    graph = create_rdf_graph(stock_data, news_data, financial_metrics, performance_data, company_name)
+def mark_news_ingested(seen_index, graph, company_name, ticker=None):
+    """Records the articles in a persisted graph as ingested; returns how many were marked."""
+    prefix = f"{VILCORP}NewsArticle/"
+    news_ids = [str(uri)[len(prefix):] for uri in graph.subjects(RDF.type, VILCORP.NewsArticle) if str(uri).startswith(prefix)]
+    if news_ids:
+        seen_index.mark(news_namespace(company_name, ticker), news_ids)
+    return len(news_ids)
+
+
+def create_rdf_graph_with_links(stock_data, news_data, financial_metrics, performance_data, company_name, **kwargs):
+    graph = create_rdf_graph(stock_data, news_data, financial_metrics, performance_data, company_name, **kwargs)
     
     # Fetch external identifier (e.g., Wikidata)
     external_id = fetch_wikidata_id(company_name)
-    company_uri = URIRef(f"{VILCORP}Company/{company_name.replace(' ', '_')}")
+    company_uri = company_uri_for(company_name)
     
     # Enhance RDF with external links
     return enhance_rdf_with_links(graph, company_uri, external_id)
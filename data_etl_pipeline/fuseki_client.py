@@ -0,0 +1,257 @@
+import csv
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import requests
+from rdflib import BNode, Literal, URIRef
+from rdflib.namespace import XSD
+from requests.adapters import HTTPAdapter
+
+from data_etl_pipeline.instrumentation import http_outcome, upstream_call
+
+# Configuration
+FUSEKI_URL = os.environ.get("VILCORP_FUSEKI_URL", "http://localhost:3030")
+DATASET_NAME = "vilcorp_data"
+DEFAULT_TIMEOUT = (3.05, 120)  # (connect, read) seconds
+DEFAULT_POOL_SIZE = 10
+STREAM_CHUNK_SIZE = 64 * 1024
+
+RESULT_FORMATS = {
+    "json": "application/sparql-results+json",
+    "csv": "text/csv",
+    "tsv": "text/tab-separated-values",
+}
+
+_TSV_LITERAL = re.compile(r'^"(?P<lexical>.*)"(?:@(?P<lang>[A-Za-z0-9-]+)|\^\^<(?P<datatype>[^>]*)>)?$', re.DOTALL)
+_TSV_INTEGER = re.compile(r"^[+-]?\d+$")
+_TSV_ESCAPE = re.compile(r'\\(?:u[0-9A-Fa-f]{4}|U[0-9A-Fa-f]{8}|.)')
+
+
+def _unescape(match):
+    escape = match.group(0)
+    if escape[1] in "uU":
+        return chr(int(escape[2:], 16))
+    return {"t": "\t", "n": "\n", "r": "\r", "b": "\b", "f": "\f"}.get(escape[1], escape[1])
+
+
+def _iter_lines(chunks):
+    """Splits a stream of text chunks into lines, keeping their line endings."""
+    pending = ""
+    for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line + "\n"
+    if pending:
+        yield pending
+
+
+def decode_tsv_term(cell):
+    """Converts a SPARQL TSV cell (<iri>, "literal"^^<dt>, 42, _:b0) into its lexical value."""
+    if cell == "":
+        return None
+    if cell.startswith("<") and cell.endswith(">"):
+        return cell[1:-1]
+    match = _TSV_LITERAL.match(cell)
+    if match:
+        return _TSV_ESCAPE.sub(_unescape, match.group("lexical"))
+    return cell
+
+
+def parse_tsv_term(cell):
+    """Converts a SPARQL TSV cell into the rdflib term it encodes."""
+    if cell == "":
+        return None
+    if cell.startswith("<") and cell.endswith(">"):
+        return URIRef(cell[1:-1])
+    if cell.startswith("_:"):
+        return BNode(cell[2:])
+    match = _TSV_LITERAL.match(cell)
+    if match:
+        lexical = _TSV_ESCAPE.sub(_unescape, match.group("lexical"))
+        datatype = match.group("datatype")
+        return Literal(lexical, lang=match.group("lang"), datatype=URIRef(datatype) if datatype else None)
+    if cell in ("true", "false"):
+        return Literal(cell, datatype=XSD.boolean)
+    if _TSV_INTEGER.match(cell):
+        return Literal(cell, datatype=XSD.integer)
+    if "e" in cell or "E" in cell:
+        return Literal(cell, datatype=XSD.double)
+    return Literal(cell, datatype=XSD.decimal)
+
+
+class FusekiClient:
+    def __init__(self, base_url=FUSEKI_URL, dataset=DATASET_NAME, pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT):
+        """Initializes a client that reuses keep-alive connections to one Fuseki dataset."""
+        self.base_url = base_url.rstrip("/")
+        self.dataset = dataset
+        self.timeout = timeout
+        self.pool_size = pool_size
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    @property
+    def dataset_url(self):
+        return f"{self.base_url}/{self.dataset}"
+
+    def _post_query(self, query, result_format):
+        if result_format not in RESULT_FORMATS:
+            raise ValueError(f"Unsupported result format '{result_format}'. Use one of {sorted(RESULT_FORMATS)}.")
+
+        # Times the request up to the response headers; the body is streamed by the caller
+        with upstream_call("fuseki", "query") as call:
+            response = self.session.post(
+                f"{self.dataset_url}/query",
+                data=query.encode("utf-8"),
+                headers={"Content-Type": "application/sparql-query", "Accept": RESULT_FORMATS[result_format]},
+                timeout=self.timeout,
+                stream=True,
+            )
+            call.outcome = http_outcome(response.status_code)
+        if response.status_code != 200:
+            message = response.text
+            response.close()
+            raise Exception(f"SPARQL query failed: {response.status_code}\n{message}")
+        return response
+
+    def query_json(self, query):
+        """Executes a query and returns the standard SPARQL JSON results document."""
+        response = self._post_query(query, "json")
+        try:
+            return response.json()
+        except ValueError:
+            raise ValueError("Failed to parse SPARQL response as JSON.")
+        finally:
+            response.close()
+
+    def iter_rows(self, query, result_format="tsv", decode=decode_tsv_term):
+        """
+        Executes a SELECT query and yields the variable names, then one tuple per row.
+
+        TSV and CSV responses are decoded incrementally from the socket, so only
+        the current row is held in memory. JSON has no streaming framing and is
+        parsed as a whole before rows are yielded.
+        """
+        response = self._post_query(query, result_format)
+        try:
+            if result_format == "json":
+                try:
+                    document = response.json()
+                except ValueError:
+                    raise ValueError("Failed to parse SPARQL response as JSON.")
+                variables = document["head"]["vars"]
+                yield variables
+                for binding in document["results"]["bindings"]:
+                    yield tuple(binding[var]["value"] if var in binding else None for var in variables)
+                return
+
+            response.encoding = "utf-8"
+            lines = _iter_lines(response.iter_content(chunk_size=STREAM_CHUNK_SIZE, decode_unicode=True))
+
+            if result_format == "csv":
+                reader = csv.reader(lines)
+                header = next(reader, None)
+                if header is None:
+                    return
+                yield header
+                for row in reader:
+                    yield tuple(value if value != "" else None for value in row)
+                return
+
+            header = next(lines, "").rstrip("\r\n")
+            if not header:
+                return
+            yield [name.lstrip("?$") for name in header.split("\t")]
+            for line in lines:
+                line = line.rstrip("\r\n")
+                if line:
+                    yield tuple(decode(cell) for cell in line.split("\t"))
+        finally:
+            response.close()
+
+    def select(self, query, result_format="tsv"):
+        """Yields SELECT results as dictionaries keyed by variable name."""
+        rows = self.iter_rows(query, result_format)
+        variables = next(rows, None)
+        if variables is None:
+            return
+        for row in rows:
+            yield {var: value for var, value in zip(variables, row) if value is not None}
+
+    def select_terms(self, query):
+        """Yields SELECT results as tuples of rdflib terms, decoded from TSV."""
+        rows = self.iter_rows(query, "tsv", decode=parse_tsv_term)
+        next(rows, None)
+        yield from rows
+
+    def select_frame(self, query, result_format="tsv"):
+        """Streams SELECT results straight into a columnar DataFrame of lexical values."""
+        rows = self.iter_rows(query, result_format)
+        variables = next(rows, None)
+        if variables is None:
+            return pd.DataFrame()
+
+        columns = [[] for _ in variables]
+        for row in rows:
+            for column, value in zip(columns, row):
+                column.append(value)
+        return pd.DataFrame(dict(zip(variables, columns)), columns=variables)
+
+    def select_many(self, queries, result_format="json", max_workers=None):
+        """Executes several queries concurrently over the shared connection pool."""
+        if result_format == "json":
+            run = self.query_json
+        else:
+            run = lambda query: list(self.select(query, result_format))
+
+        with ThreadPoolExecutor(max_workers=max_workers or self.pool_size) as executor:
+            return list(executor.map(run, queries))
+
+    def upload(self, data, content_type="application/n-triples", graph_uri=None):
+        """POSTs RDF to the Graph Store endpoint, appending to the default or a named graph."""
+        params = {"graph": str(graph_uri)} if graph_uri else None
+        with upstream_call("fuseki", "upload") as call:
+            response = self.session.post(
+                f"{self.dataset_url}/data",
+                params=params,
+                data=data.encode("utf-8") if isinstance(data, str) else data,
+                headers={"Content-Type": content_type},
+                timeout=self.timeout,
+            )
+            call.outcome = http_outcome(response.status_code)
+        if response.status_code not in (200, 201, 204):
+            raise Exception(f"Fuseki upload failed: {response.status_code}\n{response.text}")
+        return response
+
+    def update(self, update):
+        """Executes a SPARQL Update request."""
+        with upstream_call("fuseki", "update") as call:
+            response = self.session.post(
+                f"{self.dataset_url}/update",
+                data=update.encode("utf-8"),
+                headers={"Content-Type": "application/sparql-update"},
+                timeout=self.timeout,
+            )
+            call.outcome = http_outcome(response.status_code)
+        if response.status_code not in (200, 204):
+            raise Exception(f"SPARQL update failed: {response.status_code}\n{response.text}")
+        return response
+
+    def close(self):
+        self.session.close()
+
+
+_default_client = None
+
+
+def get_fuseki_client():
+    """Returns the shared client for the configured Fuseki dataset."""
+    global _default_client
+    if _default_client is None:
+        _default_client = FusekiClient()
+    return _default_client
@@ -0,0 +1,225 @@
+import time
+
+from rdflib import BNode, Graph, Literal, URIRef
+from rdflib.compare import to_canonical_graph
+from rdflib.plugins.parsers.ntriples import W3CNTriplesParser
+
+from data_etl_pipeline.fuseki_client import FusekiClient
+from data_etl_pipeline.query_catalogue import sparql_term
+
+# Named graphs hold one ticker each, so a reload only touches that ticker's data.
+# Queries without a GRAPH clause see them when the Fuseki dataset is configured
+# with tdb2:unionDefaultGraph true.
+GRAPH_NAMESPACE = "http://www.semanticweb.org/viljo/graphs/"
+DEFAULT_CHUNK_TRIPLES = 20_000
+SKOLEM_PATH = "/.well-known/genid/"
+
+
+def ticker_graph_uri(ticker):
+    """Returns the named graph that holds a ticker's triples."""
+    return URIRef(f"{GRAPH_NAMESPACE}{ticker}")
+
+
+def ntriples_line(triple):
+    """Serializes one triple as an N-Triples line."""
+    s, p, o = triple
+    return f"{sparql_term(s)} {sparql_term(p)} {sparql_term(o)} .\n"
+
+
+def term_key(term):
+    """Compares literals by value so the store's canonical lexical forms still match."""
+    if isinstance(term, Literal):
+        value = term.value if term.value is not None else str(term)
+        return ("literal", value, term.datatype, term.language)
+    return (type(term).__name__, str(term))
+
+
+def triple_key(triple):
+    return tuple(term_key(term) for term in triple)
+
+
+def skolemize(term, graph_uri):
+    """Replaces a blank node with an IRI under the named graph, so it can be compared and deleted."""
+    if isinstance(term, BNode):
+        return URIRef(f"{graph_uri}{SKOLEM_PATH}{term}")
+    return term
+
+
+class _LabelContext(dict):
+    """Blank node context that keeps the document's own labels instead of minting fresh ones."""
+
+    def get(self, key, default=None):
+        return key
+
+
+class _TripleSink:
+    def __init__(self):
+        self.triples = []
+
+    def triple(self, s, p, o):
+        self.triples.append((s, p, o))
+
+
+def iter_ntriples(lines):
+    """
+    Parses N-Triples one line at a time (a file object or any iterable of str or bytes).
+
+    Blank nodes keep their labels, so a producer that writes stable labels gets
+    the same skolem IRIs on every load.
+    """
+    sink = _TripleSink()
+    parser = W3CNTriplesParser(sink)
+    context = _LabelContext()
+    for line in lines:
+        parser.line = (line.decode("utf-8") if isinstance(line, bytes) else line).strip()
+        parser.parseline(bnode_context=context)
+        yield from sink.triples
+        sink.triples.clear()
+
+
+def graph_triples(graph):
+    """
+    A Graph's triples grouped by subject; blank nodes are first relabeled canonically
+    (by content), so an unchanged structure gets the same skolem IRIs on every load.
+    """
+    if any(isinstance(term, BNode) for triple in graph for term in triple):
+        graph = to_canonical_graph(graph)
+    for subject in graph.subjects(unique=True):
+        for predicate, obj in graph.predicate_objects(subject):
+            yield subject, predicate, obj
+
+
+def subject_batches(triples, chunk_size):
+    """
+    Groups triples into lists of about chunk_size, closing a batch only when the
+    subject changes, so a subject grouped in the input is never split across batches.
+    """
+    batch = []
+    for triple in triples:
+        if len(batch) >= chunk_size and triple[0] != batch[-1][0]:
+            yield batch
+            batch = []
+        batch.append(triple)
+    if batch:
+        yield batch
+
+
+class FusekiBulkLoader:
+    def __init__(self, client=None, chunk_size=DEFAULT_CHUNK_TRIPLES):
+        """Initializes a loader that streams triples to Fuseki in bounded chunks."""
+        self.client = client or FusekiClient()
+        self.chunk_size = chunk_size
+
+    def is_empty(self, graph_uri):
+        query = f"SELECT ?s WHERE {{ GRAPH {sparql_term(graph_uri)} {{ ?s ?p ?o }} }} LIMIT 1"
+        return next(self.client.select_terms(query), None) is None
+
+    def existing_triples(self, graph_uri, subjects):
+        """Streams the named graph's current triples about the given subjects."""
+        values = " ".join(sparql_term(subject) for subject in subjects)
+        query = f"SELECT ?s ?p ?o WHERE {{ GRAPH {sparql_term(graph_uri)} {{ VALUES ?s {{ {values} }} ?s ?p ?o }} }}"
+        return self.client.select_terms(query)
+
+    def _upload_chunk(self, chunk, graph_uri):
+        self.client.upload("".join(ntriples_line(triple) for triple in chunk), "application/n-triples", graph_uri)
+
+    def _apply_delta(self, stale, missing, graph_uri):
+        """Deletes stale and inserts missing triples in one (atomic) SPARQL Update request."""
+        graph = sparql_term(graph_uri)
+        operations = []
+        if stale:
+            operations.append(f"DELETE DATA {{ GRAPH {graph} {{\n{''.join(map(ntriples_line, stale))}}} }}")
+        if missing:
+            operations.append(f"INSERT DATA {{ GRAPH {graph} {{\n{''.join(map(ntriples_line, missing))}}} }}")
+        self.client.update(" ;\n".join(operations))
+
+    def _delete_orphaned_skolems(self, graph_uri):
+        """Drops skolemized blank nodes that no triple refers to any more (their owner changed)."""
+        graph = sparql_term(graph_uri)
+        prefix = sparql_term(Literal(f"{graph_uri}{SKOLEM_PATH}"))
+        self.client.update(
+            f"DELETE {{ GRAPH {graph} {{ ?s ?p ?o }} }} WHERE {{ GRAPH {graph} {{ ?s ?p ?o "
+            f"FILTER(STRSTARTS(STR(?s), {prefix})) FILTER NOT EXISTS {{ ?x ?y ?s }} }} }}"
+        )
+
+    def load(self, triples, graph_uri):
+        """
+        Loads triples into a named graph, replacing what the store holds about their subjects.
+
+        An empty named graph gets a chunked N-Triples upload. Otherwise each batch of
+        subjects is compared with the store: triples it no longer has are sent as
+        DELETE DATA and new ones as INSERT DATA, together in one update, so a revised
+        value replaces the old one. Subjects absent from the input are left alone.
+        Blank nodes are skolemized to IRIs under the named graph.
+
+        Memory is bounded by the batch size plus one entry per subject: the input is
+        streamed and only the current batch's stored triples are fetched. Input grouped by subject (a
+        Graph, or N-Triples serialized from one) is compared subject by subject;
+        otherwise a subject split across batches is still loaded correctly, with
+        some of its triples deleted and re-inserted.
+
+        Args:
+            triples: A Graph, an iterable of triples (e.g. iter_ntriples(file)), or a
+                Turtle string (parsed into a Graph first, so not memory-bounded).
+            graph_uri (URIRef): Target named graph.
+
+        Returns:
+            dict: Load report with triple counts and throughput.
+        """
+        if isinstance(triples, str):
+            triples = Graph().parse(data=triples, format="turtle")
+        if isinstance(triples, Graph):
+            triples = graph_triples(triples)
+        triples = ((skolemize(s, graph_uri), p, skolemize(o, graph_uri)) for s, p, o in triples)
+
+        start = time.perf_counter()
+        mode = "initial" if self.is_empty(graph_uri) else "delta"
+        total = sent = deleted = chunks = 0
+        loaded_subjects = set()
+        skolem_prefix = f"{graph_uri}{SKOLEM_PATH}"
+        orphans = False
+        for batch in subject_batches(triples, self.chunk_size):
+            total += len(batch)
+            if mode == "initial":
+                self._upload_chunk(batch, graph_uri)
+                sent += len(batch)
+                chunks += 1
+                continue
+
+            incoming = {triple_key(triple): triple for triple in batch}
+            subjects = {triple[0] for triple in batch}
+            stale = []
+            existing = set()
+            for triple in self.existing_triples(graph_uri, subjects):
+                key = triple_key(triple)
+                existing.add(key)
+                # a subject met in an earlier batch already had its stale triples removed
+                if key not in incoming and triple[0] not in loaded_subjects:
+                    stale.append(triple)
+            missing = [triple for key, triple in incoming.items() if key not in existing]
+            loaded_subjects |= subjects
+            if stale or missing:
+                self._apply_delta(stale, missing, graph_uri)
+                sent += len(missing)
+                deleted += len(stale)
+                chunks += 1
+            orphans = orphans or any(str(o).startswith(skolem_prefix) for _, _, o in stale)
+        if orphans:
+            self._delete_orphaned_skolems(graph_uri)
+
+        seconds = time.perf_counter() - start
+        report = {
+            "graph": str(graph_uri),
+            "mode": mode if sent or deleted else "unchanged",
+            "triples_total": total,
+            "triples_sent": sent,
+            "triples_deleted": deleted,
+            "chunks": chunks,
+            "seconds": round(seconds, 3),
+            "triples_per_second": round(total / seconds, 1) if seconds > 0 else None,
+        }
+        print(
+            f"Fuseki load {report['graph']}: {report['mode']}, {sent}/{total} triples sent, {deleted} deleted "
+            f"in {chunks} chunks, {report['seconds']}s ({report['triples_per_second']} triples/s)"
+        )
+        return report
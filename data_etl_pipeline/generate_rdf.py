@@ -1,55 +1,78 @@
 import rdflib
-import yfinance as yf
 from rdflib import Graph, Literal, Namespace, RDF, URIRef, XSD
+from data_etl_pipeline.instrumentation import RDF_TRIPLES_GENERATED
+from data_etl_pipeline.price_series import PriceSeries
+from data_etl_pipeline.price_sidecar import PriceSidecar
+from data_etl_pipeline.providers import price_history, ticker_info
+from data_etl_pipeline.fuseki_loader import ticker_graph_uri
 
 EX = Namespace("http://www.semanticweb.org/viljo/ontologies/2024/financial-ontology#")
 XSD_NS = Namespace("http://www.w3.org/2001/XMLSchema#")
 
-def generate_rdf_for_stock(ticker, years=5):
-    """Generate RDF representation of stock price and financial metrics"""
+def build_stock_graph(ticker, prices, info):
+    """Builds the company, financial metric and stock price triples from a PriceSeries and a ticker info dict."""
+    g = Graph()
+    g.bind("ex", EX)
+    g.bind("xsd", XSD_NS)
+
+    #  Create Company Entity
+    company_uri = URIRef(EX[ticker])
+    g.add((company_uri, RDF.type, EX.Company))
+    g.add((company_uri, EX.ticker, Literal(ticker, datatype=XSD_NS.string)))
+    g.add((company_uri, EX.companyName, Literal(info.get("longName", ticker), datatype=XSD_NS.string)))
+
+    #  Financial Metrics
+    metrics = {
+        "Market Cap": info.get("marketCap"),
+        "P/E Ratio": info.get("trailingPE"),
+        "Revenue": info.get("totalRevenue"),
+        "Debt/Equity": info.get("debtToEquity"),
+    }
+
+    for metric, value in metrics.items():
+        if value is not None:
+            sanitized_metric = metric.replace("/", "_").replace(" ", "_")  #  Fix special characters
+            metric_uri = URIRef(EX[f"{ticker}_{sanitized_metric}"])
+            g.add((metric_uri, RDF.type, EX.FinancialMetric))
+            g.add((metric_uri, EX.metricName, Literal(metric, datatype=XSD_NS.string)))
+            g.add((metric_uri, EX.metricValue, Literal(value, datatype=XSD_NS.float)))
+            g.add((company_uri, EX.hasMetric, metric_uri))
+
+    #  Stock Price Data
+    for date, close, volume in prices.iter_bars():
+        stock_price_uri = URIRef(EX[f"{ticker}_Stock_{date}"])
+        g.add((stock_price_uri, RDF.type, EX.StockPrice))
+        g.add((stock_price_uri, EX.priceDate, Literal(date, datatype=XSD_NS.date)))
+        g.add((stock_price_uri, EX.priceValue, Literal(close, datatype=XSD_NS.float)))
+        g.add((stock_price_uri, EX.volume, Literal(volume, datatype=XSD_NS.integer)))
+        g.add((company_uri, EX.hasStockPrice, stock_price_uri))
+
+    RDF_TRIPLES_GENERATED.inc(len(g), source="generate_rdf")
+    return g
+
+def generate_rdf_for_stock(ticker, years=5, sidecar_path=None, materializer=None, as_graph=False):
+    """Generate RDF representation of stock price and financial metrics.
+
+    When sidecar_path is given, the price bars are also written there as a
+    sorted columnar PriceSidecar for fast date-range reads. When a
+    materializer is given, the triples are added to its dataset in the
+    ticker's named graph and the RDFS closure is updated incrementally.
+    Returns Turtle, or the rdflib Graph itself with as_graph.
+    Errors are printed and None is returned; use build_stock_graph directly
+    when the caller needs to see them.
+    """
     try:
-        stock = yf.Ticker(ticker)
-        hist = stock.history(period=f"{years}y")
-        info = stock.info
-
-        g = Graph()
-        g.bind("ex", EX)
-        g.bind("xsd", XSD_NS)
-
-        #  Create Company Entity
-        company_uri = URIRef(EX[ticker])
-        g.add((company_uri, RDF.type, EX.Company))
-        g.add((company_uri, EX.ticker, Literal(ticker, datatype=XSD_NS.string)))
-        g.add((company_uri, EX.companyName, Literal(info.get("longName", ticker), datatype=XSD_NS.string)))
-
-        #  Financial Metrics
-        metrics = {
-            "Market Cap": info.get("marketCap"),
-            "P/E Ratio": info.get("trailingPE"),
-            "Revenue": info.get("totalRevenue"),
-            "Debt/Equity": info.get("debtToEquity"),
-        }
-
-        for metric, value in metrics.items():
-            if value is not None:
-                sanitized_metric = metric.replace("/", "_").replace(" ", "_")  #  Fix special characters
-                metric_uri = URIRef(EX[f"{ticker}_{sanitized_metric}"])
-                g.add((metric_uri, RDF.type, EX.FinancialMetric))
-                g.add((metric_uri, EX.metricName, Literal(metric, datatype=XSD_NS.string)))
-                g.add((metric_uri, EX.metricValue, Literal(value, datatype=XSD_NS.float)))
-                g.add((company_uri, EX.hasMetric, metric_uri))
-
-        #  Stock Price Data
-        for date, row in hist.iterrows():
-            stock_price_uri = URIRef(EX[f"{ticker}_Stock_{date.date()}"])
-            g.add((stock_price_uri, RDF.type, EX.StockPrice))
-            g.add((stock_price_uri, EX.priceDate, Literal(date.date(), datatype=XSD_NS.date)))
-            g.add((stock_price_uri, EX.priceValue, Literal(row["Close"], datatype=XSD_NS.float)))
-            g.add((company_uri, EX.hasStockPrice, stock_price_uri))
-
-        return g.serialize(format="turtle")
+        prices = PriceSeries.from_history(price_history(ticker, period=f"{years}y"))
+        g = build_stock_graph(ticker, prices, ticker_info(ticker))
+
+        if sidecar_path:
+            PriceSidecar.from_series(prices).save(sidecar_path)
+
+        if materializer is not None:
+            materializer.add(g, ticker_graph_uri(ticker))
+
+        return g if as_graph else g.serialize(format="turtle")
 
     except Exception as e:
         print(f"ERROR: {e}")
         return None
-
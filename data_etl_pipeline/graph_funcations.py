@@ -7,21 +7,19 @@ def parse_rdf_file(rdf_file):
     graph = Graph()
     graph.parse(rdf_file, format='turtle')
 
-    nodes = []
+    nodes = {}
     edges = []
 
     for subj, pred, obj in graph:
-        # Add subject and object as nodes
-        nodes.append({"id": str(subj), "label": subj.split("/")[-1]})
-        nodes.append({"id": str(obj), "label": obj.split("/")[-1]})
+        # Add subject and object as nodes (each only once)
+        for term in (subj, obj):
+            if str(term) not in nodes:
+                nodes[str(term)] = {"id": str(term), "label": term.split("/")[-1]}
 
         # Add the predicate as an edge
         edges.append({"from": str(subj), "to": str(obj), "label": pred.split("/")[-1]})
 
-    # Deduplicate nodes
-    nodes = {node["id"]: node for node in nodes}.values()
-
-    return {"nodes": list(nodes), "edges": edges}
+    return {"nodes": list(nodes.values()), "edges": edges}
 
 # Example Function to Add External Links
 def enhance_rdf_with_links(graph, company_uri, external_id):
@@ -0,0 +1,179 @@
+import hashlib
+from threading import Lock
+
+import numpy as np
+
+from data_etl_pipeline.cache_backend import get_cache_backend
+from data_etl_pipeline.instrumentation import record_cache
+
+DEFAULT_ITERATIONS = 60
+INCREMENTAL_ITERATIONS = 20
+NODE_SPACING = 120.0
+REPULSION_BLOCK = 1024
+LAYOUT_NAMESPACE = "graph-layout"
+
+
+def graph_content_hash(nodes, edges):
+    """Hashes node IDs and edge endpoints, ignoring order and display attributes."""
+    digest = hashlib.sha256()
+    for node_id in sorted(str(node["id"]) for node in nodes):
+        digest.update(node_id.encode("utf-8"))
+        digest.update(b"\0")
+    digest.update(b"\1")
+    for source, target in sorted((str(edge["from"]), str(edge["to"])) for edge in edges):
+        digest.update(f"{source}\0{target}\0".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def force_layout(node_ids, edges, initial=None, iterations=DEFAULT_ITERATIONS, seed=0):
+    """
+    Fruchterman-Reingold layout computed with NumPy array operations.
+
+    Repulsion is evaluated in row blocks so memory stays bounded at
+    REPULSION_BLOCK x n pairs instead of n x n.
+
+    Args:
+        node_ids (list): Node IDs, in output order.
+        edges (list): (from, to) ID pairs; edges to unknown nodes are ignored.
+        initial (dict): Known positions {id: (x, y)}. Those nodes stay pinned and
+            only the remaining ones are simulated, seeded at the centroid of
+            their positioned neighbours (or randomly), so an incremental update
+            costs O(new nodes x n) per step.
+        iterations (int): Number of simulation steps.
+
+    Returns:
+        np.ndarray: (n, 2) positions in vis-network pixel units.
+    """
+    n = len(node_ids)
+    if n == 0:
+        return np.zeros((0, 2))
+    rng = np.random.default_rng(seed)
+    index = {node_id: i for i, node_id in enumerate(node_ids)}
+    pairs = np.array(
+        [(index[a], index[b]) for a, b in edges if a in index and b in index and a != b], dtype=np.int64
+    ).reshape(-1, 2)
+
+    k = NODE_SPACING
+    extent = k * np.sqrt(n)
+    positions = rng.uniform(-extent / 2, extent / 2, size=(n, 2))
+    temperature = extent / 10
+    movable = np.ones(n, dtype=bool)
+
+    if initial:
+        known = np.array([node_id in initial for node_id in node_ids])
+        for i, node_id in enumerate(node_ids):
+            if known[i]:
+                positions[i] = initial[node_id]
+        if known.any():
+            neighbour_sum = np.zeros((n, 2))
+            neighbour_count = np.zeros(n)
+            np.add.at(neighbour_sum, pairs[:, 0], positions[pairs[:, 1]] * known[pairs[:, 1], None])
+            np.add.at(neighbour_count, pairs[:, 0], known[pairs[:, 1]])
+            np.add.at(neighbour_sum, pairs[:, 1], positions[pairs[:, 0]] * known[pairs[:, 0], None])
+            np.add.at(neighbour_count, pairs[:, 1], known[pairs[:, 0]])
+            seeded = ~known & (neighbour_count > 0)
+            positions[seeded] = neighbour_sum[seeded] / neighbour_count[seeded, None] + rng.normal(0, k / 2, size=(seeded.sum(), 2))
+            movable = ~known
+            temperature = k
+
+    moving = np.flatnonzero(movable)
+    if len(moving) == 0:
+        return positions
+    if len(pairs) and not movable.all():
+        pairs = pairs[movable[pairs[:, 0]] | movable[pairs[:, 1]]]
+
+    x, y = positions[:, 0].copy(), positions[:, 1].copy()
+    cooling = temperature / max(iterations, 1)
+    for _ in range(iterations):
+        disp_x = np.zeros(n)
+        disp_y = np.zeros(n)
+        for start in range(0, len(moving), REPULSION_BLOCK):
+            rows = moving[start:start + REPULSION_BLOCK]
+            dx = x[rows, None] - x[None, :]
+            dy = y[rows, None] - y[None, :]
+            force = (k * k) / np.maximum(dx * dx + dy * dy, 1e-2)
+            disp_x[rows] = (dx * force).sum(axis=1)
+            disp_y[rows] = (dy * force).sum(axis=1)
+
+        if len(pairs):
+            dx = x[pairs[:, 0]] - x[pairs[:, 1]]
+            dy = y[pairs[:, 0]] - y[pairs[:, 1]]
+            scale = np.sqrt(dx * dx + dy * dy) / k
+            disp_x -= np.bincount(pairs[:, 0], dx * scale, n) - np.bincount(pairs[:, 1], dx * scale, n)
+            disp_y -= np.bincount(pairs[:, 0], dy * scale, n) - np.bincount(pairs[:, 1], dy * scale, n)
+
+        length = np.maximum(np.sqrt(disp_x * disp_x + disp_y * disp_y), 1e-9)
+        step = np.minimum(length, temperature) / length * movable
+        x += disp_x * step
+        y += disp_y * step
+        temperature = max(temperature - cooling, 1.0)
+
+    positions = np.column_stack((x, y))
+    if movable.all():
+        positions -= positions.mean(axis=0)
+    return positions
+
+
+class LayoutCache:
+    def __init__(self):
+        """
+        Cache of layouts keyed by graph content hash, kept in the cache backend.
+
+        The latest layout per scope (e.g. one ticker's graph view) is also
+        remembered, so when that graph gains nodes the new layout is seeded
+        from the old positions instead of starting over.
+        """
+        self._latest = {}
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def positions(self, nodes, edges, scope=None):
+        """Returns ({id: (x, y)}, content hash, cache hit flag) for a node/edge list."""
+        content_hash = graph_content_hash(nodes, edges)
+        backend = get_cache_backend()
+        cached = backend.get(LAYOUT_NAMESPACE, content_hash)
+        record_cache(LAYOUT_NAMESPACE, cached is not None)
+        with self._lock:
+            if cached is not None:
+                self.hits += 1
+                if scope is not None:
+                    self._latest[scope] = content_hash
+                return cached, content_hash, True
+            self.misses += 1
+            previous_hash = self._latest.get(scope) if scope is not None else None
+        previous = backend.get(LAYOUT_NAMESPACE, previous_hash) if previous_hash else None
+
+        node_ids = [str(node["id"]) for node in nodes]
+        edge_pairs = [(str(edge["from"]), str(edge["to"])) for edge in edges]
+        if previous:
+            coords = force_layout(node_ids, edge_pairs, initial=previous, iterations=INCREMENTAL_ITERATIONS)
+        else:
+            coords = force_layout(node_ids, edge_pairs)
+        layout = {node_id: (round(float(x), 1), round(float(y), 1)) for node_id, (x, y) in zip(node_ids, coords)}
+
+        backend.set(LAYOUT_NAMESPACE, content_hash, layout)
+        with self._lock:
+            if scope is not None:
+                self._latest[scope] = content_hash
+        return layout, content_hash, False
+
+    def apply(self, graph_json, scope=None):
+        """
+        Adds x/y coordinates to a vis-network {"nodes", "edges"} dict in place.
+
+        Also sets graph_json["layout"], telling the client it can disable
+        physics stabilization.
+        """
+        layout, content_hash, hit = self.positions(graph_json["nodes"], graph_json["edges"], scope)
+        for node in graph_json["nodes"]:
+            node["x"], node["y"] = layout[str(node["id"])]
+        graph_json["layout"] = {"hash": content_hash, "cached": hit, "physics": False}
+        return graph_json
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+
+layout_cache = LayoutCache()
@@ -0,0 +1,213 @@
+from collections import defaultdict, deque
+
+from rdflib import Graph, Literal, URIRef
+from rdflib.namespace import RDF
+
+from data_etl_pipeline.price_sidecar import PRICE_VOCABULARIES
+
+DEFAULT_PAGE_SIZE = 200
+MAX_PAGE_SIZE = 2000
+MAX_DEPTH = 3
+
+STOCK_PRICE_CLASSES = {URIRef(price_class) for price_class, _, _, _ in PRICE_VOCABULARIES}
+PRICE_DATE_PREDICATES = {URIRef(date_predicate) for _, date_predicate, _, _ in PRICE_VOCABULARIES}
+PRICE_VALUE_PREDICATES = {URIRef(price_predicate) for _, _, price_predicate, _ in PRICE_VOCABULARIES}
+
+NODE_COLORS = {"Company": "#4caf50", "FinancialMetric": "#ff9800", "StockPrice": "#2196f3", "NewsArticle": "#9c27b0"}
+
+
+def local_name(term):
+    """Returns the fragment or last path segment of an IRI."""
+    text = str(term)
+    return text.rsplit("#", 1)[-1] if "#" in text else text.rstrip("/").rsplit("/", 1)[-1]
+
+
+class GraphIndex:
+    def __init__(self, graph):
+        """
+        Builds adjacency indexes over a graph once, so views never rescan its triples.
+
+        Resources become nodes; literals are kept per node and shown as tooltip
+        properties rather than as nodes of their own.
+        """
+        self.out_edges = defaultdict(list)
+        self.in_edges = defaultdict(list)
+        self.literals = defaultdict(list)
+        self.types = defaultdict(set)
+        self.by_name = defaultdict(list)
+
+        for s, p, o in graph:
+            if p == RDF.type:
+                self.types[s].add(o)
+            elif isinstance(o, Literal):
+                self.literals[s].append((p, o))
+            else:
+                self.out_edges[s].append((p, o))
+                self.in_edges[o].append((p, s))
+
+        nodes = set(self.out_edges) | set(self.in_edges) | set(self.literals) | set(self.types)
+        for node in nodes:
+            self.by_name[local_name(node)].append(node)
+        # Stable neighbour order, so pages are repeatable across requests
+        for edges in (self.out_edges, self.in_edges):
+            for node in edges:
+                edges[node].sort()
+        self.node_count = len(nodes)
+
+    @classmethod
+    def from_file(cls, path, format="turtle"):
+        graph = Graph()
+        graph.parse(path, format=format)
+        return cls(graph)
+
+    def type_names(self, node):
+        return {local_name(cls) for cls in self.types.get(node, ())}
+
+    def resolve(self, root):
+        """Finds a node by full IRI or local name."""
+        if root is None:
+            return None
+        node = URIRef(root)
+        if node in self.types or node in self.out_edges or node in self.in_edges:
+            return node
+        matches = self.by_name.get(root) or self.by_name.get(root.split(":")[-1])
+        return sorted(matches)[0] if matches else None
+
+    def default_roots(self):
+        """Company nodes, or the best-connected node when the graph has none."""
+        companies = sorted(node for node in self.types if "Company" in self.type_names(node))
+        if companies:
+            return companies
+        if not self.out_edges:
+            return []
+        return [max(self.out_edges, key=lambda node: (len(self.out_edges[node]), str(node)))]
+
+    def is_stock_price(self, node):
+        return not STOCK_PRICE_CLASSES.isdisjoint(self.types.get(node, ()))
+
+    def node_json(self, node, hop):
+        types = sorted(self.type_names(node))
+        properties = [f"{local_name(p)}: {o}" for p, o in self.literals.get(node, ())[:12]]
+        return {
+            "id": str(node),
+            "label": local_name(node),
+            "title": "\n".join(([f"type: {', '.join(types)}"] if types else []) + properties),
+            "group": types[0] if types else None,
+            "color": NODE_COLORS.get(types[0], "#9e9e9e") if types else "#9e9e9e",
+            "hop": hop,
+        }
+
+    def price_series_json(self, owner, prices, hop):
+        """Summarizes a node's StockPrice neighbours as a single time-series node."""
+        bars = []
+        for price in prices:
+            literals = dict(self.literals.get(price, ()))
+            date = next((literals[p] for p in PRICE_DATE_PREDICATES if p in literals), None)
+            value = next((literals[p] for p in PRICE_VALUE_PREDICATES if p in literals), None)
+            if date is not None and value is not None:
+                bars.append((str(date), float(value)))
+        bars.sort()
+
+        summary = {"bars": len(prices)}
+        if bars:
+            closes = [value for _, value in bars]
+            summary.update({
+                "first_date": bars[0][0],
+                "last_date": bars[-1][0],
+                "first_close": closes[0],
+                "last_close": closes[-1],
+                "min_close": min(closes),
+                "max_close": max(closes),
+            })
+        title = "\n".join(f"{key}: {value}" for key, value in summary.items())
+        return {
+            "id": f"{owner}#StockPriceSeries",
+            "label": f"StockPrice series ({len(prices)} bars)",
+            "title": title,
+            "group": "StockPriceSeries",
+            "color": NODE_COLORS["StockPrice"],
+            "shape": "box",
+            "hop": hop,
+            "summary": summary,
+        }
+
+    def neighborhood(self, root=None, depth=1, page=1, page_size=DEFAULT_PAGE_SIZE, types=None, aggregate=True):
+        """
+        Returns one page of the nodes within `depth` hops of `root` as vis-network JSON.
+
+        Nodes are ordered by hop distance then IRI and paged in that order; a
+        page carries only edges whose endpoints are both on it or on an
+        earlier page. When `types` is given, only nodes of those classes (by
+        local name) are shown and expanded; the root is always shown. With
+        `aggregate`, the StockPrice neighbours of each node collapse into one
+        summary node and are not expanded further.
+        """
+        depth = max(0, min(int(depth), MAX_DEPTH))
+        page = max(1, int(page))
+        page_size = max(1, min(int(page_size), MAX_PAGE_SIZE))
+        types = set(types) if types else None
+
+        roots = [self.resolve(root)] if root else self.default_roots()
+        roots = [node for node in roots if node is not None]
+        if root and not roots:
+            raise KeyError(f"Node not found: {root}")
+
+        hops = {node: 0 for node in roots}
+        order = list(roots)
+        series = {}
+        edges = []
+        queue = deque(roots)
+
+        while queue:
+            node = queue.popleft()
+            if hops[node] >= depth:
+                continue
+            hop = hops[node] + 1
+            prices = []
+            neighbours = [(p, o, False) for p, o in self.out_edges.get(node, ())]
+            neighbours += [(p, s, True) for p, s in self.in_edges.get(node, ())]
+
+            for predicate, other, incoming in neighbours:
+                if aggregate and self.is_stock_price(other):
+                    prices.append(other)
+                    continue
+                if types is not None and not types & self.type_names(other):
+                    continue
+                edge = (other, predicate, node) if incoming else (node, predicate, other)
+                edges.append(edge)
+                if other not in hops:
+                    hops[other] = hop
+                    order.append(other)
+                    queue.append(other)
+
+            if prices and (types is None or "StockPrice" in types):
+                series_id = f"{node}#StockPriceSeries"
+                series[series_id] = self.price_series_json(node, prices, hop)
+                hops[series_id] = hop
+                order.append(series_id)
+                edges.append((node, "hasStockPrice", series_id))
+
+        order.sort(key=lambda node: (hops[node], str(node)))
+        start = (page - 1) * page_size
+        page_nodes = order[start:start + page_size]
+        visible = set(order[:start + page_size])
+        on_page = set(page_nodes)
+
+        page_edges = []
+        seen_edges = set()
+        for s, p, o in edges:
+            if (s, p, o) in seen_edges or not ((s in on_page and o in visible) or (o in on_page and s in visible)):
+                continue
+            seen_edges.add((s, p, o))
+            page_edges.append({"from": str(s), "to": str(o), "label": local_name(p)})
+
+        return {
+            "nodes": [series[node] if node in series else self.node_json(node, hops[node]) for node in page_nodes],
+            "edges": page_edges,
+            "roots": [str(node) for node in roots],
+            "depth": depth,
+            "page": page,
+            "page_size": page_size,
+            "total_nodes": len(order),
+            "has_more": start + page_size < len(order),
+        }
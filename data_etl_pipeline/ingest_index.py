@@ -0,0 +1,67 @@
+import os
+import sqlite3
+import time
+from threading import Lock
+
+DEFAULT_INDEX_PATH = os.path.join("rdf_data", "ingest_index.sqlite3")
+
+
+class SeenIndex:
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        """Initializes a persistent index of identifiers that have already been ingested."""
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS seen ("
+            " namespace TEXT NOT NULL,"
+            " id TEXT NOT NULL,"
+            " first_seen REAL NOT NULL,"
+            " PRIMARY KEY (namespace, id))"
+        )
+        self._conn.commit()
+
+    def contains(self, namespace, item_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM seen WHERE namespace = ? AND id = ?", (namespace, item_id)
+            ).fetchone()
+        return row is not None
+
+    def unseen(self, namespace, item_ids):
+        """Returns the subset of item_ids that are not in the index yet."""
+        item_ids = list(dict.fromkeys(item_ids))
+        seen = set()
+        with self._lock:
+            for start in range(0, len(item_ids), 500):
+                batch = item_ids[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT id FROM seen WHERE namespace = ? AND id IN ({placeholders})", [namespace, *batch]
+                )
+                seen.update(row[0] for row in rows)
+        return [item_id for item_id in item_ids if item_id not in seen]
+
+    def mark(self, namespace, item_ids):
+        """Records identifiers as ingested."""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO seen (namespace, id, first_seen) VALUES (?, ?, ?)",
+                [(namespace, item_id, now) for item_id in item_ids],
+            )
+            self._conn.commit()
+
+    def count(self, namespace=None):
+        with self._lock:
+            if namespace is None:
+                return self._conn.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+            return self._conn.execute("SELECT COUNT(*) FROM seen WHERE namespace = ?", (namespace,)).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,226 @@
+"""
+In-process metrics for the API and the pipeline, exposed in the Prometheus
+text format (flask_api.metrics serves them at /metrics).
+
+    with upstream_call("finnhub", "profile"):
+        response = requests.get(url)
+
+Recording a sample is a dict lookup and a few additions under a per-metric
+lock. Values are per process: with several API workers, scrape each worker
+(or give each its own port) and aggregate in Prometheus.
+"""
+import math
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from threading import Lock
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers cached responses (ms) through cold RDF generation (tens of seconds)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = Lock()
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def _key(self, labels):
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+            lines.extend(self._render_samples(items))
+        return lines
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def _render_samples(self, items):
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS, registry=None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)  # first bucket with upper bound >= value
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # per-bucket (non-cumulative) counts + the +Inf bucket, then sum
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels):
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return sum(state[0]) if state else 0
+
+    def _render_samples(self, items):
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, [("le", _format_value(bound))])
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "vilcorp_http_request_duration_seconds",
+    "Time spent serving HTTP requests, by app, route template, method and status.",
+    ("app", "endpoint", "method", "status"),
+)
+UPSTREAM_REQUEST_SECONDS = Histogram(
+    "vilcorp_upstream_request_duration_seconds",
+    "Calls to external providers (yfinance, newsapi, finnhub, wikidata, fuseki), by operation and outcome.",
+    ("provider", "operation", "outcome"),
+)
+CACHE_REQUESTS = Counter(
+    "vilcorp_cache_requests_total",
+    "Cache lookups by cache namespace and result (hit or miss).",
+    ("cache", "result"),
+)
+RDF_TRIPLES_GENERATED = Counter(
+    "vilcorp_rdf_triples_generated_total",
+    "RDF triples produced by the pipeline, by generator.",
+    ("source",),
+)
+SPARQL_QUERY_SECONDS = Histogram(
+    "vilcorp_sparql_query_duration_seconds",
+    "SPARQL execution time by catalogue query name ('adhoc' for free-form queries).",
+    ("query",),
+)
+
+
+class _UpstreamCall:
+    __slots__ = ("outcome",)
+
+    def __init__(self):
+        self.outcome = "ok"
+
+
+@contextmanager
+def upstream_call(provider, operation):
+    """
+    Times one call to an external provider. The outcome is "error" when the
+    block raises; set call.outcome (e.g. to an HTTP status) to override it.
+    """
+    call = _UpstreamCall()
+    start = time.perf_counter()
+    try:
+        yield call
+    except BaseException:
+        call.outcome = "error"
+        raise
+    finally:
+        UPSTREAM_REQUEST_SECONDS.observe(
+            time.perf_counter() - start, provider=provider, operation=operation, outcome=call.outcome
+        )
+
+
+def timed_upstream(provider, operation, func, *args, **kwargs):
+    """Calls func(*args, **kwargs) inside upstream_call(provider, operation)."""
+    with upstream_call(provider, operation):
+        return func(*args, **kwargs)
+
+
+def http_outcome(status_code):
+    """Outcome label for an HTTP response: "ok" for 2xx, otherwise the status code."""
+    return "ok" if 200 <= status_code < 300 else str(status_code)
+
+
+def record_cache(cache, hit):
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def render_metrics(registry=None):
+    return (registry or REGISTRY).render()
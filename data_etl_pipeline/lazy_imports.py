@@ -0,0 +1,37 @@
+"""
+Deferred imports for heavy optional dependencies.
+
+    yf = lazy_module("yfinance")
+
+binds a stand-in that imports yfinance the first time an attribute is used,
+so importing the API (or a pipeline module) does not pay for it up front.
+"""
+import importlib
+import sys
+import types
+
+
+class LazyModule(types.ModuleType):
+    def __init__(self, name):
+        """Module proxy; every attribute lookup is forwarded to the real module, imported on first use."""
+        super().__init__(name)
+
+    def _load(self):
+        # import_module holds the import system's per-module lock, so concurrent
+        # first uses import once; afterwards it is a sys.modules lookup
+        return importlib.import_module(self.__name__)
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        return f"<lazy module '{self.__name__}'>"
+
+
+def lazy_module(name):
+    """Returns the module if it is already imported, otherwise a LazyModule for it."""
+    module = sys.modules.get(name)
+    return module if module is not None else LazyModule(name)
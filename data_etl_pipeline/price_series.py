@@ -0,0 +1,143 @@
+import numpy as np
+import pandas as pd
+
+SECONDS_PER_DAY = 86400
+
+
+def to_epoch_day(value):
+    """Converts a date-like value into days since 1970-01-01."""
+    return int(np.datetime64(pd.Timestamp(value).date(), "D").astype(np.int64))
+
+
+def _column(values, dtype):
+    """Returns values as a contiguous array of dtype, without copying when it already is one."""
+    return np.ascontiguousarray(values, dtype=dtype)
+
+
+class PriceSeries:
+    """
+    Daily close/volume bars in three parallel arrays sorted by date:
+    days (int64 days since 1970-01-01), close (float64) and volume (int64).
+    Days are exchange calendar days; tz keeps the exchange timezone of the
+    source history (None when it had none) so frames round-trip unchanged.
+
+    This is the form price history travels in between the extractors, the
+    prediction handlers, the RDF generators and the serializers. Building
+    one from a history frame, slicing it by date and handing it back as a
+    DataFrame reuse the underlying buffers instead of copying them, so a
+    series shares memory with its source and must be treated as read-only.
+    """
+
+    __slots__ = ("days", "close", "volume", "tz")
+
+    def __init__(self, days, close, volume, tz=None):
+        days = _column(days, np.int64)
+        close = _column(close, np.float64)
+        volume = _column(volume, np.int64)
+        if len(days) > 1 and not (days[1:] >= days[:-1]).all():
+            order = np.argsort(days, kind="stable")
+            days, close, volume = days[order], close[order], volume[order]
+        self.days = days
+        self.close = close
+        self.volume = volume
+        self.tz = tz
+
+    def __len__(self):
+        return len(self.days)
+
+    def __repr__(self):
+        if not len(self):
+            return "PriceSeries(0 bars)"
+        return f"PriceSeries({len(self)} bars, {self.dates[0]} to {self.dates[-1]})"
+
+    @property
+    def empty(self):
+        return len(self.days) == 0
+
+    @property
+    def dates(self):
+        """The days as a datetime64[D] view."""
+        return self.days.view("datetime64[D]")
+
+    @classmethod
+    def empty_series(cls):
+        return cls(np.empty(0, np.int64), np.empty(0, np.float64), np.empty(0, np.int64))
+
+    @classmethod
+    def from_history(cls, history):
+        """
+        Builds a series from a yfinance history frame (DatetimeIndex, Close, Volume).
+
+        Close and Volume are viewed, not copied, when they already are float64/int64.
+        Bars are dated by their local (exchange) calendar day.
+        """
+        if history is None or history.empty:
+            return cls.empty_series()
+        index = pd.DatetimeIndex(history.index)
+        tz = index.tz
+        if tz is not None:
+            index = index.tz_localize(None)
+        days = index.values.astype("datetime64[D]").view(np.int64)
+        volume = history["Volume"] if "Volume" in history else np.zeros(len(history), np.int64)
+        if getattr(volume, "hasnans", False):
+            volume = volume.fillna(0)
+        return cls(days, np.asarray(history["Close"], dtype=np.float64), np.asarray(volume).astype(np.int64, copy=False), tz)
+
+    @classmethod
+    def from_frame(cls, frame, date="isRecordedOn", close="priceValue", volume="volume"):
+        """Builds a series from a frame in the extractor layout (isRecordedOn, priceValue, volume)."""
+        if frame is None or frame.empty:
+            return cls.empty_series()
+        return cls.from_history(pd.DataFrame(
+            {"Close": frame[close], "Volume": frame[volume] if volume in frame else 0},
+            index=pd.DatetimeIndex(frame[date]),
+        ))
+
+    def slice(self, start_date=None, end_date=None):
+        """
+        Returns the bars with start_date <= date <= end_date as a new series
+        viewing this one's arrays. Both bounds are inclusive, matching the
+        SPARQL FILTER on xsd:date.
+        """
+        lo = 0 if start_date is None else np.searchsorted(self.days, to_epoch_day(start_date), side="left")
+        hi = len(self.days) if end_date is None else np.searchsorted(self.days, to_epoch_day(end_date), side="right")
+        return self._view(lo, hi)
+
+    def tail(self, bars):
+        return self._view(max(len(self.days) - bars, 0), len(self.days))
+
+    def _view(self, lo, hi):
+        series = PriceSeries.__new__(PriceSeries)
+        series.days, series.close, series.volume = self.days[lo:hi], self.close[lo:hi], self.volume[lo:hi]
+        series.tz = self.tz
+        return series
+
+    def days_since_start(self):
+        """Calendar days since the first bar, the regression feature used by the prediction endpoints."""
+        return self.days - self.days[0] if len(self.days) else self.days
+
+    def to_frame(self, date="isRecordedOn", close="priceValue", volume="volume"):
+        """
+        Returns the series as a DataFrame in the extractor layout, dated at
+        midnight in the series' timezone. Close and volume columns view the
+        series' arrays; pass volume=None to leave that column out.
+        """
+        dates = (self.days * SECONDS_PER_DAY).view("datetime64[s]")
+        if self.tz is not None:
+            dates = pd.DatetimeIndex(dates).tz_localize(self.tz)
+        columns = {date: dates, close: self.close}
+        if volume is not None:
+            columns[volume] = self.volume
+        return pd.DataFrame(columns, copy=False)
+
+    def iter_bars(self):
+        """Yields (datetime.date, close, volume) as plain Python values."""
+        return zip(self.dates.tolist(), self.close.tolist(), self.volume.tolist())
+
+    def records(self):
+        """The bars as {"isRecordedOn": ISO date, "priceValue", "volume"} dicts."""
+        dates = self.dates.astype(str).tolist()
+        return [
+            {"isRecordedOn": date, "priceValue": price, "volume": bar_volume}
+            for date, price, bar_volume in zip(dates, self.close.tolist(), self.volume.tolist())
+        ]
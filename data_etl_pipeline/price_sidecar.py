@@ -0,0 +1,109 @@
+import os
+import tempfile
+
+import numpy as np
+from rdflib import URIRef
+from rdflib.namespace import RDF, XSD
+
+from data_etl_pipeline.price_series import PriceSeries, to_epoch_day
+
+SIDECAR_SUFFIX = ".prices.npz"
+
+# (class, date, price, volume) predicates used by the two RDF generators.
+PRICE_VOCABULARIES = [
+    (
+        "http://www.semanticweb.org/viljo/ontologies/2024/financial-ontology#StockPrice",
+        "http://www.semanticweb.org/viljo/ontologies/2024/financial-ontology#priceDate",
+        "http://www.semanticweb.org/viljo/ontologies/2024/financial-ontology#priceValue",
+        "http://www.semanticweb.org/viljo/ontologies/2024/financial-ontology#volume",
+    ),
+    (
+        "http://www.semanticweb.org/viljo/ontologies/2024/10/untitled-ontology-3/StockPrice",
+        "http://www.semanticweb.org/viljo/ontologies/2024/10/untitled-ontology-3/isRecordedOn",
+        "http://www.semanticweb.org/viljo/ontologies/2024/10/untitled-ontology-3/priceValue",
+        "http://www.semanticweb.org/viljo/ontologies/2024/10/untitled-ontology-3/volume",
+    ),
+]
+
+
+def sidecar_path_for(rdf_file_path):
+    """Returns the sidecar path stored next to an RDF file."""
+    return os.path.splitext(rdf_file_path)[0] + SIDECAR_SUFFIX
+
+
+class PriceSidecar(PriceSeries):
+    """The PriceSeries of a company's StockPrice bars, saved next to its RDF."""
+
+    __slots__ = ()
+
+    @classmethod
+    def from_series(cls, series):
+        sidecar = cls.__new__(cls)
+        sidecar.days, sidecar.close, sidecar.volume, sidecar.tz = series.days, series.close, series.volume, series.tz
+        return sidecar
+
+    @classmethod
+    def from_graph(cls, graph):
+        """Builds a sidecar from the StockPrice resources of an RDF graph."""
+        days, close, volume = [], [], []
+        for price_class, date_predicate, price_predicate, volume_predicate in PRICE_VOCABULARIES:
+            for stock_price in graph.subjects(RDF.type, URIRef(price_class)):
+                date = graph.value(stock_price, URIRef(date_predicate))
+                price = graph.value(stock_price, URIRef(price_predicate))
+                if date is None or price is None:
+                    continue
+                bar_volume = graph.value(stock_price, URIRef(volume_predicate))
+                days.append(to_epoch_day(date.toPython()))
+                close.append(float(price))
+                volume.append(int(bar_volume) if bar_volume is not None else 0)
+        return cls(days, close, volume)
+
+    def save(self, path):
+        """Writes the sidecar atomically so readers never see a partial file."""
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                np.savez(handle, days=self.days, close=self.close, volume=self.volume)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as arrays:
+            sidecar = cls.__new__(cls)
+            sidecar.days = arrays["days"]
+            sidecar.close = arrays["close"]
+            sidecar.volume = arrays["volume"]
+            sidecar.tz = None
+            return sidecar
+
+    def range(self, start_date=None, end_date=None):
+        """
+        Returns (days, close, volume) views for bars with start_date <= date <= end_date.
+
+        Matches the SPARQL FILTER on xsd:date: both bounds inclusive, ordered by date.
+        """
+        bars = self.slice(start_date, end_date)
+        return bars.days, bars.close, bars.volume
+
+    def range_bindings(self, start_date=None, end_date=None):
+        """Returns a range in the SPARQL JSON results layout used by stock_price_query."""
+        days, close, volume = self.range(start_date, end_date)
+        dates = days.view("datetime64[D]").astype(str).tolist()
+        bindings = [
+            {
+                "date": {"type": "literal", "datatype": str(XSD.date), "value": date},
+                "price": {"type": "literal", "datatype": str(XSD.float), "value": repr(float(price))},
+                "volume": {"type": "literal", "datatype": str(XSD.integer), "value": str(int(bar_volume))},
+            }
+            for date, price, bar_volume in zip(dates, close, volume)
+        ]
+        return {"head": {"vars": ["date", "price", "volume"]}, "results": {"bindings": bindings}}
+
+    def range_records(self, start_date=None, end_date=None):
+        """Returns a range as the record dicts served by the stock price endpoints."""
+        return self.slice(start_date, end_date).records()
@@ -0,0 +1,276 @@
+"""
+Single entry point for calls to external data providers (yfinance, NewsAPI,
+Finnhub, Wikidata), with record/replay for offline and load testing.
+
+    live    call the provider (default)
+    record  call the provider and save each response under VILCORP_PROVIDER_DIR
+    replay  serve saved responses only; a call that was never recorded raises ReplayMissError
+
+Select with VILCORP_PROVIDER_MODE=live|record|replay. Replayed calls wait
+VILCORP_REPLAY_LATENCY_MS before returning: a number of milliseconds, a
+per-provider list such as "yfinance=150,finnhub=80,*=20", or "recorded" for
+the latency measured when the response was recorded.
+
+Responses are keyed by provider, operation and request parameters, with
+credentials (token, apiKey, ...) left out of the key and never written to disk.
+Keys are normalized so a recording replays on other days and against other
+hosts: URLs are reduced to their path, and date parameters of a request whose
+window ends today are stored as offsets from today ("today-30d").
+
+Recordings are pickles signed with HMAC-SHA256, and replay refuses files whose
+signature does not verify instead of unpickling them. The key comes from
+VILCORP_RECORDING_SECRET, else a per-user key file under ~/.config/vilcorp;
+set the same secret on every machine that shares a recordings directory.
+"""
+import hashlib
+import hmac
+import json
+import os
+import pickle
+import re
+import tempfile
+import time
+from datetime import date, datetime
+from functools import lru_cache
+from threading import Lock
+from urllib.parse import urlsplit
+
+from data_etl_pipeline.cache_backend import ensure_private_directory, load_or_create_secret
+from data_etl_pipeline.instrumentation import http_outcome, upstream_call
+from data_etl_pipeline.lazy_imports import lazy_module
+
+yf = lazy_module("yfinance")
+
+PROVIDER_MODE_ENV = "VILCORP_PROVIDER_MODE"
+PROVIDER_DIR_ENV = "VILCORP_PROVIDER_DIR"
+REPLAY_LATENCY_ENV = "VILCORP_REPLAY_LATENCY_MS"
+RECORDING_SECRET_ENV = "VILCORP_RECORDING_SECRET"
+
+MODES = ("live", "record", "replay")
+DEFAULT_PROVIDER_DIR = "provider_recordings"
+DEFAULT_HTTP_TIMEOUT = 30
+REDACTED_PARAMS = {"token", "apikey", "api_key", "key"}
+
+_overrides = {}
+_overrides_lock = Lock()
+
+_ISO_DATE = re.compile(r"^(\d{4}-\d{2}-\d{2})(?:[T ].*)?$")
+
+
+class ReplayMissError(LookupError):
+    pass
+
+
+def provider_mode():
+    mode = os.environ.get(PROVIDER_MODE_ENV, "live").lower()
+    if mode not in MODES:
+        raise ValueError(f"Unknown provider mode '{mode}' (expected one of {', '.join(MODES)})")
+    return mode
+
+
+def recordings_directory():
+    return os.environ.get(PROVIDER_DIR_ENV, DEFAULT_PROVIDER_DIR)
+
+
+def replay_latency(provider, recorded_seconds):
+    """Seconds to wait before returning a replayed response."""
+    setting = os.environ.get(REPLAY_LATENCY_ENV, "0").strip()
+    if setting == "recorded":
+        return recorded_seconds or 0.0
+    if "=" not in setting:
+        return float(setting or 0) / 1000
+    latencies = dict(part.split("=", 1) for part in setting.split(",") if "=" in part)
+    return float(latencies.get(provider, latencies.get("*", 0))) / 1000
+
+
+def set_override(provider, handler):
+    """
+    Serves a provider from handler(operation, params) instead of the network,
+    in every mode. Used by the load-test harness to plug in synthetic data;
+    pass handler=None to remove the override.
+    """
+    with _overrides_lock:
+        if handler is None:
+            _overrides.pop(provider, None)
+        else:
+            _overrides[provider] = handler
+
+
+def _clean_params(params):
+    return {str(k): v for k, v in sorted((params or {}).items()) if str(k).lower() not in REDACTED_PARAMS}
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    match = _ISO_DATE.match(value) if isinstance(value, str) else None
+    return date.fromisoformat(match.group(1)) if match else None
+
+
+def relative_dates(params, today=None):
+    """
+    Rewrites the dates of a trailing window (one whose latest date is today)
+    as "today-<n>d", so "the last year up to today" has the same key every
+    day. Requests for a fixed past range keep their absolute dates.
+    """
+    today = today or date.today()
+    dates = {key: _as_date(value) for key, value in params.items()}
+    dates = {key: value for key, value in dates.items() if value is not None}
+    if not dates or max(dates.values()) != today:
+        return params
+    return dict(params, **{
+        key: "today" if value == today else f"today-{(today - value).days}d" for key, value in dates.items()
+    })
+
+
+def recording_key(provider, operation, params):
+    """The normalized parameters a recording is stored under."""
+    params = _clean_params(params)
+    if isinstance(params.get("url"), str):
+        params["url"] = urlsplit(params["url"]).path or "/"
+    return relative_dates(params)
+
+
+def recording_path(provider, operation, params, directory=None):
+    key = json.dumps([provider, operation, recording_key(provider, operation, params)], sort_keys=True, default=str)
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+    return os.path.join(directory or recordings_directory(), provider, operation, digest + ".pkl")
+
+
+@lru_cache(maxsize=1)
+def _user_recording_secret():
+    directory = ensure_private_directory(os.path.join(os.path.expanduser("~"), ".config", "vilcorp"))
+    return load_or_create_secret(directory, "recordings.key")
+
+
+def recording_secret():
+    secret = os.environ.get(RECORDING_SECRET_ENV)
+    return secret.encode("utf-8") if secret else _user_recording_secret()
+
+
+def _sign(payload):
+    return hmac.new(recording_secret(), payload, hashlib.sha256).digest()
+
+
+def _load_recording(path):
+    """Unpickles a recording after checking its signature; raises ValueError for unsigned or tampered files."""
+    with open(path, "rb") as handle:
+        data = handle.read()
+    signature, payload = data[:32], data[32:]
+    if len(signature) < 32 or not hmac.compare_digest(signature, _sign(payload)):
+        raise ValueError(f"Recording {path} is unsigned or signed with a different key ({RECORDING_SECRET_ENV}); not loading it")
+    return pickle.loads(payload)
+
+
+def _save_recording(path, record):
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    payload = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(_sign(payload) + payload)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def provider_call(provider, operation, params, fetch, outcome=None):
+    """
+    Returns fetch() (live), fetch() saved to disk (record) or the saved
+    response (replay) for one provider request.
+
+    Args:
+        provider (str): "yfinance", "newsapi", "finnhub", "wikidata", ...
+        operation (str): Provider operation, e.g. "history".
+        params (dict): Request parameters identifying the response.
+        fetch (callable): Makes the live request.
+        outcome (callable): Maps the result to the metrics outcome label.
+    """
+    handler = _overrides.get(provider)
+    if handler is not None:
+        return handler(operation, dict(params or {}))
+
+    mode = provider_mode()
+    if mode == "replay":
+        path = recording_path(provider, operation, params)
+        with upstream_call(provider, operation) as call:
+            call.outcome = "replay"
+            try:
+                record = _load_recording(path)
+            except FileNotFoundError:
+                call.outcome = "replay-miss"
+                raise ReplayMissError(
+                    f"No recording for {provider}.{operation} {recording_key(provider, operation, params)}"
+                ) from None
+            delay = replay_latency(provider, record.get("seconds"))
+            if delay > 0:
+                time.sleep(delay)
+        return record["value"]
+
+    start = time.perf_counter()
+    with upstream_call(provider, operation) as call:
+        value = fetch()
+        if outcome is not None:
+            call.outcome = outcome(value)
+    if mode == "record":
+        _save_recording(recording_path(provider, operation, params), {
+            "provider": provider,
+            "operation": operation,
+            "params": recording_key(provider, operation, params),
+            "recorded_at": time.time(),
+            "seconds": time.perf_counter() - start,
+            "value": value,
+        })
+    return value
+
+
+class HTTPResponse:
+    __slots__ = ("status_code", "content", "headers", "url")
+
+    def __init__(self, status_code, content, headers=None, url=None):
+        """The parts of a requests.Response the callers use; picklable, so it can be recorded."""
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+        self.url = url
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+def http_get(provider, operation, url, params=None, headers=None, timeout=DEFAULT_HTTP_TIMEOUT):
+    """GET through the provider layer; returns an HTTPResponse."""
+    import requests
+
+    def fetch():
+        response = requests.get(url, params=params, headers=headers, timeout=timeout)
+        content_type = response.headers.get("Content-Type")
+        return HTTPResponse(response.status_code, response.content,
+                            {"Content-Type": content_type} if content_type else {}, url)
+
+    return provider_call(provider, operation, dict(params or {}, url=url), fetch,
+                         outcome=lambda response: http_outcome(response.status_code))
+
+
+def price_history(ticker, **kwargs):
+    """yfinance Ticker.history(**kwargs): period= or start=/end=, as a DataFrame."""
+    return provider_call("yfinance", "history", dict(kwargs, ticker=ticker),
+                         lambda: yf.Ticker(ticker).history(**kwargs))
+
+
+def ticker_info(ticker):
+    """yfinance Ticker.get_info() dict."""
+    return provider_call("yfinance", "info", {"ticker": ticker}, lambda: yf.Ticker(ticker).get_info())
+
+
+def news_everything(client, **params):
+    """NewsAPI get_everything(**params) through an existing NewsApiClient."""
+    return provider_call("newsapi", "everything", params, lambda: client.get_everything(**params))
@@ -0,0 +1,95 @@
+import re
+from threading import Lock
+
+from data_etl_pipeline.cache_backend import MemoryCacheBackend, get_cache_backend
+from data_etl_pipeline.instrumentation import record_cache
+from data_etl_pipeline.query_catalogue import sparql_term
+
+# Sources whose queries are cached. Writers bump the version of the source
+# they modify, which invalidates every cached result computed before the write.
+LOCAL_GRAPH = "local"
+FUSEKI_DATASET = "fuseki"
+
+# Sources that live inside each worker process (the in-memory rdf_graph). Their
+# versions and results stay in a per-process cache; everything else goes to
+# the configured, possibly cross-process, cache backend.
+PROCESS_LOCAL_SOURCES = {LOCAL_GRAPH}
+
+QUERY_CACHE_SIZE = 512
+
+VERSION_NAMESPACE = "graph-version"
+RESULT_NAMESPACE = "sparql-results"
+
+# Quoted literals and IRIs are kept verbatim; whitespace elsewhere is collapsed.
+_QUOTED = re.compile(r'("""[\s\S]*?"""|\'\'\'[\s\S]*?\'\'\'|"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|<[^<>\s]*>)')
+
+_WHITESPACE = re.compile(r"\s+")
+
+_process_cache = MemoryCacheBackend(max_entries=QUERY_CACHE_SIZE)
+
+
+def cache_for(source):
+    return _process_cache if source in PROCESS_LOCAL_SOURCES else get_cache_backend()
+
+
+def graph_version(source):
+    """Returns the current write version of a graph or dataset."""
+    return cache_for(source).get(VERSION_NAMESPACE, source, 0)
+
+
+def bump_graph_version(source):
+    """Marks a graph or dataset as modified, invalidating cached results."""
+    return cache_for(source).incr(VERSION_NAMESPACE, source)
+
+
+def normalize_query(query):
+    """Collapses insignificant whitespace so equivalent query texts share a key."""
+    parts = _QUOTED.split(query.strip())
+    return "".join(
+        part if index % 2 else _WHITESPACE.sub(" ", part)
+        for index, part in enumerate(parts)
+    )
+
+
+class QueryResultCache:
+    def __init__(self):
+        """Cache of query results tagged with graph versions, stored in the cache backend."""
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(source, query, bindings=None):
+        bound = tuple(sorted((name, sparql_term(value)) for name, value in (bindings or {}).items()))
+        return (source, normalize_query(query), bound)
+
+    def get_or_compute(self, source, query, bindings, compute):
+        """Returns a cached result for the current graph version, computing it on a miss."""
+        key = self.make_key(source, query, bindings)
+        version = graph_version(source)
+        cache = cache_for(source)
+
+        entry = cache.get(RESULT_NAMESPACE, key)
+        if entry is not None and entry[0] == version:
+            with self._lock:
+                self.hits += 1
+            record_cache(RESULT_NAMESPACE, True)
+            return entry[1]
+        with self._lock:
+            self.misses += 1
+        record_cache(RESULT_NAMESPACE, False)
+
+        result = compute()
+        cache.set(RESULT_NAMESPACE, key, (version, result))
+        return result
+
+    def clear(self):
+        _process_cache.clear(RESULT_NAMESPACE)
+        get_cache_backend().clear(RESULT_NAMESPACE)
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "backend": get_cache_backend().stats()}
+
+
+query_result_cache = QueryResultCache()
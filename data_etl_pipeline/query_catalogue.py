@@ -0,0 +1,194 @@
+import re
+import time
+from functools import lru_cache
+from threading import Lock
+
+from rdflib import BNode, Literal, URIRef
+from rdflib.plugins.sparql import prepareQuery
+
+from data_etl_pipeline.instrumentation import SPARQL_QUERY_SECONDS
+
+# Named SPARQL queries. Parameters are written as `$name` variables so the
+# same text can be compiled once with prepareQuery (and bound through
+# initBindings) or rendered with escaped terms for a remote endpoint.
+QUERIES = {
+    "financial_metrics": """
+    PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
+    PREFIX vilcorp: <http://www.semanticweb.org/viljo/ontologies/2024/10/untitled-ontology-3/>
+    PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
+
+    SELECT ?metricName ?metricValue ?metricUnit
+    WHERE {
+        ?company rdf:type vilcorp:Company ;
+                vilcorp:hasName $company_name ;
+                vilcorp:hasFinancialMetric ?metric .
+        ?metric vilcorp:metricName ?metricName ;
+                vilcorp:metricValue ?metricValue ;
+                vilcorp:metricUnit ?metricUnit .
+    }
+    """,
+    "news_sentiment": """
+    PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
+    PREFIX vilcorp: <http://www.semanticweb.org/viljo/ontologies/2024/10/untitled-ontology-3/>
+    SELECT ?headline ?publicationDate ?sentimentScore ?company
+    WHERE {
+        ?news a vilcorp:NewsArticle ;
+              vilcorp:headline ?headline ;
+              vilcorp:hasSentiment ?sentimentScore .
+        FILTER (?sentimentScore >= $min_sentiment && ?sentimentScore <= $max_sentiment)
+    }
+    """,
+    "stock_prices": """
+    PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
+    PREFIX vilcorp: <http://www.semanticweb.org/viljo/ontologies/2024/10/untitled-ontology-3/>
+    PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
+
+    SELECT ?date ?price ?volume
+    WHERE {
+        ?stock a vilcorp:StockPrice ;
+               vilcorp:isRecordedOn ?date ;
+               vilcorp:priceValue ?price ;
+               vilcorp:volume ?volume .
+        FILTER (?date >= $start_date && ?date <= $end_date)
+    }
+    ORDER BY ?date
+    """,
+    "performance_overview": """
+    PREFIX vilcorp: <http://www.semanticweb.org/viljo/ontologies/2024/10/untitled-ontology-3/>
+    SELECT ?index ?period ?cpiReturn ?indexReturn
+    WHERE {
+        ?overview vilcorp:company ?company ;
+                  vilcorp:period ?period ;
+                  vilcorp:cpiReturn ?cpiReturn ;
+                  vilcorp:indexReturn ?indexReturn .
+    }
+    """,
+    "linked_data": """
+    PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
+    PREFIX owl: <http://www.w3.org/2002/07/owl#>
+    PREFIX vilcorp: <http://www.semanticweb.org/viljo/ontologies/2024/10/untitled-ontology-3/>
+    SELECT ?linkedURI WHERE {
+        ?company rdf:type vilcorp:Company ;
+                 vilcorp:hasName $company_name ;
+                 owl:sameAs ?linkedURI .
+    }
+    """,
+    "wikidata_entity": """
+    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+    SELECT ?entity ?label WHERE {
+      ?entity rdfs:label $label .
+      FILTER(CONTAINS(STR(?entity), "wikidata.org/entity"))
+    }
+    LIMIT 1
+    """,
+    "investment_insights": """
+    PREFIX ex: <http://example.org/finance#>
+
+    SELECT ?metricName ?metricValue
+    WHERE {
+        ?company a ex:Company ;
+                 ex:hasTicker $ticker ;
+                 ex:hasFinancialMetric ?metric .
+
+        ?metric ex:metricName ?metricName ;
+                ex:metricValue ?metricValue .
+    }
+    """,
+}
+
+_PARAM_PATTERN = re.compile(r"\$([A-Za-z_][A-Za-z0-9_]*)")
+_IRI_FORBIDDEN = re.compile(r'[\x00-\x20<>"{}|^`\\]')
+
+_timings = {}
+_timings_lock = Lock()
+
+
+def to_term(value):
+    """Converts a Python value into an rdflib term suitable for binding."""
+    if isinstance(value, (Literal, URIRef)):
+        return value
+    return Literal(value)
+
+
+def sparql_term(term):
+    """Renders an rdflib term as escaped SPARQL syntax."""
+    if isinstance(term, BNode):
+        return f"_:{term}"
+    term = to_term(term)
+    if isinstance(term, URIRef):
+        if _IRI_FORBIDDEN.search(str(term)):
+            raise ValueError(f"Invalid IRI for SPARQL binding: {term!r}")
+        return f"<{term}>"
+
+    lexical = (
+        str(term)
+        .replace("\\", "\\\\")
+        .replace('"', '\\"')
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+        .replace("\t", "\\t")
+    )
+    if term.language:
+        return f'"{lexical}"@{term.language}'
+    if term.datatype:
+        return f'"{lexical}"^^{sparql_term(term.datatype)}'
+    return f'"{lexical}"'
+
+
+def query_text(name_or_query):
+    """Returns the SPARQL text for a catalogue name, or the text itself."""
+    return QUERIES.get(name_or_query, name_or_query)
+
+
+@lru_cache(maxsize=256)
+def prepare(name_or_query):
+    """Compiles a catalogue query (or raw query text) once and caches it."""
+    return prepareQuery(query_text(name_or_query))
+
+
+def render(name_or_query, bindings=None):
+    """Substitutes `$param` variables with escaped terms for remote endpoints."""
+    bindings = bindings or {}
+    text = query_text(name_or_query)
+
+    def substitute(match):
+        name = match.group(1)
+        if name not in bindings:
+            raise KeyError(f"Missing binding for query parameter '{name}'.")
+        return sparql_term(bindings[name])
+
+    return _PARAM_PATTERN.sub(substitute, text)
+
+
+def record_timing(name, seconds):
+    """Accumulates execution time for a named query."""
+    with _timings_lock:
+        stats = _timings.setdefault(name, {"calls": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+        stats["calls"] += 1
+        stats["total_seconds"] += seconds
+        stats["max_seconds"] = max(stats["max_seconds"], seconds)
+    SPARQL_QUERY_SECONDS.observe(seconds, query=name)
+
+
+def query_timings():
+    """Returns per-query call counts and execution times."""
+    with _timings_lock:
+        return {
+            name: dict(stats, mean_seconds=stats["total_seconds"] / stats["calls"])
+            for name, stats in _timings.items()
+        }
+
+
+def run_prepared(graph, name_or_query, bindings=None):
+    """Executes a prepared query against an rdflib graph with initBindings."""
+    init_bindings = {key: to_term(value) for key, value in (bindings or {}).items()}
+    label = name_or_query if name_or_query in QUERIES else "adhoc"
+
+    start = time.perf_counter()
+    try:
+        result = graph.query(prepare(name_or_query), initBindings=init_bindings)
+        if result.type == "SELECT":
+            result.bindings  # Evaluate now so the timing covers execution
+        return result
+    finally:
+        record_timing(label, time.perf_counter() - start)
@@ -0,0 +1,230 @@
+import os
+from collections import Counter, OrderedDict, defaultdict
+from contextlib import contextmanager
+from threading import Condition
+
+from rdflib import Dataset, Graph, Literal, URIRef
+from rdflib.namespace import RDF, RDFS
+
+from data_etl_pipeline.fuseki_loader import GRAPH_NAMESPACE
+
+INFERRED_GRAPH = URIRef(f"{GRAPH_NAMESPACE}inferred")
+
+# Named graphs kept in memory before the least recently loaded one is dropped
+MAX_NAMED_GRAPHS = int(os.environ.get("VILCORP_MAX_NAMED_GRAPHS", "64"))
+
+
+class ReadWriteLock:
+    """Many concurrent readers or one writer; waiting writers block new readers."""
+
+    def __init__(self):
+        self._cond = Condition()
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+
+    @contextmanager
+    def reading(self):
+        with self._cond:
+            while self._writer or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def writing(self):
+        with self._cond:
+            self._writers_waiting += 1
+            try:
+                while self._writer or self._readers:
+                    self._cond.wait()
+            finally:
+                self._writers_waiting -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
+
+def _closure(edges, nodes):
+    """Returns the reflexive-transitive closure of edges for every node."""
+    closure = {}
+    for node in nodes:
+        reached, stack = {node}, [node]
+        while stack:
+            for parent in edges.get(stack.pop(), ()):
+                if parent not in reached:
+                    reached.add(parent)
+                    stack.append(parent)
+        closure[node] = frozenset(reached)
+    return closure
+
+
+class RDFSMaterializer:
+    def __init__(self, ontology, dataset=None, max_graphs=MAX_NAMED_GRAPHS):
+        """
+        Precomputes the ontology's RDFS schema and materializes inferred triples.
+
+        Covers subclass chains (rdfs9), subproperties (rdfs7) and type inference
+        from rdfs:domain (rdfs2) and rdfs:range (rdfs3). Inferred triples live in
+        their own named graph, so queries over the union graph see them without
+        reasoning at query time.
+
+        Args:
+            ontology (Graph | str): Ontology graph or path to a Turtle file.
+            dataset (Dataset): Dataset holding asserted data; a new one is created
+                with the ontology in its default graph when omitted.
+            max_graphs (int): Named graphs kept before the least recently added
+                one is evicted (None for no limit). Each graph's entailments are
+                tracked and reference-counted across graphs, so eviction only
+                drops the inferred triples no remaining graph supports.
+
+        rdflib graphs are not safe to read while another thread writes to them:
+        query the dataset inside `with materializer.reading():`. add() and
+        materialize() take the write side of the same lock.
+        """
+        self.lock = ReadWriteLock()
+        self.max_graphs = max_graphs
+        self._named_graphs = OrderedDict()
+        self._entailed = {}  # graph identifier -> triples its asserted triples entail
+        self._support = Counter()  # inferred triple -> number of graphs entailing it
+        if isinstance(ontology, str):
+            ontology = Graph().parse(ontology, format="turtle")
+
+        if dataset is None:
+            dataset = Dataset(default_union=True)
+            for triple in ontology:
+                dataset.default_graph.add(triple)
+        self.dataset = dataset
+        self.inferred = dataset.graph(INFERRED_GRAPH)
+
+        parent_classes = defaultdict(set)
+        for child, parent in ontology.subject_objects(RDFS.subClassOf):
+            parent_classes[child].add(parent)
+        parent_properties = defaultdict(set)
+        for child, parent in ontology.subject_objects(RDFS.subPropertyOf):
+            parent_properties[child].add(parent)
+
+        classes = set(parent_classes) | {cls for parents in parent_classes.values() for cls in parents}
+        classes |= set(ontology.objects(None, RDFS.domain)) | set(ontology.objects(None, RDFS.range))
+        self.superclasses = _closure(parent_classes, classes)
+
+        properties = set(parent_properties) | {p for parents in parent_properties.values() for p in parents}
+        properties |= set(ontology.subjects(RDFS.domain, None)) | set(ontology.subjects(RDFS.range, None))
+        self.superproperties = _closure(parent_properties, properties)
+
+        # Classes implied for the subject/object of each property, with superproperties
+        # and superclasses already folded in so one lookup yields the full closure.
+        self.domain_types = {}
+        self.range_types = {}
+        for prop, supers in self.superproperties.items():
+            self.domain_types[prop] = self._expand(d for p in supers for d in ontology.objects(p, RDFS.domain))
+            self.range_types[prop] = self._expand(r for p in supers for r in ontology.objects(p, RDFS.range))
+
+        self.materialize()
+
+    def _expand(self, classes):
+        expanded = set()
+        for cls in classes:
+            expanded |= self.superclasses.get(cls, {cls})
+        return frozenset(expanded)
+
+    def inferences(self, triple):
+        """Yields every triple entailed by a single asserted triple."""
+        s, p, o = triple
+        if p == RDF.type:
+            for cls in self.superclasses.get(o, ()):
+                if cls != o:
+                    yield (s, RDF.type, cls)
+            return
+
+        for prop in self.superproperties.get(p, ()):
+            if prop != p:
+                yield (s, prop, o)
+        for cls in self.domain_types.get(p, ()):
+            yield (s, RDF.type, cls)
+        if not isinstance(o, Literal):
+            for cls in self.range_types.get(p, ()):
+                yield (o, RDF.type, cls)
+
+    def _infer(self, triples, source):
+        entailed = self._entailed.setdefault(source, set())
+        added = 0
+        for triple in triples:
+            for inferred in self.inferences(triple):
+                if inferred not in entailed:
+                    entailed.add(inferred)
+                    self._support[inferred] += 1
+                if inferred not in self.dataset:
+                    self.inferred.add(inferred)
+                    added += 1
+        return added
+
+    def _evict(self, graph_uri):
+        """Removes a named graph and the inferred triples only it supported."""
+        graph = self.dataset.graph(graph_uri)
+        # Asserted here but still entailed elsewhere: never stored as inferred, so restore them below
+        uncovered = [triple for triple in graph if triple in self._support]
+        self.dataset.remove_graph(graph_uri)
+        for inferred in self._entailed.pop(graph_uri, ()):
+            self._support[inferred] -= 1
+            if not self._support[inferred]:
+                del self._support[inferred]
+                self.inferred.remove(inferred)
+        for triple in uncovered:
+            if triple in self._support and triple not in self.dataset:
+                self.inferred.add(triple)
+
+    def add(self, triples, graph_uri=None):
+        """
+        Adds asserted triples and updates the closure incrementally.
+
+        Args:
+            triples (Graph | iterable): Triples to assert.
+            graph_uri (URIRef): Named graph for the asserted triples (default graph if None).
+
+        Returns:
+            tuple: (newly asserted triples, newly inferred triples)
+        """
+        with self.lock.writing():
+            target = self.dataset.graph(graph_uri) if graph_uri else self.dataset.default_graph
+            new = [triple for triple in triples if triple not in target]
+            for triple in new:
+                target.add(triple)
+                if triple in self._support:
+                    self.inferred.remove(triple)  # now asserted; _evict restores it if still entailed
+            if graph_uri is None:
+                return len(new), self._infer(new, target.identifier)
+
+            inferred = self._infer(new, graph_uri)
+            self._named_graphs[graph_uri] = True
+            self._named_graphs.move_to_end(graph_uri)
+            while self.max_graphs is not None and len(self._named_graphs) > self.max_graphs:
+                self._evict(self._named_graphs.popitem(last=False)[0])
+            return len(new), inferred
+
+    def reading(self):
+        """Holds the read side of the lock, for querying the dataset."""
+        return self.lock.reading()
+
+    def materialize(self):
+        """Recomputes the closure over all asserted triples from scratch."""
+        with self.lock.writing():
+            return self._materialize()
+
+    def _materialize(self):
+        self.dataset.remove_graph(self.inferred)
+        self.inferred = self.dataset.graph(INFERRED_GRAPH)
+        self._entailed.clear()
+        self._support.clear()
+        graphs = [graph for graph in self.dataset.graphs() if graph.identifier != INFERRED_GRAPH]
+        return sum(self._infer(list(graph), graph.identifier) for graph in graphs)
@@ -0,0 +1,542 @@
+"""
+Rolling price analytics (moving averages, volatility, drawdown, beta),
+materialized per ticker and kept current bar by bar.
+
+A TickerAnalytics is computed once over the full history with vectorized
+rolling-window kernels (cumulative sums, so each window is O(1) per bar).
+After that, append() folds in one new bar in O(1): every window keeps a
+ring buffer of its last values and their running sums. A bar for the
+last day replaces it (the day's close is provisional until the market
+shuts), which recomputes the incremental state from the tail. AnalyticsStore
+keeps one TickerAnalytics per ticker, saved to disk between runs, and
+refreshes it with the bars published since it was last built.
+
+    sma_<w>         simple moving average of the close over w bars
+    volatility_<w>  annualized standard deviation of daily log returns over w bars
+    beta_<w>        beta of daily log returns against the benchmark over w bars
+    drawdown        close relative to the running peak (0 at a new high)
+    max_drawdown    deepest drawdown since the start of the history
+"""
+import math
+import os
+import re
+import tempfile
+import time
+from threading import Lock
+
+import numpy as np
+import pandas as pd
+
+from data_etl_pipeline.instrumentation import record_cache
+from data_etl_pipeline.price_series import SECONDS_PER_DAY, to_epoch_day
+
+TRADING_DAYS = 252
+SMA_WINDOWS = (20, 50, 200)
+VOLATILITY_WINDOWS = (20, 60)
+BETA_WINDOWS = (60,)
+
+DEFAULT_BENCHMARK = os.environ.get("VILCORP_BENCHMARK_TICKER", "SPY")
+HISTORY_PERIOD = "10y"
+REFRESH_PERIOD = "1mo"  # history fetched to pick up new bars; older gaps trigger a full rebuild
+REFRESH_SECONDS = 15 * 60
+ANALYTICS_SUFFIX = ".analytics.npz"
+
+INITIAL_CAPACITY = 256
+
+# Tickers become file names, so only characters found in exchange symbols are accepted
+# (BRK.B, ^GSPC, EURUSD=X, BF-B)
+TICKER_PATTERN = re.compile(r"^[A-Za-z0-9.^=-]{1,15}$")
+
+
+### Vectorized kernels: all return arrays aligned with their input, NaN until a window is full
+
+def rolling_sum(values, window):
+    out = np.full(len(values), np.nan)
+    if window <= len(values):
+        sums = np.cumsum(values)
+        out[window - 1] = sums[window - 1]
+        out[window:] = sums[window:] - sums[:-window]
+    return out
+
+
+def rolling_mean(values, window):
+    return rolling_sum(values, window) / window
+
+
+def rolling_std(values, window):
+    """Sample (ddof=1) standard deviation over each window."""
+    if window < 2:
+        return np.full(len(values), np.nan)
+    centered = values - values.mean() if len(values) else values  # keeps the sums small
+    s1 = rolling_sum(centered, window)
+    s2 = rolling_sum(centered * centered, window)
+    return np.sqrt(np.maximum((s2 - s1 * s1 / window) / (window - 1), 0.0))
+
+
+def rolling_beta(returns, benchmark_returns, window):
+    """cov(returns, benchmark) / var(benchmark) over each window."""
+    s_r = rolling_sum(returns, window)
+    s_b = rolling_sum(benchmark_returns, window)
+    s_rb = rolling_sum(returns * benchmark_returns, window)
+    s_bb = rolling_sum(benchmark_returns * benchmark_returns, window)
+    covariance = s_rb - s_r * s_b / window
+    variance = s_bb - s_b * s_b / window
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(variance > 0, covariance / variance, np.nan)
+
+
+def log_returns(close):
+    """Daily log returns; the first bar has none (NaN)."""
+    out = np.full(len(close), np.nan)
+    if len(close) > 1:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out[1:] = np.log(close[1:] / close[:-1])
+    return out
+
+
+def drawdowns(close):
+    """Returns (drawdown, max_drawdown) arrays."""
+    if not len(close):
+        return np.empty(0), np.empty(0)
+    drawdown = close / np.maximum.accumulate(close) - 1.0
+    return drawdown, np.minimum.accumulate(drawdown)
+
+
+def _on_valid_suffix(kernel, window, *arrays):
+    """Runs a kernel on the bars after the leading NaNs of its inputs (return and benchmark warm-up)."""
+    valid = np.ones(len(arrays[0]), dtype=bool)
+    for values in arrays:
+        valid &= np.isfinite(values)
+    out = np.full(len(arrays[0]), np.nan)
+    if valid.any():
+        start = int(np.argmax(valid))
+        out[start:] = kernel(*(values[start:] for values in arrays), window)
+    return out
+
+
+def align_benchmark(days, benchmark):
+    """Benchmark closes on the given days, carrying the last close forward (NaN before it starts)."""
+    if benchmark is None or benchmark.empty:
+        return np.full(len(days), np.nan)
+    positions = np.searchsorted(benchmark.days, days, side="right") - 1
+    aligned = benchmark.close[np.maximum(positions, 0)]
+    return np.where(positions >= 0, aligned, np.nan)
+
+
+### Incremental state
+
+class RollingSums:
+    __slots__ = ("size", "values", "sums", "count", "position")
+
+    def __init__(self, size, width):
+        """Running sums of the last `size` rows of `width` floats, updated in O(1) per row."""
+        self.size = size
+        self.values = [None] * size
+        self.sums = [0.0] * width
+        self.count = 0
+        self.position = 0
+
+    @property
+    def full(self):
+        return self.count == self.size
+
+    def push(self, row):
+        position = self.position
+        leaving = self.values[position]
+        self.values[position] = row
+        if leaving is None:
+            self.count += 1
+            self.sums = [total + new for total, new in zip(self.sums, row)]
+        else:
+            self.sums = [total + new - old for total, new, old in zip(self.sums, row, leaving)]
+        position += 1
+        if position == self.size:
+            position = 0
+            # re-sum once per lap so floating-point drift never accumulates
+            self.sums = [math.fsum(column) for column in zip(*self.values)]
+        self.position = position
+
+
+class TickerAnalytics:
+    def __init__(self, ticker, benchmark=DEFAULT_BENCHMARK, sma_windows=SMA_WINDOWS,
+                 volatility_windows=VOLATILITY_WINDOWS, beta_windows=BETA_WINDOWS):
+        """Materialized indicator columns for one ticker; build with from_series() or load()."""
+        self.ticker = ticker
+        self.benchmark = benchmark
+        self.sma_windows = tuple(sma_windows)
+        self.volatility_windows = tuple(volatility_windows)
+        self.beta_windows = tuple(beta_windows) if benchmark else ()
+        self.length = 0
+        self.revision = 0  # bars appended or replaced since the columns were built or loaded
+        self._days = np.empty(0, dtype=np.int64)
+        self._columns = {name: np.empty(0) for name in ["close", "benchmark_close"] + self.indicators}
+        self._reset_state()
+
+    @property
+    def indicators(self):
+        return ([f"sma_{w}" for w in self.sma_windows] + [f"volatility_{w}" for w in self.volatility_windows]
+                + [f"beta_{w}" for w in self.beta_windows] + ["drawdown", "max_drawdown"])
+
+    @property
+    def days(self):
+        return self._days[:self.length]
+
+    def column(self, name):
+        return self._columns[name][:self.length]
+
+    @property
+    def last_day(self):
+        return int(self._days[self.length - 1]) if self.length else None
+
+    def config(self):
+        return {"benchmark": self.benchmark or "", "sma": list(self.sma_windows),
+                "volatility": list(self.volatility_windows), "beta": list(self.beta_windows)}
+
+    # -- full (vectorized) build
+
+    @classmethod
+    def from_series(cls, ticker, series, benchmark_series=None, **kwargs):
+        """Computes every indicator over a PriceSeries in one vectorized pass."""
+        analytics = cls(ticker, **kwargs)
+        close = series.close
+        days = series.days
+        finite = np.isfinite(close) & (close > 0)
+        if not finite.all():
+            close, days = close[finite], days[finite]
+        bench = align_benchmark(days, benchmark_series) if analytics.benchmark else np.full(len(days), np.nan)
+
+        returns = log_returns(close)
+        bench_returns = log_returns(bench)
+        columns = {"close": close, "benchmark_close": bench}
+        for w in analytics.sma_windows:
+            columns[f"sma_{w}"] = rolling_mean(close, w)
+        for w in analytics.volatility_windows:
+            columns[f"volatility_{w}"] = _on_valid_suffix(rolling_std, w, returns) * math.sqrt(TRADING_DAYS)
+        for w in analytics.beta_windows:
+            columns[f"beta_{w}"] = _on_valid_suffix(rolling_beta, w, returns, bench_returns)
+        columns["drawdown"], columns["max_drawdown"] = drawdowns(close)
+
+        analytics._set_columns(days, columns)
+        return analytics
+
+    def _set_columns(self, days, columns):
+        self.length = len(days)
+        self._days = np.array(days, dtype=np.int64)
+        self._columns = {name: np.array(columns[name], dtype=np.float64) for name in self._columns}
+        self._rebuild_state()
+
+    def _reset_state(self):
+        self._sma = {w: RollingSums(w, 1) for w in self.sma_windows}
+        self._volatility = {w: RollingSums(w, 2) for w in self.volatility_windows}
+        self._beta = {w: RollingSums(w, 4) for w in self.beta_windows}
+        self._peak = -math.inf
+        self._max_drawdown = 0.0
+
+    def _rebuild_state(self):
+        """Reloads the incremental state from the tail of the columns (O(largest window))."""
+        self._reset_state()
+        if not self.length:
+            return
+        close = self.column("close")
+        bench = self.column("benchmark_close")
+        self._peak = float(close.max())
+        self._max_drawdown = float(self.column("max_drawdown")[-1])
+
+        for w, state in self._sma.items():
+            for value in close[-w:].tolist():
+                state.push((value,))
+
+        tail = max(self.volatility_windows + self.beta_windows, default=0) + 1
+        returns = log_returns(close[-tail:]).tolist()
+        bench_returns = log_returns(bench[-tail:]).tolist()
+        for w, state in self._volatility.items():
+            for r in [r for r in returns if math.isfinite(r)][-w:]:
+                state.push((r, r * r))
+        for w, state in self._beta.items():
+            pairs = [(r, b) for r, b in zip(returns, bench_returns) if math.isfinite(r) and math.isfinite(b)]
+            for r, b in pairs[-w:]:
+                state.push((r, b, r * b, b * b))
+
+    # -- incremental updates
+
+    def _ensure_capacity(self, length):
+        capacity = len(self._days)
+        if length <= capacity:
+            return
+        capacity = max(INITIAL_CAPACITY, capacity * 2, length)
+        days = np.empty(capacity, dtype=np.int64)
+        days[:self.length] = self.days
+        self._days = days
+        for name, values in self._columns.items():
+            grown = np.full(capacity, np.nan)
+            grown[:self.length] = values[:self.length]
+            self._columns[name] = grown
+
+    def append(self, day, close, benchmark_close=None):
+        """
+        Folds one new daily bar into every indicator in O(1) (amortized).
+
+        A bar on the last day replaces that bar: it is dropped and the
+        incremental state is rebuilt from the tail before the new one is folded in.
+
+        Args:
+            day (int): Epoch day of the bar; bars before the last one are ignored.
+            close (float): Closing price.
+            benchmark_close (float): Benchmark close that day; None carries the last one forward
+                (or keeps the replaced bar's).
+
+        Returns:
+            bool: Whether the bar was added or replaced one with different values.
+        """
+        day = int(day)
+        close = float(close)
+        if not close > 0:
+            return False
+        if self.length and day <= self.last_day:
+            if day < self.last_day:
+                return False
+            last = self.length - 1
+            last_bench = float(self._columns["benchmark_close"][last])
+            if benchmark_close is None or not benchmark_close > 0:
+                benchmark_close = last_bench if math.isfinite(last_bench) else None
+            if close == self._columns["close"][last] and (benchmark_close is None or benchmark_close == last_bench):
+                return False
+            self.length = last
+            self._rebuild_state()
+
+        n = self.length
+        prev_close = float(self._columns["close"][n - 1]) if n else math.nan
+        prev_bench = float(self._columns["benchmark_close"][n - 1]) if n else math.nan
+        bench = prev_bench if benchmark_close is None or not benchmark_close > 0 else float(benchmark_close)
+        r = math.log(close / prev_close) if n else math.nan
+        rb = math.log(bench / prev_bench) if math.isfinite(bench) and math.isfinite(prev_bench) else math.nan
+
+        row = {"close": close, "benchmark_close": bench if self.benchmark else math.nan}
+        for w, state in self._sma.items():
+            state.push((close,))
+            row[f"sma_{w}"] = state.sums[0] / w if state.full else math.nan
+        for w, state in self._volatility.items():
+            if math.isfinite(r):
+                state.push((r, r * r))
+            if state.full and w > 1:
+                s1, s2 = state.sums
+                row[f"volatility_{w}"] = math.sqrt(max((s2 - s1 * s1 / w) / (w - 1), 0.0) * TRADING_DAYS)
+            else:
+                row[f"volatility_{w}"] = math.nan
+        for w, state in self._beta.items():
+            if math.isfinite(r) and math.isfinite(rb):
+                state.push((r, rb, r * rb, rb * rb))
+            row[f"beta_{w}"] = math.nan
+            if state.full:
+                s_r, s_b, s_rb, s_bb = state.sums
+                variance = s_bb - s_b * s_b / w
+                if variance > 0:
+                    row[f"beta_{w}"] = (s_rb - s_r * s_b / w) / variance
+        self._peak = max(self._peak, close)
+        row["drawdown"] = close / self._peak - 1.0
+        self._max_drawdown = min(self._max_drawdown, row["drawdown"])
+        row["max_drawdown"] = self._max_drawdown
+
+        self._ensure_capacity(n + 1)
+        self._days[n] = day
+        for name, value in row.items():
+            self._columns[name][n] = value
+        self.length = n + 1
+        self.revision += 1
+        return True
+
+    def extend(self, series, benchmark_series=None):
+        """
+        Appends the bars of a PriceSeries from the last day on (a changed last bar
+        is replaced); returns how many were added or replaced.
+        """
+        start = np.searchsorted(series.days, self.last_day, side="left") if self.length else 0
+        days = series.days[start:]
+        if not len(days):
+            return 0
+        bench = align_benchmark(days, benchmark_series) if self.benchmark else np.full(len(days), np.nan)
+        added = 0
+        for day, close, bench_close in zip(days.tolist(), series.close[start:].tolist(), bench.tolist()):
+            added += self.append(day, close, None if math.isnan(bench_close) else bench_close)
+        return added
+
+    def matches(self, series, benchmark_series=None):
+        """
+        Whether a PriceSeries agrees with the stored closes (and benchmark closes) on the
+        days both cover, leaving out the last stored bar, which append() may still revise.
+        Providers back-adjust the whole history after a split or dividend, so a mismatch
+        means the materialized indicators are stale.
+        """
+        common, mine, theirs = np.intersect1d(self.days[:-1], series.days, return_indices=True)
+        if not np.allclose(self._columns["close"][mine], series.close[theirs], rtol=1e-6, atol=0.0):
+            return False
+        if not self.benchmark or benchmark_series is None or benchmark_series.empty:
+            return True
+        stored = self._columns["benchmark_close"][mine]
+        fetched = align_benchmark(common, benchmark_series)
+        both = np.isfinite(stored) & np.isfinite(fetched)
+        return bool(np.allclose(stored[both], fetched[both], rtol=1e-6, atol=0.0))
+
+    # -- reads
+
+    def frame(self, indicators=None, start_date=None, end_date=None):
+        """
+        The requested indicators (default: all) for bars with start_date <= date <= end_date,
+        as a DataFrame whose value columns view the materialized arrays.
+        """
+        indicators = list(indicators or self.indicators)
+        unknown = [name for name in indicators if name not in self._columns]
+        if unknown:
+            raise KeyError(f"Unknown indicator(s): {', '.join(unknown)}")
+        days = self.days
+        lo = 0 if start_date is None else np.searchsorted(days, to_epoch_day(start_date), side="left")
+        hi = self.length if end_date is None else np.searchsorted(days, to_epoch_day(end_date), side="right")
+        columns = {"isRecordedOn": (days[lo:hi] * SECONDS_PER_DAY).view("datetime64[s]")}
+        for name in indicators:
+            columns[name] = self._columns[name][lo:hi]
+        return pd.DataFrame(columns, copy=False)
+
+    # -- persistence
+
+    def save(self, path):
+        """Writes the materialized columns atomically (the incremental state is rebuilt on load)."""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                np.savez(handle, days=self.days, config=np.array(repr(self.config())),
+                         **{name: self.column(name) for name in self._columns})
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path, ticker, **kwargs):
+        """Loads saved columns; returns None when they were built with a different configuration."""
+        analytics = cls(ticker, **kwargs)
+        with np.load(path) as arrays:
+            if str(arrays["config"]) != repr(analytics.config()):
+                return None
+            analytics._set_columns(arrays["days"], {name: arrays[name] for name in analytics._columns})
+        return analytics
+
+
+class AnalyticsStore:
+    def __init__(self, directory=None, benchmark=DEFAULT_BENCHMARK, refresh_seconds=REFRESH_SECONDS,
+                 fetch_series=None):
+        """
+        Per-ticker TickerAnalytics, kept in memory and (with a directory) on disk.
+
+        Args:
+            directory (str): Where materialized analytics are saved; None keeps them in memory only.
+            benchmark (str): Ticker that beta is measured against.
+            refresh_seconds (int): Age after which get() checks for new bars.
+            fetch_series (callable): fetch_series(ticker, period) -> PriceSeries; defaults to the
+                cached StockPriceExtractor history.
+        """
+        self.directory = directory
+        self.benchmark = benchmark
+        self.refresh_seconds = refresh_seconds
+        self.fetch_series = fetch_series or _extractor_series
+        self._entries = {}  # ticker -> (checked_at, TickerAnalytics)
+        self._locks = {}
+        self._lock = Lock()
+
+    def path_for(self, ticker):
+        """The ticker's analytics file; raises ValueError for tickers that are not plain symbols."""
+        if not TICKER_PATTERN.match(ticker):
+            raise ValueError(f"Invalid ticker: {ticker!r}")
+        return os.path.join(self.directory, f"{ticker}{ANALYTICS_SUFFIX}") if self.directory else None
+
+    def _ticker_lock(self, ticker):
+        with self._lock:
+            return self._locks.setdefault(ticker, Lock())
+
+    def _benchmark_series(self, period):
+        if not self.benchmark:
+            return None
+        try:
+            return self.fetch_series(self.benchmark, period)
+        except Exception as e:
+            print(f"WARNING: benchmark {self.benchmark} unavailable, beta skipped: {e}")
+            return None
+
+    def build(self, ticker):
+        """Computes a ticker's analytics from its full history."""
+        series = self.fetch_series(ticker, HISTORY_PERIOD)
+        if series.empty:
+            raise LookupError(f"No stock price data found for {ticker}.")
+        return TickerAnalytics.from_series(ticker, series, self._benchmark_series(HISTORY_PERIOD), benchmark=self.benchmark)
+
+    def refresh(self, analytics):
+        """Appends bars published since the last one; returns False when a full rebuild is needed."""
+        recent = self.fetch_series(analytics.ticker, REFRESH_PERIOD)
+        if recent.empty or analytics.last_day is None:
+            return True
+        if recent.days[0] > analytics.last_day:
+            return False  # bars missing between the saved history and the refresh window
+        benchmark = self._benchmark_series(REFRESH_PERIOD)
+        if not analytics.matches(recent, benchmark):
+            return False  # history re-adjusted (split or dividend) since it was materialized
+        analytics.extend(recent, benchmark)
+        return True
+
+    @property
+    def indicators(self):
+        return TickerAnalytics(None, benchmark=self.benchmark).indicators
+
+    def get(self, ticker):
+        """Returns the ticker's analytics, loading, building or refreshing them as needed."""
+        path = self.path_for(ticker)
+        with self._ticker_lock(ticker):
+            return self._get(ticker, path)
+
+    def frame(self, ticker, indicators=None, start_date=None, end_date=None):
+        """
+        TickerAnalytics.frame() for the ticker, copied while its lock is held: a refresh
+        that replaces the last bar rewrites the columns in place, which must not show
+        through a frame that is still being serialized.
+        """
+        path = self.path_for(ticker)
+        with self._ticker_lock(ticker):
+            return self._get(ticker, path).frame(indicators, start_date, end_date).copy()
+
+    def _get(self, ticker, path):
+        entry = self._entries.get(ticker)
+        now = time.time()
+        fresh = entry is not None and now - entry[0] < self.refresh_seconds
+        record_cache("analytics", fresh)
+        if fresh:
+            return entry[1]
+
+        analytics = entry[1] if entry is not None else None
+        if analytics is None and path and os.path.exists(path):
+            analytics = TickerAnalytics.load(path, ticker, benchmark=self.benchmark)
+            if analytics is not None and now - os.path.getmtime(path) < self.refresh_seconds:
+                self._entries[ticker] = (os.path.getmtime(path), analytics)
+                return analytics
+
+        before = analytics.revision if analytics is not None else None
+        rebuilt = analytics is None or not self.refresh(analytics)
+        if rebuilt:
+            analytics = self.build(ticker)
+        if path and (rebuilt or analytics.revision != before):
+            analytics.save(path)
+        self._entries[ticker] = (now, analytics)
+        return analytics
+
+    def invalidate(self, ticker):
+        with self._ticker_lock(ticker):
+            self._entries.pop(ticker, None)
+            path = self.path_for(ticker)
+            if path and os.path.exists(path):
+                os.remove(path)
+
+
+def _extractor_series(ticker, period):
+    from data_etl_pipeline.data_extraction import StockPriceExtractor
+
+    return StockPriceExtractor(ticker, None, None).fetch_price_series(period=period)
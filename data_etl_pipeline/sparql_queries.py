@@ -1,56 +1,40 @@
-import requests
+import os
+import time
+
 import pandas as pd
+from rdflib import Literal
+from rdflib.namespace import XSD
+
+from data_etl_pipeline.query_catalogue import record_timing, render
+from data_etl_pipeline.query_cache import FUSEKI_DATASET, query_result_cache
+from data_etl_pipeline.fuseki_client import DATASET_NAME, FUSEKI_URL, get_fuseki_client
+from data_etl_pipeline.providers import http_get
 
-# Configuration
-FUSEKI_URL = "http://localhost:3030"
-DATASET_NAME = "vilcorp_data"
+WIKIDATA_ENDPOINT = os.environ.get("VILCORP_WIKIDATA_ENDPOINT", "https://query.wikidata.org/sparql")
 
 def execute_sparql_query(query):
-    headers = {'Content-Type': 'application/sparql-query'}
-    response = requests.post(
-        f"{FUSEKI_URL}/{DATASET_NAME}/query",
-        data=query,
-        headers=headers
-    )
-    if response.status_code == 200:
-        try:
-            return response.json()
-        except ValueError:
-            raise ValueError("Failed to parse SPARQL response as JSON.")
-    else:
-        raise Exception(f"SPARQL query failed: {response.status_code}\n{response.text}")
+    return query_result_cache.get_or_compute(FUSEKI_DATASET, query, None, lambda: _post_sparql_query(query))
+
+def _post_sparql_query(query):
+    return get_fuseki_client().query_json(query)
+
+def execute_named_query(name, bindings=None):
+    """Executes a catalogue query against Fuseki with safely rendered bindings."""
+    query = render(name, bindings)
+    start = time.perf_counter()
+    try:
+        return execute_sparql_query(query)
+    finally:
+        record_timing(name, time.perf_counter() - start)
 
 def financial_metrics_query(company_name):
-    query = f"""
-    PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-    PREFIX vilcorp: <http://www.semanticweb.org/viljo/ontologies/2024/10/untitled-ontology-3/>
-    PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
-
-    SELECT ?metricName ?metricValue ?metricUnit
-    WHERE {{
-        ?company rdf:type vilcorp:Company ;
-                vilcorp:hasName "{company_name}" ;
-                vilcorp:hasFinancialMetric ?metric .
-        ?metric vilcorp:metricName ?metricName ;
-                vilcorp:metricValue ?metricValue ;
-                vilcorp:metricUnit ?metricUnit .
-    }}
-    """
-    return execute_sparql_query(query)
+    return execute_named_query("financial_metrics", {"company_name": company_name})
 
 def news_sentiment_query(company_name, min_sentiment=-1.0, max_sentiment=1.0):
-    query = f"""
-    PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-    PREFIX vilcorp: <http://www.semanticweb.org/viljo/ontologies/2024/10/untitled-ontology-3/>
-    SELECT ?headline ?publicationDate ?sentimentScore ?company
-    WHERE {{
-        ?news a vilcorp:NewsArticle ;
-              vilcorp:headline ?headline ;
-              vilcorp:hasSentiment ?sentimentScore .
-        FILTER (?sentimentScore >= {min_sentiment} && ?sentimentScore <= {max_sentiment})
-    }}
-    """
-    result = execute_sparql_query(query)
+    result = execute_named_query(
+        "news_sentiment",
+        {"min_sentiment": float(min_sentiment), "max_sentiment": float(max_sentiment)},
+    )
     
     # Validate the output
     if not isinstance(result, dict):
@@ -58,50 +42,35 @@ def news_sentiment_query(company_name, min_sentiment=-1.0, max_sentiment=1.0):
     
     return result
 
+def _date_range_bindings(start_date, end_date):
+    return {
+        "start_date": Literal(str(start_date), datatype=XSD.date),
+        "end_date": Literal(str(end_date), datatype=XSD.date),
+    }
+
 def stock_price_query(start_date, end_date):
     """
     Fetches stock price data over a specific date range.
     """
-    query = f"""
-    PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-    PREFIX vilcorp: <http://www.semanticweb.org/viljo/ontologies/2024/10/untitled-ontology-3/>
-    PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
-    
-    SELECT ?date ?price ?volume
-    WHERE {{
-        ?stock a vilcorp:StockPrice ;
-               vilcorp:isRecordedOn ?date ;
-               vilcorp:priceValue ?price ;
-               vilcorp:volume ?volume
-    }}
-    ORDER BY ?date
+    return execute_named_query("stock_prices", _date_range_bindings(start_date, end_date))
+
+def stock_price_frame(start_date, end_date):
     """
-    return execute_sparql_query(query)
+    Streams stock price rows from Fuseki as TSV straight into a DataFrame.
+    """
+    query = render("stock_prices", _date_range_bindings(start_date, end_date))
+    return get_fuseki_client().select_frame(query, result_format="tsv")
 
 def performance_overview_query(company_name):
-    query = f"""
-    PREFIX vilcorp: <http://www.semanticweb.org/viljo/ontologies/2024/10/untitled-ontology-3/>
-    SELECT ?index ?period ?cpiReturn ?indexReturn
-    WHERE {{
-        ?overview vilcorp:company ?company ;
-                  vilcorp:period ?period ;
-                  vilcorp:cpiReturn ?cpiReturn ;
-                  vilcorp:indexReturn ?indexReturn .
-    }}
-    """
-    return execute_sparql_query(query)
+    return execute_named_query("performance_overview")
 
 def fetch_wikidata_id(company_name):
-    query = f"""
-    SELECT ?entity ?label WHERE {{
-      ?entity rdfs:label "{company_name}"@en .
-      FILTER(CONTAINS(STR(?entity), "wikidata.org/entity"))
-    }}
-    LIMIT 1
-    """
-    url = "https://query.wikidata.org/sparql"
+    query = render("wikidata_entity", {"label": Literal(company_name, lang="en")})
+    url = WIKIDATA_ENDPOINT
     headers = {'Accept': 'application/json'}
-    response = requests.get(url, params={'query': query}, headers=headers)
+    start = time.perf_counter()
+    response = http_get("wikidata", "entity", url, params={'query': query}, headers=headers)
+    record_timing("wikidata_entity", time.perf_counter() - start)
     
     if response.status_code == 200:
         data = response.json()
@@ -113,15 +82,7 @@ def linked_data_query(company_name):
     """
     Fetches linked data URIs for a company.
     """
-    query = f"""
-    PREFIX owl: <http://www.w3.org/2002/07/owl#>
-    SELECT ?linkedURI WHERE {{
-        ?company rdf:type vilcorp:Company ;
-                 vilcorp:hasName "{company_name}" ;
-                 owl:sameAs ?linkedURI .
-    }}
-    """
-    return execute_sparql_query(query)
+    return execute_named_query("linked_data", {"company_name": company_name})
 
 # Utility function to pretty-print results
 def print_results(query_results, columns):
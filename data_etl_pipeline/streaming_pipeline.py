@@ -0,0 +1,251 @@
+import gc
+import itertools
+import math
+import os
+import resource
+import time
+
+from data_etl_pipeline.data_transformation import (
+    article_id,
+    company_triples,
+    company_uri_for,
+    news_article_triples,
+    news_namespace,
+    stock_price_triples,
+)
+from data_etl_pipeline.fuseki_loader import ntriples_line
+from data_etl_pipeline.instrumentation import RDF_TRIPLES_GENERATED
+from data_etl_pipeline.query_catalogue import sparql_term
+
+DEFAULT_BATCH_SIZE = 5_000
+MIN_BATCH_SIZE = 100
+
+
+def current_rss_bytes():
+    """Returns the current resident set size of this process."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # Peak rather than current RSS, but still an upper bound (KiB on Linux, bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if peak > 1 << 32 else peak * 1024
+
+
+# Stages. Each takes an iterable and returns a generator, so nothing is
+# materialized: the sink pulls one batch through the whole chain at a time.
+
+def clean_articles(articles, company_name, seen_index=None, seen_namespace=None):
+    """Deduplicates articles by content-addressed ID and tags company mentions."""
+    seen = set()
+    for article in articles:
+        if not isinstance(article, dict):
+            continue
+        article = dict(article, title=(article.get("title") or "").strip())
+        news_id = article_id(article)
+        if news_id in seen:
+            continue
+        seen.add(news_id)
+        if seen_index is not None and seen_index.contains(seen_namespace, news_id):
+            continue
+        article["id"] = news_id
+        article["mentionsCompany"] = company_name if company_name.lower() in article["title"].lower() else None
+        yield article
+
+
+def score_sentiment(articles):
+    """Adds a TextBlob polarity score to each article."""
+    from textblob import TextBlob
+
+    for article in articles:
+        article["sentimentScore"] = TextBlob(article["title"]).sentiment.polarity
+        yield article
+
+
+def article_triples(articles, company_uri):
+    for article in articles:
+        yield from news_article_triples(company_uri, article["id"], article)
+
+
+def _volume(value):
+    """Volume as an int; missing or non-finite volumes (e.g. NaN on partial bars) become 0."""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return 0
+    return int(value) if math.isfinite(value) else 0
+
+
+def price_triples(rows, company_uri, price_scope):
+    """Turns (date, close, volume) rows into StockPrice triples."""
+    for recorded_on, price, volume in rows:
+        yield from stock_price_triples(company_uri, price_scope, recorded_on, float(price), _volume(volume))
+
+
+# Sinks. write() receives one bounded batch of triples; flush() forces buffered
+# output out; close() finalizes.
+
+class NTriplesFileSink:
+    def __init__(self, path):
+        self.path = path
+        self.handle = open(path, "a", encoding="utf-8")
+
+    def write(self, triples):
+        self.handle.writelines(ntriples_line(triple) for triple in triples)
+
+    def flush(self):
+        self.handle.flush()
+
+    def close(self):
+        self.handle.close()
+
+
+class FusekiSink:
+    def __init__(self, client, graph_uri):
+        """Appends each batch to a named graph with SPARQL Update INSERT DATA."""
+        self.client = client
+        self.graph_uri = graph_uri
+
+    def write(self, triples):
+        body = "".join(ntriples_line(triple) for triple in triples)
+        self.client.update(f"INSERT DATA {{ GRAPH {sparql_term(self.graph_uri)} {{\n{body}}} }}")
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class QuadStoreSink:
+    def __init__(self, dataset, graph_uri, materializer=None):
+        """Adds each batch to a named graph of an rdflib Dataset (optionally via an RDFSMaterializer)."""
+        self.dataset = dataset
+        self.graph_uri = graph_uri
+        self.materializer = materializer
+
+    def write(self, triples):
+        if self.materializer is not None:
+            self.materializer.add(triples, self.graph_uri)
+        else:
+            graph = self.dataset.graph(self.graph_uri)
+            for triple in triples:
+                graph.add(triple)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class StreamingETLPipeline:
+    def __init__(self, company_name, ticker, sink, batch_size=DEFAULT_BATCH_SIZE, max_memory_mb=None, seen_index=None):
+        """
+        Chains extraction -> cleaning -> sentiment -> triple generation -> sink as generators.
+
+        The sink pulls one batch at a time through the chain, so upstream
+        extraction never runs ahead of what the sink has written. When
+        max_memory_mb is set and the process RSS exceeds it, the sink is
+        flushed and the batch size halves (down to MIN_BATCH_SIZE).
+        """
+        self.company_name = company_name
+        self.ticker = ticker
+        self.sink = sink
+        self.batch_size = batch_size
+        self.max_memory_bytes = max_memory_mb * 1024 * 1024 if max_memory_mb else None
+        self.seen_index = seen_index
+        self.company_uri = company_uri_for(company_name)
+        self.seen_namespace = news_namespace(company_name, ticker)
+        self._pending_ids = []
+
+    def triples(self, articles=None, price_rows=None):
+        """Builds the lazy triple stream for the given article and price sources."""
+        streams = [company_triples(self.company_uri, self.company_name)]
+        if price_rows is not None:
+            streams.append(price_triples(price_rows, self.company_uri, self.ticker))
+        if articles is not None:
+            cleaned = clean_articles(articles, self.company_name, self.seen_index, self.seen_namespace)
+            scored = score_sentiment(cleaned)
+            streams.append(self._tracked_article_triples(scored))
+        return itertools.chain.from_iterable(streams)
+
+    def _tracked_article_triples(self, articles):
+        # An article's ID is queued once all of its triples have been pulled, so
+        # every queued ID is covered by the batches handed to the sink so far.
+        self._pending_ids = []
+        for article in articles:
+            yield from news_article_triples(self.company_uri, article["id"], article)
+            self._pending_ids.append(article["id"])
+
+    def _mark_written(self):
+        """Records the articles whose triples the sink has accepted and flushed."""
+        if self.seen_index is None or not self._pending_ids:
+            return
+        self.sink.flush()
+        self.seen_index.mark(self.seen_namespace, self._pending_ids)
+        self._pending_ids = []
+
+    def _check_memory(self):
+        if self.max_memory_bytes is None or current_rss_bytes() <= self.max_memory_bytes:
+            return False
+        self.sink.flush()
+        if self.batch_size > MIN_BATCH_SIZE:
+            gc.collect()
+            self.batch_size = max(MIN_BATCH_SIZE, self.batch_size // 2)
+        return True
+
+    def run(self, articles=None, price_rows=None):
+        """
+        Streams all sources into the sink.
+
+        Args:
+            articles (iterable): Raw article dicts, e.g. NewsAPIExtractor.iter_news_articles().
+            price_rows (iterable): (date, close, volume) rows, e.g. StockPriceExtractor.iter_price_rows().
+
+        Returns:
+            dict: Triple and batch counts, throughput and peak RSS.
+        """
+        start = time.perf_counter()
+        stream = self.triples(articles, price_rows)
+        triples = batches = throttles = 0
+        peak_rss = current_rss_bytes()
+
+        try:
+            while True:
+                batch = list(itertools.islice(stream, self.batch_size))
+                if not batch:
+                    break
+                self.sink.write(batch)
+                self._mark_written()
+                triples += len(batch)
+                batches += 1
+                del batch
+                throttles += self._check_memory()
+                peak_rss = max(peak_rss, current_rss_bytes())
+            self.sink.flush()
+            self._mark_written()
+        finally:
+            self.sink.close()
+
+        seconds = time.perf_counter() - start
+        RDF_TRIPLES_GENERATED.inc(triples, source="streaming")
+        return {
+            "ticker": self.ticker,
+            "triples": triples,
+            "batches": batches,
+            "final_batch_size": self.batch_size,
+            "memory_throttles": throttles,
+            "peak_rss_mb": round(peak_rss / (1024 * 1024), 1),
+            "seconds": round(seconds, 3),
+            "triples_per_second": round(triples / seconds, 1) if seconds > 0 else None,
+        }
+
+
+def stream_company_to_ntriples(news_extractor, price_extractor, company_name, ticker, path, **kwargs):
+    """Convenience wrapper: streams a company's news and prices into an N-Triples file."""
+    pipeline = StreamingETLPipeline(company_name, ticker, NTriplesFileSink(path), **kwargs)
+    return pipeline.run(
+        articles=news_extractor.iter_news_articles() if news_extractor is not None else None,
+        price_rows=price_extractor.iter_price_rows() if price_extractor is not None else None,
+    )
@@ -1,36 +1,58 @@
-from flask import Flask, jsonify, request
-from flask_cors import CORS
-import pandas as pd
-import plotly
-import rdflib
-import requests
-import yfinance as yf
-from sklearn.linear_model import LinearRegression
-import numpy as np
 import sys
 import os
-from datetime import datetime, timedelta
-from sklearn.preprocessing import PolynomialFeatures
-from sklearn.pipeline import make_pipeline
-import matplotlib.pyplot as plt
-import plotly.graph_objects as go
 import json
-from rdflib import Graph, Namespace
-from textblob import TextBlob
-
-from SPARQLWrapper import SPARQLWrapper, JSON
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from flask_api.startup_profile import startup_profile
+startup_profile.start_from_env()
+
+# scikit-learn, plotly, TextBlob and NewsAPI are imported by the endpoints that use them,
+# and yfinance on first use (data_etl_pipeline.providers), so workers start without loading them
+from flask import Flask, jsonify, request
+from flask_cors import CORS
+import pandas as pd
+import rdflib
+from rdflib import Graph, Namespace
+
 from data_etl_pipeline.graph_funcations import parse_rdf_file
 from data_etl_pipeline.sparql_queries import (
     financial_metrics_query
 )
-from data_etl_pipeline.data_extraction import StockPriceExtractor, NewsAPIExtractor, YahooFinanceExtractor
+from data_etl_pipeline.query_catalogue import query_text, query_timings, run_prepared
+from data_etl_pipeline.query_cache import FUSEKI_DATASET, LOCAL_GRAPH, bump_graph_version, query_result_cache
+from data_etl_pipeline.data_extraction import (
+    NEWSAPI_KEY, NewsAPIExtractor, StockPriceExtractor, YahooFinanceExtractor, recent_news_articles
+)
+from data_etl_pipeline.data_transformation import create_rdf_graph, mark_news_ingested
+from data_etl_pipeline.ingest_index import SeenIndex
 from data_etl_pipeline.generate_rdf import generate_rdf_for_stock 
+from data_etl_pipeline.fuseki_client import FusekiClient
+from data_etl_pipeline.fuseki_loader import FusekiBulkLoader, ticker_graph_uri
+from data_etl_pipeline.price_series import PriceSeries
+from data_etl_pipeline.price_sidecar import PriceSidecar, sidecar_path_for
+from data_etl_pipeline.rdfs_materializer import RDFSMaterializer
+from data_etl_pipeline.rolling_analytics import AnalyticsStore
+from data_etl_pipeline.graph_views import DEFAULT_PAGE_SIZE, GraphIndex
+from data_etl_pipeline.graph_layout import layout_cache
+from data_etl_pipeline.cache_backend import cached_call
+from flask_api.wire_format import frame_response
+from flask_api.http_caching import conditional_get, file_last_modified, no_store
+from flask_api.jobs import JobQueue, JobStore, job_summary
+from flask_api.forecasts import linear_forecast, monte_carlo_forecast, polynomial_forecast
+from flask_api.coalescing import coalesce, json_body_key, request_flights
+from flask_api.metrics import instrument_app
+from flask_api.profiling import enable_profiling
+from data_etl_pipeline.providers import price_history, ticker_info
 
 app = Flask(__name__)
 CORS(app)
+instrument_app(app, "api")
+enable_profiling(app)
+
+APP_STARTED = datetime.now(timezone.utc)
 
 @app.route('/financial-metrics', methods=['GET'])
 def get_financial_metrics():
@@ -44,6 +66,7 @@ def get_financial_metrics():
         return jsonify({'error': str(e)}), 500
 
 @app.route('/stock-prices', methods=['GET'])
+@conditional_get()
 def get_stock_prices():
     try:
         ticker = request.args.get('ticker')
@@ -56,15 +79,17 @@ def get_stock_prices():
         extractor = StockPriceExtractor(ticker=ticker, start_date=start_date, end_date=end_date)
         stock_prices = extractor.fetch_stock_prices()
 
-        # Convert DataFrame to a list of dictionaries
+        # Records JSON by default; columnar/Arrow/MessagePack via Accept
         if isinstance(stock_prices, pd.DataFrame):
-            stock_prices = stock_prices.to_dict(orient='records')
+            return frame_response(stock_prices)
 
         return jsonify(stock_prices)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
   
 @app.route('/stock-prices/dynamic', methods=['GET'])
+@conditional_get()
+@coalesce()
 def get_dynamic_stock_prices():
     try:
         ticker = request.args.get('ticker')
@@ -73,17 +98,12 @@ def get_dynamic_stock_prices():
         if not ticker:
             return jsonify({"error": "Missing required parameter: 'ticker'."}), 400
 
-        stock = yf.Ticker(ticker)
-        historical_data = stock.history(period=period)
+        prices = PriceSeries.from_history(price_history(ticker, period=period))
 
-        if historical_data.empty:
+        if prices.empty:
             return jsonify({"error": f"No stock price data found for {ticker}."}), 404
 
-        # Reset index and rename columns
-        historical_data.reset_index(inplace=True)
-        historical_data.rename(columns={"Date": "isRecordedOn", "Close": "priceValue"}, inplace=True)
-
-        return jsonify(historical_data[["isRecordedOn", "priceValue"]].to_dict(orient="records"))
+        return frame_response(prices.to_frame(volume=None))
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -92,6 +112,8 @@ def clean_news_articles(news_data, company_name):
     if not isinstance(news_data, list):
         raise ValueError("Expected a list of news articles.")
 
+    from textblob import TextBlob
+
     unique_articles = {article['title']: article for article in news_data if isinstance(article, dict)}
     for article in unique_articles.values():
         article['title'] = article.get('title', '').strip()
@@ -101,6 +123,7 @@ def clean_news_articles(news_data, company_name):
     return list(unique_articles.values())
 
 @app.route('/run-pipeline', methods=['POST'])
+@coalesce(key_func=json_body_key)
 def run_pipeline():
     try:
         data = request.json
@@ -131,7 +154,7 @@ def run_pipeline():
             stock_prices["isRecordedOn"] = pd.to_datetime(stock_prices["isRecordedOn"]).dt.tz_localize(None)
 
         #  Fetch news articles
-        news_extractor = NewsAPIExtractor(api_key="d745b20dc64046fb9e52cc8e407427b2", company=company_name, start_date=start_date, end_date=end_date)
+        news_extractor = NewsAPIExtractor(api_key=NEWSAPI_KEY, company=company_name, start_date=start_date, end_date=end_date)
         news_articles = clean_news_articles(news_extractor.fetch_news_articles(), company_name)
 
         #  Fetch financial metrics
@@ -141,8 +164,7 @@ def run_pipeline():
         #  Fetch performance overview
         performance_overview = yahoo_extractor.fetch_performance_overview()
 
-        return jsonify({
-            "stock_prices": stock_prices.to_dict(orient="records"),  #  Always return list
+        return frame_response(stock_prices, key="stock_prices", envelope={
             "news_insights": news_articles,
             "financial_metrics": financial_metrics,
             "performance_overview": performance_overview
@@ -152,6 +174,8 @@ def run_pipeline():
         return jsonify({"error": str(e)}), 500
 
 @app.route('/financial-statistics', methods=['GET'])
+@conditional_get(max_age_closed=6 * 60 * 60)
+@coalesce()
 def get_financial_statistics():
     try:
         ticker = request.args.get('ticker')
@@ -167,269 +191,69 @@ def get_financial_statistics():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def forecast_args(params):
+    """Parses the ticker/days/end_date parameters of the regression forecast endpoints."""
+    ticker = params.get('ticker')
+    if not ticker:
+        raise ValueError("Missing required parameter: 'ticker'.")
+    return {"ticker": ticker, "days": int(params.get('days', 365)), "end_date": params.get('end_date')}
+
 @app.route('/predict-stock-prices/linear', methods=['GET'])
+@conditional_get(max_age_open=5 * 60)
+@coalesce()
 def predict_stock_prices_linear():
     try:
-        ticker = request.args.get('ticker')
-        days = int(request.args.get('days', 365))
-        end_date = request.args.get('end_date')
-
-        if not ticker:
-            return jsonify({"error": "Missing required parameter: 'ticker'."}), 400
-
-        if not end_date:
-            end_date = datetime.today().strftime('%Y-%m-%d')
-
-        start_date = (datetime.strptime(end_date, '%Y-%m-%d') - timedelta(days=365 * 10)).strftime('%Y-%m-%d')
-
-        stock = yf.Ticker(ticker)
-        historical_data = stock.history(start=start_date, end=end_date)
-
-        if historical_data.empty:
-            return jsonify({"error": f"No stock price data found for {ticker}."}), 404
-
-        historical_data.reset_index(inplace=True)
-        historical_data['days_since_start'] = (historical_data['Date'] - historical_data['Date'].min()).dt.days
-        X = historical_data[['days_since_start']]
-        y = historical_data['Close']
-
-        model = LinearRegression()
-        model.fit(X, y)
-
-        future_dates = pd.DataFrame({'days_since_start': [(X['days_since_start'].max() + i) for i in range(1, days + 1)]})
-        predicted_prices = model.predict(future_dates[['days_since_start']])
-
-        predictions = [{
-            "date": (datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=i)).strftime('%Y-%m-%d'),
-            "predicted_price": round(predicted_prices[i], 2)
-        } for i in range(len(predicted_prices))]
-
-        #  Create a more engaging Plotly figure
-        fig = go.Figure()
-
-        # Add historical stock prices
-        fig.add_trace(go.Scatter(
-            x=historical_data['Date'],
-            y=historical_data['Close'],
-            mode="lines",
-            name="Historical Prices",
-            line=dict(color="blue", width=2),
-            hovertemplate="Date: %{x} <br>Price: $%{y}"
-        ))
-
-        # Add predicted prices with confidence band
-        fig.add_trace(go.Scatter(
-            x=[datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=i) for i in range(1, days + 1)],
-            y=predicted_prices,
-            mode="lines",
-            name="Predicted Prices",
-            line=dict(color="red", width=3, dash="dash"),
-            hovertemplate="Date: %{x} <br>Predicted Price: $%{y}"
-        ))
-
-        # Add confidence interval (±5% margin)
-        lower_bound = predicted_prices * 0.95
-        upper_bound = predicted_prices * 1.05
-        fig.add_trace(go.Scatter(
-            x=[datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=i) for i in range(1, days + 1)],
-            y=upper_bound,
-            mode="lines",
-            fill="tonexty",
-            name="Upper Confidence",
-            line=dict(color="rgba(255, 0, 0, 0.3)"),
-            hoverinfo="skip"
-        ))
-        fig.add_trace(go.Scatter(
-            x=[datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=i) for i in range(1, days + 1)],
-            y=lower_bound,
-            mode="lines",
-            fill="tonexty",
-            name="Lower Confidence",
-            line=dict(color="rgba(255, 0, 0, 0.3)"),
-            hoverinfo="skip"
-        ))
-
-        # Enhance graph layout
-        fig.update_layout(
-            title=f"Stock Price Prediction for {ticker} (Linear Regression)",
-            xaxis_title="Time",
-            yaxis_title="Stock Price ($)",
-            template="plotly_dark",
-            hovermode="x unified",
-            showlegend=True,
-        )
-
-        plot_data_json = json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
-
-        return jsonify({"status": "success", "predictions": predictions, "plot_data": plot_data_json})
+        args = forecast_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
+    try:
+        return jsonify(linear_forecast(**args))
+    except LookupError as e:
+        return jsonify({"error": str(e)}), 404
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @app.route('/predict-stock-prices/polynomial', methods=['GET'])
+@conditional_get(max_age_open=5 * 60)
+@coalesce()
 def predict_stock_prices_polynomial():
     try:
-        ticker = request.args.get('ticker')
-        days = int(request.args.get('days', 365))
-        end_date = request.args.get('end_date')
-
-        if not ticker:
-            return jsonify({"error": "Missing required parameter: 'ticker'."}), 400
-
-        if not end_date:
-            end_date = datetime.today().strftime('%Y-%m-%d')
-
-        start_date = (datetime.strptime(end_date, '%Y-%m-%d') - timedelta(days=365 * 5)).strftime('%Y-%m-%d')
-
-        stock = yf.Ticker(ticker)
-        historical_data = stock.history(start=start_date, end=end_date)
-
-        if historical_data.empty:
-            return jsonify({"error": f"No stock price data found for {ticker}."}), 404
-
-        historical_data.reset_index(inplace=True)
-        historical_data['days_since_start'] = (historical_data['Date'] - historical_data['Date'].min()).dt.days
-        X = historical_data[['days_since_start']]
-        y = historical_data['Close']
-
-        #  Train Polynomial Regression Model (Degree = 3 for flexibility)
-        poly_model = make_pipeline(PolynomialFeatures(degree=3), LinearRegression())
-        poly_model.fit(X, y)
-
-        #  Predict future prices
-        future_dates = pd.DataFrame({'days_since_start': [(X['days_since_start'].max() + i) for i in range(1, days + 1)]})
-        predicted_prices = poly_model.predict(future_dates[['days_since_start']])
-
-        predictions = [{"date": (datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=i)).strftime('%Y-%m-%d'),
-                        "predicted_price": round(predicted_prices[i], 2)} for i in range(len(predicted_prices))]
-
-        #  Create an engaging Plotly figure
-        fig = go.Figure()
-
-        # Add historical stock prices
-        fig.add_trace(go.Scatter(
-            x=historical_data['Date'],
-            y=historical_data['Close'],
-            mode="lines",
-            name="Historical Prices",
-            line=dict(color="blue", width=2),
-            hovertemplate="Date: %{x} <br>Price: $%{y}"
-        ))
-
-        # Add predicted prices with confidence bands
-        fig.add_trace(go.Scatter(
-            x=[datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=i) for i in range(1, days + 1)],
-            y=predicted_prices,
-            mode="lines",
-            name="Predicted Prices",
-            line=dict(color="orange", width=3, dash="dash"),
-            hovertemplate="Date: %{x} <br>Predicted Price: $%{y}"
-        ))
-
-        # Add confidence interval (±5% margin)
-        lower_bound = predicted_prices * 0.95
-        upper_bound = predicted_prices * 1.05
-        fig.add_trace(go.Scatter(
-            x=[datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=i) for i in range(1, days + 1)],
-            y=upper_bound,
-            mode="lines",
-            fill="tonexty",
-            name="Upper Confidence",
-            line=dict(color="rgba(255, 140, 0, 0.3)"),
-            hoverinfo="skip"
-        ))
-        fig.add_trace(go.Scatter(
-            x=[datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=i) for i in range(1, days + 1)],
-            y=lower_bound,
-            mode="lines",
-            fill="tonexty",
-            name="Lower Confidence",
-            line=dict(color="rgba(255, 140, 0, 0.3)"),
-            hoverinfo="skip"
-        ))
-
-        # Enhance graph layout
-        fig.update_layout(
-            title=f"Stock Price Prediction for {ticker} (Polynomial Regression)",
-            xaxis_title="Time",
-            yaxis_title="Stock Price ($)",
-            template="plotly_dark",
-            hovermode="x unified",
-            showlegend=True,
-        )
-
-        plot_data_json = json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
-
-        return jsonify({
-            "status": "success",
-            "predictions": predictions,
-            "plot_data": plot_data_json  #  Ensure plot_data is always included
-        })
+        args = forecast_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
+    try:
+        return jsonify(polynomial_forecast(**args))
+    except LookupError as e:
+        return jsonify({"error": str(e)}), 404
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def monte_carlo_args(params):
+    """Parses the ticker/years parameters of the Monte Carlo endpoint."""
+    ticker = params.get("ticker")
+    try:
+        years = int(params.get("years") or 0)
+    except ValueError:
+        years = 0
+    if not ticker or not years:
+        raise ValueError("Missing 'ticker' or 'years' parameter.")
+    return {"ticker": ticker, "years": years}
+
 @app.route('/predict-stock-prices/monte-carlo', methods=['GET'])
+@conditional_get(max_age_open=5 * 60)
+@coalesce()
 def monte_carlo_simulation():
-    ticker = request.args.get("ticker")
-    years = request.args.get("years", type=int)
-
-    if not ticker or not years:
-        return jsonify({"error": "Missing 'ticker' or 'years' parameter."}), 400
-
-    # Fetch the latest stock price
-    stock = yf.Ticker(ticker)
-    data = stock.history(period="5y")["Close"]
-
-    if data.empty:
-        return jsonify({"error": "No historical data available for simulation."})
-
-    current_price = round(data.iloc[-1], 2)  # Get latest closing price
-
-    # Simulation Parameters
-    np.random.seed(42)
-    simulations = 1000
-    T = years * 252  # Trading days in a year
-    mu, sigma = data.pct_change().dropna().mean(), data.pct_change().dropna().std()
-
-    # Monte Carlo Simulation
-    price_paths = np.zeros((T, simulations))
-    price_paths[0] = current_price
-
-    for t in range(1, T):
-        random_shocks = np.random.normal(loc=mu, scale=sigma, size=simulations)
-        price_paths[t] = price_paths[t - 1] * (1 + random_shocks)
-
-    # Compute percentiles
-    percentiles = np.percentile(price_paths, [5, 50, 95], axis=1)
-    expected_price = round(percentiles[1, -1], 2)
-    price_range = [round(percentiles[0, -1], 2), round(percentiles[2, -1], 2)]
-
-    # Create Plotly graph JSON
-    fig = go.Figure()
-    for i in range(10):
-        fig.add_trace(go.Scatter(
-            x=list(range(T)),
-            y=price_paths[:, i],
-            mode="lines",
-            opacity=0.3,
-            name=f"Possible Stock Price Trajectory {i+1}"  # Renamed traces
-        ))
-
-    fig.update_layout(
-        title=f"Monte Carlo Simulation for {ticker}",
-        xaxis_title="Trading Days",
-        yaxis_title="Stock Price",
-        template="plotly_dark"
-    )
+    try:
+        args = monte_carlo_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-    return jsonify({
-        "ticker": ticker,
-        "current_price": current_price,  # Added current price
-        "expected_price": expected_price,
-        "price_range": price_range,
-        "plot_data": fig.to_json()
-    })
+    try:
+        return jsonify(monte_carlo_forecast(**args))
+    except LookupError as e:
+        return jsonify({"error": str(e)}), 404
 
 @app.route('/investment-insights', methods=['POST'])
 def investment_insights():
@@ -440,25 +264,12 @@ def investment_insights():
         if not ticker:
             return jsonify({"error": "Missing 'ticker' parameter"}), 400
 
-        query = f"""
-        PREFIX ex: <http://example.org/finance#>
-
-        SELECT ?metricName ?metricValue
-        WHERE {{
-            ?company a ex:Company ;
-                     ex:hasTicker "{ticker}" ;
-                     ex:hasFinancialMetric ?metric .
-
-            ?metric ex:metricName ?metricName ;
-                    ex:metricValue ?metricValue .
-        }}
-        """
-        results = run_sparql_query(query)
+        results = run_sparql_query("investment_insights", {"ticker": ticker})
         return jsonify(results)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-RDF_STORAGE_DIR = os.path.join(os.getcwd(), "rdf_data")
+RDF_STORAGE_DIR = os.environ.get("VILCORP_RDF_DIR") or os.path.join(os.getcwd(), "rdf_data")
 os.makedirs(RDF_STORAGE_DIR, exist_ok=True) 
 
 def get_rdf_file_path(ticker, years):
@@ -470,13 +281,31 @@ EX = Namespace("http://www.semanticweb.org/viljo/ontologies/2024/financial-ontol
 XSD_NS = Namespace("http://www.w3.org/2001/XMLSchema#")
 
 # Apache Fuseki Endpoint
-FUSEKI_ENDPOINT = "http://localhost:3030/financial-data"
+FUSEKI_ENDPOINT = os.environ.get("VILCORP_FUSEKI_ENDPOINT", "http://localhost:3030/financial-data")
+fuseki_loader = FusekiBulkLoader(FusekiClient(*FUSEKI_ENDPOINT.rsplit("/", 1)))
+
+# Background jobs for slow work (RDF generation/loading, long simulations)
+with startup_profile.phase("job store"):
+    job_queue = JobQueue(JobStore(os.path.join(RDF_STORAGE_DIR, "jobs.sqlite3")))
 
-# Load RDF Graph for Querying
-rdf_graph = Graph()
-rdf_graph.parse("ontology/financial_ontology.ttl", format="turtle")
+def rdf_file_last_modified(since_start=False):
+    """
+    Validator for RDF-backed endpoints: the mtime of the requested ticker's RDF file.
+
+    With since_start, never earlier than the app start, because that view also
+    loads the file into the in-process knowledge graph.
+    """
+    ticker = request.args.get('ticker')
+    if not ticker:
+        return None
+    years = str(request.args.get('years', 5)).rstrip('y')  # /rdf-graph-data takes "5y"
+    modified = file_last_modified(get_rdf_file_path(ticker, years))
+    if modified is not None and since_start:
+        modified = max(modified, APP_STARTED.replace(microsecond=0))
+    return modified
 
 @app.route('/rdf-graph-data', methods=['GET'])
+@conditional_get(last_modified=rdf_file_last_modified)
 def get_rdf_graph_data():
     try:
         ticker = request.args.get("ticker")
@@ -495,64 +324,302 @@ def get_rdf_graph_data():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-def store_rdf_in_fuseki(graph):
-    """Uploads RDF data to Apache Fuseki."""
-    headers = {"Content-Type": "text/turtle"}
-    response = requests.post(f"{FUSEKI_ENDPOINT}/data", data=graph.serialize(format="turtle"), headers=headers)
-    return response.status_code == 200
+# Articles already loaded into Fuseki, so reloading a ticker only sends new ones
+fuseki_news_index = SeenIndex(os.path.join(RDF_STORAGE_DIR, "fuseki_ingest_index.sqlite3"))
+
+def recent_news_graph(company_name, ticker):
+    """The company's recent articles not yet loaded into Fuseki, or None when the news fetch fails."""
+    try:
+        articles = clean_news_articles(recent_news_articles(company_name), company_name)
+    except Exception as e:
+        print(f"WARNING: Skipping news for {ticker}: {e}")
+        return None
+    return create_rdf_graph(None, articles, None, None, company_name, ticker=ticker, seen_index=fuseki_news_index)
+
+def store_rdf_in_fuseki(graph, ticker):
+    """
+    Loads RDF data and the ticker's recent news into its named graph in Apache Fuseki, sending only changed triples.
+
+    Articles are marked as ingested once their load succeeds, so later loads skip them.
+    """
+    graph_uri = ticker_graph_uri(ticker)
+    report = fuseki_loader.load(graph, graph_uri)
+    changed = report["triples_sent"] or report["triples_deleted"]
+
+    company_name = ticker_info(ticker).get("longName", ticker)
+    news_graph = recent_news_graph(company_name, ticker)
+    if news_graph is not None:
+        news_report = fuseki_loader.load(news_graph, graph_uri)
+        news_report["articles"] = mark_news_ingested(fuseki_news_index, news_graph, company_name, ticker)
+        report["news"] = news_report
+        changed = changed or news_report["triples_sent"] or news_report["triples_deleted"]
+
+    if changed:
+        bump_graph_version(FUSEKI_DATASET)
+    return report
+
+def rdf_store_job(ticker, years):
+    """Generates a stock's RDF and loads it into Fuseki (run as a bulk job)."""
+    rdf_data = generate_rdf_for_stock(ticker, years, as_graph=True)
+    if rdf_data is None:
+        raise LookupError("No data available")
+    return {"status": "success", "load": store_rdf_in_fuseki(rdf_data, ticker)}
 
 @app.route('/rdf-store', methods=['POST'])
 def store_rdf():
     ticker = request.json.get("ticker")
     years = request.json.get("years", 5)
+
+    if request.json.get("async"):
+        return submit_job("rdf-store", "bulk", rdf_store_job, ticker, years, params={"ticker": ticker, "years": years})
     
-    rdf_data = generate_rdf_for_stock(ticker, years)
+    rdf_data = generate_rdf_for_stock(ticker, years, as_graph=True)
     if rdf_data is None:
         return jsonify({"error": "No data available"}), 404
     
-    success = store_rdf_in_fuseki(rdf_data)
-    return jsonify({"status": "success" if success else "failed"})
+    try:
+        report = store_rdf_in_fuseki(rdf_data, ticker)
+    except Exception as e:
+        print(f"ERROR: {e}")
+        return jsonify({"status": "failed", "error": str(e)})
+    return jsonify({"status": "success", "load": report})
 
-def run_sparql_query(query):
-    """Executes a SPARQL query against the RDF knowledge graph."""
+def run_sparql_query(query, bindings=None):
+    """Executes a catalogue query (or raw SPARQL) against the RDF knowledge graph."""
     try:
-        qres = rdf_graph.query(query)
+        return query_result_cache.get_or_compute(
+            LOCAL_GRAPH, query_text(query), bindings, lambda: _evaluate_sparql_query(query, bindings)
+        )
+    except Exception as e:
+        return {"error": str(e)}
+
+def _evaluate_sparql_query(query, bindings):
+    with rdfs_materializer.reading():
+        qres = run_prepared(rdf_graph, query, bindings)
         results = []
         for row in qres:
             results.append({var: str(value) for var, value in zip(qres.vars, row)})
-        return {"head": {"vars": list(qres.vars)}, "results": {"bindings": results}}
-    except Exception as e:
-        return {"error": str(e)}
+    return {"head": {"vars": list(qres.vars)}, "results": {"bindings": results}}
 
-@app.route('/rdf-stock-data', methods=['GET'])
-def get_rdf_stock_data():
-    ticker = request.args.get('ticker')
-    years = int(request.args.get('years', 5))
+def layout_requested(params):
+    return str(params.get('layout', '0')).lower() in ('1', 'true', 'yes')
 
-    if not ticker:
-        return jsonify({"error": "Missing 'ticker' parameter."}), 400
+def with_layout(graph_json, scope, layout):
+    """Adds cached server-side node positions when layout (the layout=1 parameter) is set."""
+    if layout:
+        layout_cache.apply(graph_json, scope)
+    return graph_json
 
+@app.route('/sparql-query-stats', methods=['GET'])
+def get_sparql_query_stats():
+    """Reports call counts and execution times per named SPARQL query."""
+    return jsonify({
+        "queries": query_timings(),
+        "result_cache": query_result_cache.stats(),
+        "layout_cache": layout_cache.stats(),
+        "coalescing": request_flights.stats(),
+    })
+
+def ensure_rdf_file(ticker, years):
+    """Returns the RDF file for a stock, generating it (and its price sidecar) if missing."""
     rdf_file_path = get_rdf_file_path(ticker, years)
 
     if not os.path.exists(rdf_file_path):
         print(f"RDF for {ticker} ({years} years) not found. Generating RDF...")
-        rdf_data = generate_rdf_for_stock(ticker, years)
+        rdf_data = generate_rdf_for_stock(ticker, years, sidecar_path=sidecar_path_for(rdf_file_path))
 
         if rdf_data:
             with open(rdf_file_path, "w", encoding="utf-8") as rdf_file:
                 rdf_file.write(rdf_data)
             print(f"RDF saved at {rdf_file_path}")
+            bump_graph_version(LOCAL_GRAPH)
         else:
             print(f"Failed to generate RDF for {ticker}. Check logs for errors.")
+            return None
+
+    return rdf_file_path
+
+def ensure_rdf_file_job(ticker, years):
+    rdf_file_path = ensure_rdf_file(ticker, years)
+    if rdf_file_path is None:
+        raise LookupError(f"Failed to generate RDF for {ticker}")
+    return {"ticker": ticker, "years": years, "rdf_file": os.path.basename(rdf_file_path)}
+
+_price_sidecars = {}
+
+def load_price_sidecar(rdf_file_path):
+    """Loads the price sidecar for an RDF file, rebuilding it from the RDF if it is missing."""
+    path = sidecar_path_for(rdf_file_path)
+    if not os.path.exists(path):
+        graph = rdflib.Graph()
+        graph.parse(rdf_file_path, format="turtle")
+        PriceSidecar.from_graph(graph).save(path)
+
+    mtime = os.path.getmtime(path)
+    cached = _price_sidecars.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, PriceSidecar.load(path))
+        _price_sidecars[path] = cached
+    return cached[1]
+
+@app.route('/rdf-stock-prices', methods=['GET'])
+@conditional_get(last_modified=rdf_file_last_modified)
+def get_rdf_stock_prices():
+    """Serves a date range of a stock's RDF price bars from its columnar sidecar."""
+    try:
+        ticker = request.args.get('ticker')
+        years = int(request.args.get('years', 5))
+        start_date = request.args.get('start_date')
+        end_date = request.args.get('end_date')
+
+        if not ticker:
+            return jsonify({"error": "Missing 'ticker' parameter."}), 400
+
+        rdf_file_path = ensure_rdf_file(ticker, years)
+        if rdf_file_path is None:
             return jsonify({"error": f"Failed to generate RDF for {ticker}"}), 500
 
+        sidecar = load_price_sidecar(rdf_file_path)
+        return jsonify(sidecar.range_records(start_date, end_date))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# Rolling indicators, materialized per ticker and extended bar by bar
+analytics_store = AnalyticsStore(os.path.join(RDF_STORAGE_DIR, "analytics"))
+
+@app.route('/analytics', methods=['GET'])
+@conditional_get(max_age_open=5 * 60)
+@coalesce()
+def get_rolling_analytics():
+    """
+    Serves a date range of a stock's rolling indicators as columns
+    (?indicators=sma_50,volatility_20,beta_60,max_drawdown; default all).
+    """
+    try:
+        ticker = request.args.get('ticker')
+        if not ticker:
+            return jsonify({"error": "Missing 'ticker' parameter."}), 400
+
+        requested = [name for name in request.args.get('indicators', '').split(',') if name]
+        unknown = [name for name in requested if name not in analytics_store.indicators]
+        if unknown:
+            return jsonify({"error": f"Unknown indicator(s): {', '.join(unknown)}",
+                            "indicators": analytics_store.indicators}), 400
+
+        frame = analytics_store.frame(ticker, requested, request.args.get('start_date'), request.args.get('end_date'))
+        return frame_response(frame, key="analytics", envelope={
+            "ticker": ticker,
+            "benchmark": analytics_store.benchmark or None
+        })
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except LookupError as e:
+        return jsonify({"error": str(e)}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+def rdf_stock_data_args(params):
+    ticker = params.get('ticker')
+    if not ticker:
+        raise ValueError("Missing 'ticker' parameter.")
+    return {"ticker": ticker, "years": int(params.get('years', 5)), "layout": layout_requested(params)}
+
+def rdf_stock_data(ticker, years, layout=False):
+    """A stock's RDF graph as nodes and edges, generating the file and loading it into the knowledge graph first."""
+    rdf_file_path = ensure_rdf_file(ticker, years)
+    if rdf_file_path is None:
+        raise RuntimeError(f"Failed to generate RDF for {ticker}")
+
     #  Load RDF Graph from file
     rdf_graph = rdflib.Graph()
     rdf_graph.parse(rdf_file_path, format="turtle")
+    add_to_knowledge_graph(ticker, rdf_graph)
 
     json_data = parse_rdf_to_json(rdf_graph)
 
-    return jsonify(json_data)
+    return with_layout(json_data, f"rdf-stock-data:{ticker}:{years}", layout)
+
+@app.route('/rdf-stock-data', methods=['GET'])
+@conditional_get(last_modified=lambda: rdf_file_last_modified(since_start=True))
+def get_rdf_stock_data():
+    try:
+        args = rdf_stock_data_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    ticker, years = args["ticker"], args["years"]
+
+    # First-time generation can take minutes; with async=1 it runs as a bulk job instead
+    if request.args.get('async') == '1' and not os.path.exists(get_rdf_file_path(ticker, years)):
+        return submit_job("rdf-generate", "bulk", ensure_rdf_file_job, ticker, years,
+                          params={"ticker": ticker, "years": years})
+
+    try:
+        return jsonify(rdf_stock_data(**args))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+_graph_indexes = {}
+
+def load_graph_index(rdf_file_path):
+    """Returns the adjacency index for an RDF file, rebuilding it when the file changes."""
+    mtime = os.path.getmtime(rdf_file_path)
+    cached = _graph_indexes.get(rdf_file_path)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, GraphIndex.from_file(rdf_file_path))
+        _graph_indexes[rdf_file_path] = cached
+    return cached[1]
+
+def rdf_graph_view_args(params):
+    ticker = params.get('ticker')
+    if not ticker:
+        raise ValueError("Missing 'ticker' parameter.")
+    types = params.get('types')
+    return {
+        "ticker": ticker,
+        "years": int(params.get('years', 5)),
+        "root": params.get('root'),
+        "depth": int(params.get('depth', 1)),
+        "page": int(params.get('page', 1)),
+        "page_size": int(params.get('page_size', DEFAULT_PAGE_SIZE)),
+        "types": [name.strip() for name in types.split(',') if name.strip()] if types else None,
+        "aggregate": str(params.get('aggregate', '1')).lower() not in ('0', 'false', 'no'),
+        "layout": layout_requested(params),
+    }
+
+def rdf_graph_view(ticker, years, root=None, depth=1, page=1, page_size=DEFAULT_PAGE_SIZE, types=None,
+                   aggregate=True, layout=False):
+    """A paged neighbourhood of a stock's RDF graph, generating the RDF file if needed."""
+    rdf_file_path = ensure_rdf_file(ticker, years)
+    if rdf_file_path is None:
+        raise RuntimeError(f"Failed to generate RDF for {ticker}")
+
+    view = load_graph_index(rdf_file_path).neighborhood(
+        root=root, depth=depth, page=page, page_size=page_size, types=types, aggregate=aggregate,
+    )
+    return with_layout(view, f"rdf-graph-view:{ticker}:{years}:{root}", layout)
+
+@app.route('/rdf-graph-view', methods=['GET'])
+@conditional_get(last_modified=rdf_file_last_modified)
+def get_rdf_graph_view():
+    """Serves a paged neighbourhood of a stock's RDF graph for the graph explorers."""
+    try:
+        args = rdf_graph_view_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        return jsonify(rdf_graph_view(**args))
+    except KeyError as e:
+        return jsonify({"error": str(e.args[0])}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+def add_to_knowledge_graph(ticker, graph):
+    """Adds a ticker's triples to the queryable graph, materializing their RDFS entailments once."""
+    added, inferred = rdfs_materializer.add(graph, ticker_graph_uri(ticker))
+    if added:
+        bump_graph_version(LOCAL_GRAPH)
+    return inferred
 
 def parse_rdf_to_json(rdf_graph):
     """Convert RDF Graph to JSON for frontend visualization"""
@@ -576,41 +643,143 @@ def parse_rdf_to_json(rdf_graph):
     json_data["nodes"] = list(node_labels.values())
     return json_data
 
+ONTOLOGY_FETCH_WORKERS = 8
+ONTOLOGY_CACHE_TTL = 15 * 60  # seconds
+ONTOLOGY_METRICS = [
+    ("P/E Ratio", "trailingPE"),
+    ("Revenue", "totalRevenue"),
+    ("Market Cap", "marketCap"),
+    ("Stock Price", "currentPrice"),
+]
+
+def build_ticker_ontology(ticker):
+    """Builds one ticker's company, metric and sentiment nodes from a single read of its info."""
+    info = ticker_info(ticker)
+    company_name = info.get("shortName", ticker)
+    market_sentiment = "Positive" if info.get("recommendationKey") == "buy" else "Neutral"
+
+    nodes = [{"id": ticker, "label": ticker, "title": company_name, "shape": "box", "color": "#4caf50"}]
+    edges = []
+    for metric, key in ONTOLOGY_METRICS:
+        value = info.get(key, "N/A")
+        if value != "N/A":
+            metric_id = f"{ticker}_{metric.replace(' ', '_')}"
+            nodes.append({"id": metric_id, "label": metric, "title": f"{metric}: ${value}", "color": "#ff9800"})
+            edges.append({"from": ticker, "to": metric_id, "label": "has metric"})
+
+    sentiment_color = "#9c27b0" if market_sentiment == "Positive" else "#d32f2f"
+    nodes.append({"id": f"{ticker}_sentiment", "label": "Market Sentiment", "title": market_sentiment, "color": sentiment_color})
+    edges.append({"from": ticker, "to": f"{ticker}_sentiment", "label": "has sentiment"})
+    return {"nodes": nodes, "edges": edges}
+
+def get_ticker_ontology(ticker):
+    """Returns a ticker's ontology subgraph, shared through the cache backend for ONTOLOGY_CACHE_TTL seconds."""
+    return cached_call("ontology-subgraph", ticker, lambda: build_ticker_ontology(ticker), ttl=ONTOLOGY_CACHE_TTL)
+
 @app.route('/financial-ontology', methods=['GET'])
+@conditional_get(max_age_closed=6 * 60 * 60)
+@coalesce()
 def get_financial_ontology():
     
     try:
         tickers = request.args.get('tickers', 'AAPL,TSLA,GOOG').split(',')
-        ontology_data = {"nodes": [], "edges": []}
-
-        for ticker in tickers:
-            stock = yf.Ticker(ticker)
-            company_name = stock.info.get("shortName", ticker)
-            pe_ratio = stock.info.get("trailingPE", "N/A")
-            revenue = stock.info.get("totalRevenue", "N/A")
-            market_cap = stock.info.get("marketCap", "N/A")
-            stock_price = stock.info.get("currentPrice", "N/A")
-            market_sentiment = "Positive" if stock.info.get("recommendationKey") == "buy" else "Neutral"
+        tickers = list(dict.fromkeys(ticker.strip() for ticker in tickers if ticker.strip()))
 
-            #  Add company node
-            ontology_data["nodes"].append({"id": ticker, "label": ticker, "title": company_name, "shape": "box", "color": "#4caf50"})
+        #  Fetch all tickers concurrently; cached subgraphs return immediately
+        with ThreadPoolExecutor(max_workers=min(ONTOLOGY_FETCH_WORKERS, max(len(tickers), 1))) as executor:
+            futures = [executor.submit(get_ticker_ontology, ticker) for ticker in tickers]
 
-            #  Add financial metric nodes
-            for metric, value in [("P/E Ratio", pe_ratio), ("Revenue", revenue), ("Market Cap", market_cap), ("Stock Price", stock_price)]:
-                if value != "N/A":
-                    ontology_data["nodes"].append({"id": f"{ticker}_{metric.replace(' ', '_')}", "label": metric, "title": f"{metric}: ${value}", "color": "#ff9800"})
-                    ontology_data["edges"].append({"from": ticker, "to": f"{ticker}_{metric.replace(' ', '_')}", "label": "has metric"})
+        ontology_data = {"nodes": [], "edges": []}
+        errors = {}
+        for ticker, future in zip(tickers, futures):
+            try:
+                subgraph = future.result()
+            except Exception as e:
+                errors[ticker] = str(e)
+                continue
+            ontology_data["nodes"].extend(dict(node) for node in subgraph["nodes"])
+            ontology_data["edges"].extend(subgraph["edges"])
+
+        if errors and len(errors) == len(tickers):
+            return jsonify({"error": "; ".join(f"{t}: {e}" for t, e in errors.items())}), 500
+        if errors:
+            ontology_data["errors"] = errors
+
+        response = jsonify(with_layout(ontology_data, "financial-ontology", layout_requested(request.args)))
+        return no_store(response) if errors else response  # a partial graph must not be cached
 
-            #  Sentiment node
-            sentiment_color = "#9c27b0" if market_sentiment == "Positive" else "#d32f2f"
-            ontology_data["nodes"].append({"id": f"{ticker}_sentiment", "label": "Market Sentiment", "title": market_sentiment, "color": sentiment_color})
-            ontology_data["edges"].append({"from": ticker, "to": f"{ticker}_sentiment", "label": "has sentiment"})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
-        return jsonify(ontology_data)
+# GET endpoints that can be submitted through /jobs: lane, the plain function
+# behind the view, and the parser turning the job's params into its arguments.
+# Functions on the "cpu" (process) lane must live in a module workers can
+# import without the API, e.g. flask_api.forecasts.
+JOB_ENDPOINTS = {
+    "/predict-stock-prices/linear": ("interactive", linear_forecast, forecast_args),
+    "/predict-stock-prices/polynomial": ("interactive", polynomial_forecast, forecast_args),
+    "/predict-stock-prices/monte-carlo": ("cpu", monte_carlo_forecast, monte_carlo_args),
+    "/rdf-stock-data": ("bulk", rdf_stock_data, rdf_stock_data_args),
+    "/rdf-graph-view": ("bulk", rdf_graph_view, rdf_graph_view_args),
+}
+
+def submit_job(kind, lane, func, *args, params=None, **kwargs):
+    job, reused = job_queue.submit(kind, lane, func, *args, params=params, **kwargs)
+    response = jsonify({
+        "job_id": job["id"],
+        "status": job["status"],
+        "deduplicated": reused,
+        "status_url": f"/jobs/{job['id']}",
+        "result_url": f"/jobs/{job['id']}/result",
+    })
+    response.status_code = 202
+    response.headers["Location"] = f"/jobs/{job['id']}"
+    return response
 
+@app.route('/jobs', methods=['POST'])
+def create_job():
+    """Queues a slow GET endpoint as a background job: {"endpoint": "/predict-stock-prices/monte-carlo", "params": {...}}."""
+    try:
+        data = request.json or {}
+        endpoint = data.get("endpoint")
+        params = {key: str(value) for key, value in (data.get("params") or {}).items()}
+        if endpoint not in JOB_ENDPOINTS:
+            return jsonify({"error": f"Endpoint cannot run as a job. Supported: {', '.join(JOB_ENDPOINTS)}"}), 400
+
+        lane, func, parse_args = JOB_ENDPOINTS[endpoint]
+        try:
+            args = parse_args(params)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return submit_job(endpoint, lane, func, params=params, **args)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/jobs', methods=['GET'])
+def get_job_stats():
+    return jsonify(job_queue.stats())
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job_status(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": f"Unknown or expired job: {job_id}"}), 404
+    return jsonify(job_summary(job))
+
+@app.route('/jobs/<job_id>/result', methods=['GET'])
+def get_job_result(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": f"Unknown or expired job: {job_id}"}), 404
+    if job["status"] == "failed":
+        return jsonify({"error": job["error"], "job_id": job_id}), 500
+    if job["status"] != "done":
+        response = jsonify(job_summary(job))
+        response.status_code = 202
+        response.headers["Retry-After"] = "2"
+        return response
+    return jsonify(job["result"])
+
 def load_rdf_graph():
     """Loads RDF Graph and ensures all necessary namespaces are bound."""
     g = Graph()
@@ -624,7 +793,18 @@ def load_rdf_graph():
     except Exception as e:
         print(f"ERROR: {e}")
         return None
-rdf_graph = load_rdf_graph()
+# The ontology is parsed once, here; everything below works on the materialized dataset
+with startup_profile.phase("ontology load"):
+    rdf_graph = load_rdf_graph()
+
+# Ontology plus loaded ticker graphs, with RDFS entailments in their own named graph
+with startup_profile.phase("RDFS materialization"):
+    rdfs_materializer = RDFSMaterializer(rdf_graph)
+    rdf_graph = rdfs_materializer.dataset
+
+if startup_profile.enabled:
+    startup_profile.stop()
+    startup_profile.print_report()
 
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
\ No newline at end of file
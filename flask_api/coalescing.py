@@ -0,0 +1,119 @@
+import json
+import os
+from functools import wraps
+from threading import Event, Lock
+
+from flask import Response, make_response, request
+
+# Seconds a follower waits for the leader before computing the response itself
+DEFAULT_WAIT_TIMEOUT = float(os.environ.get("VILCORP_COALESCE_TIMEOUT", "30"))
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self, wait_timeout=DEFAULT_WAIT_TIMEOUT):
+        """
+        Runs at most one computation per key at a time; concurrent callers share its outcome.
+
+        Followers wait at most wait_timeout seconds (None waits forever) so a
+        hung leader cannot pin every request for its key; after that they run
+        func() themselves.
+        """
+        self.wait_timeout = wait_timeout
+        self._calls = {}
+        self._lock = Lock()
+        self.leaders = 0
+        self.followers = 0
+        self.timeouts = 0
+
+    def do(self, key, func):
+        """
+        Returns (result, shared): func() run by the first caller for key, or
+        that caller's result (or exception) for anyone arriving while it runs.
+        A follower whose wait times out returns its own func() with shared=False.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.followers += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+                leader = True
+
+        if not leader:
+            if not call.done.wait(self.wait_timeout):
+                with self._lock:
+                    self.timeouts += 1
+                return func(), False
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            # Later requests start a fresh computation; only concurrent ones share
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def stats(self):
+        with self._lock:
+            return {"in_flight": len(self._calls), "leaders": self.leaders, "followers": self.followers,
+                    "timeouts": self.timeouts}
+
+
+request_flights = SingleFlight()
+
+
+def query_key():
+    """Default key: path, sorted query parameters and the negotiated representation."""
+    args = sorted((key, value) for key, values in request.args.lists() for value in values)
+    return json.dumps([request.path, args, request.headers.get("Accept", ""), request.headers.get("Accept-Encoding", "")])
+
+
+def json_body_key():
+    """Key for POST endpoints: path plus the JSON body with keys sorted."""
+    body = request.get_json(silent=True)
+    return json.dumps([request.path, body, request.headers.get("Accept", ""), request.headers.get("Accept-Encoding", "")],
+                      sort_keys=True, default=str)
+
+
+def coalesce(key_func=query_key, flights=request_flights):
+    """
+    Opts a view into single-flight coalescing.
+
+    Requests that arrive while an identical one (same key_func() value) is being
+    computed wait for it and get a copy of its response. Only the body, status
+    and headers are shared, never the Response object itself.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            key = f"{view.__module__}.{view.__name__}:{key_func()}"
+
+            def compute():
+                response = make_response(view(*args, **kwargs))
+                return response.get_data(), response.status_code, list(response.headers.items())
+
+            (body, status, headers), shared = flights.do(key, compute)
+            response = Response(body, status=status, headers=headers)
+            if shared:
+                response.headers["X-Coalesced"] = "1"
+            return response
+        return wrapper
+    return decorator
@@ -1,16 +1,27 @@
 import os
-import requests
+import sys
 import json
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask_api.http_caching import conditional_get, no_store
+from flask_api.metrics import instrument_app
+from flask_api.profiling import enable_profiling
+from data_etl_pipeline.providers import http_get
+
 app = Flask(__name__)
 CORS(app)
+instrument_app(app, "finnhub")
+enable_profiling(app)
 
 FINNHUB_API_KEY = os.environ.get("FINNHUB_API_KEY", "cv4aevhr01qn2ga92l9gcv4aevhr01qn2ga92la0")
-WIKIDATA_ENDPOINT = "https://query.wikidata.org/sparql"
+FINNHUB_BASE_URL = os.environ.get("VILCORP_FINNHUB_URL", "https://finnhub.io/api/v1")
+WIKIDATA_ENDPOINT = os.environ.get("VILCORP_WIKIDATA_ENDPOINT", "https://query.wikidata.org/sparql")
 
 @app.route('/finnhub-data', methods=['GET'])
+@conditional_get(max_age_open=15 * 60, max_age_closed=6 * 60 * 60)
 def get_finnhub_data():
     """
     Example endpoint that fetches:
@@ -37,43 +48,48 @@ def get_finnhub_data():
     if profile_data and "name" in profile_data:
         wikidata_data = fetch_wikidata(profile_data["name"])
 
-    return jsonify({
+    parts = {
         "profile": profile_data,
         "financials": financials_data,
         "secFilings": sec_filings_data,
         "insider": insider_data,
         "news": news_data,
         "wikidata": wikidata_data
-    })
+    }
+    response = jsonify(parts)
+    # a failed Finnhub call must not be cached until the next market close
+    if any(isinstance(part, dict) and "error" in part for part in parts.values()):
+        return no_store(response)
+    return response
+
+def finnhub_get(operation, path, **params):
+    """GET a Finnhub API path through the provider layer (the token never enters recordings)."""
+    return http_get("finnhub", operation, FINNHUB_BASE_URL + path, params=dict(params, token=FINNHUB_API_KEY))
 
 def fetch_company_profile(ticker):
     """Fetch company profile from Finnhub."""
-    url = f"https://finnhub.io/api/v1/stock/profile2?symbol={ticker}&token={FINNHUB_API_KEY}"
-    r = requests.get(url)
+    r = finnhub_get("profile", "/stock/profile2", symbol=ticker)
     if r.status_code == 200:
         return r.json()
     return {"error": f"Profile not found for {ticker}"}
 
 def fetch_financials(ticker):
     """Fetch standardized or as-reported financials from Finnhub."""
-    url = f"https://finnhub.io/api/v1/stock/financials-reported?symbol={ticker}&token={FINNHUB_API_KEY}"
-    r = requests.get(url)
+    r = finnhub_get("financials", "/stock/financials-reported", symbol=ticker)
     if r.status_code == 200:
         return r.json()
     return {"error": f"Financials not found for {ticker}"}
 
 def fetch_sec_filings(ticker):
     """Fetch SEC filings from Finnhub."""
-    url = f"https://finnhub.io/api/v1/stock/filings?symbol={ticker}&token={FINNHUB_API_KEY}"
-    r = requests.get(url)
+    r = finnhub_get("filings", "/stock/filings", symbol=ticker)
     if r.status_code == 200:
         return r.json()
     return {"error": f"SEC filings not found for {ticker}"}
 
 def fetch_insider(ticker):
     """Fetch insider transactions / institutional holdings from Finnhub."""
-    url = f"https://finnhub.io/api/v1/stock/insider-transactions?symbol={ticker}&token={FINNHUB_API_KEY}"
-    r = requests.get(url)
+    r = finnhub_get("insider-transactions", "/stock/insider-transactions", symbol=ticker)
     if r.status_code == 200:
         return r.json()
     return {"error": f"Insider data not found for {ticker}"}
@@ -83,8 +99,7 @@ def fetch_company_news(ticker):
     import datetime
     end_date = datetime.date.today()
     start_date = end_date - datetime.timedelta(days=365)
-    url = f"https://finnhub.io/api/v1/company-news?symbol={ticker}&from={start_date}&to={end_date}&token={FINNHUB_API_KEY}"
-    r = requests.get(url)
+    r = finnhub_get("company-news", "/company-news", symbol=ticker, **{"from": str(start_date), "to": str(end_date)})
     if r.status_code == 200:
         return r.json()
     return {"error": f"Company news not found for {ticker}"}
@@ -100,8 +115,7 @@ def fetch_wikidata(company_name):
     }}
     LIMIT 1
     """
-    url = WIKIDATA_ENDPOINT + "?format=json&query=" + requests.utils.quote(query)
-    r = requests.get(url)
+    r = http_get("wikidata", "company", WIKIDATA_ENDPOINT, params={"format": "json", "query": query})
     if r.status_code == 200:
         data = r.json()
         if data["results"]["bindings"]:
@@ -0,0 +1,183 @@
+import json
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from data_etl_pipeline.price_series import PriceSeries
+from data_etl_pipeline.providers import price_history
+
+### Price forecasts behind the /predict-stock-prices endpoints.
+# Plain functions of their parameters with no Flask or app state, so the job
+# queue can run them directly; process-pool workers import only this module
+# and its data_etl_pipeline dependencies, not the API.
+
+
+def _regression_forecast(ticker, days, end_date, years, model, title, line_color, band_color):
+    """Fits model on the last `years` of closes against calendar days and extrapolates `days` ahead."""
+    if not end_date:
+        end_date = datetime.today().strftime('%Y-%m-%d')
+
+    end = datetime.strptime(end_date, '%Y-%m-%d')
+    start_date = (end - timedelta(days=365 * years)).strftime('%Y-%m-%d')
+
+    prices = PriceSeries.from_history(price_history(ticker, start=start_date, end=end_date))
+
+    if prices.empty:
+        raise LookupError(f"No stock price data found for {ticker}.")
+
+    X = prices.days_since_start().reshape(-1, 1)
+    model.fit(X, prices.close)
+
+    future_days = (X[-1, 0] + np.arange(1, days + 1)).reshape(-1, 1)
+    predicted_prices = model.predict(future_days)
+
+    predictions = [{
+        "date": (end + timedelta(days=i)).strftime('%Y-%m-%d'),
+        "predicted_price": round(predicted_prices[i], 2)
+    } for i in range(len(predicted_prices))]
+
+    import plotly
+    import plotly.graph_objects as go
+
+    future_dates = [end + timedelta(days=i) for i in range(1, days + 1)]
+    fig = go.Figure()
+
+    # Add historical stock prices
+    fig.add_trace(go.Scatter(
+        x=prices.dates,
+        y=prices.close,
+        mode="lines",
+        name="Historical Prices",
+        line=dict(color="blue", width=2),
+        hovertemplate="Date: %{x} <br>Price: $%{y}"
+    ))
+
+    # Add predicted prices with confidence band
+    fig.add_trace(go.Scatter(
+        x=future_dates,
+        y=predicted_prices,
+        mode="lines",
+        name="Predicted Prices",
+        line=dict(color=line_color, width=3, dash="dash"),
+        hovertemplate="Date: %{x} <br>Predicted Price: $%{y}"
+    ))
+
+    # Add confidence interval (±5% margin)
+    fig.add_trace(go.Scatter(
+        x=future_dates,
+        y=predicted_prices * 1.05,
+        mode="lines",
+        fill="tonexty",
+        name="Upper Confidence",
+        line=dict(color=band_color),
+        hoverinfo="skip"
+    ))
+    fig.add_trace(go.Scatter(
+        x=future_dates,
+        y=predicted_prices * 0.95,
+        mode="lines",
+        fill="tonexty",
+        name="Lower Confidence",
+        line=dict(color=band_color),
+        hoverinfo="skip"
+    ))
+
+    # Enhance graph layout
+    fig.update_layout(
+        title=f"Stock Price Prediction for {ticker} ({title})",
+        xaxis_title="Time",
+        yaxis_title="Stock Price ($)",
+        template="plotly_dark",
+        hovermode="x unified",
+        showlegend=True,
+    )
+
+    return {
+        "status": "success",
+        "predictions": predictions,
+        "plot_data": json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
+    }
+
+
+def linear_forecast(ticker, days=365, end_date=None):
+    """Linear regression over ten years of closes, extrapolated `days` past end_date (default today)."""
+    from sklearn.linear_model import LinearRegression
+
+    return _regression_forecast(ticker, days, end_date, 10, LinearRegression(), "Linear Regression",
+                                "red", "rgba(255, 0, 0, 0.3)")
+
+
+def polynomial_forecast(ticker, days=365, end_date=None):
+    """Cubic polynomial regression over five years of closes, extrapolated `days` past end_date (default today)."""
+    from sklearn.linear_model import LinearRegression
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import PolynomialFeatures
+
+    #  Degree 3 for flexibility
+    model = make_pipeline(PolynomialFeatures(degree=3), LinearRegression())
+    return _regression_forecast(ticker, days, end_date, 5, model, "Polynomial Regression",
+                                "orange", "rgba(255, 140, 0, 0.3)")
+
+
+def monte_carlo_forecast(ticker, years):
+    """Runs the Monte Carlo price simulation for a ticker."""
+    # Fetch the latest stock price
+    close = PriceSeries.from_history(price_history(ticker, period="5y")).close
+    finite = close[np.isfinite(close)]
+
+    if not len(finite):
+        raise LookupError("No historical data available for simulation.")
+
+    current_price = round(finite[-1], 2)  # Get latest closing price
+
+    # Simulation Parameters
+    np.random.seed(42)
+    simulations = 1000
+    T = years * 252  # Trading days in a year
+    # Missing closes (NaN bars) would poison the moments, so drop the returns
+    # they touch, as pct_change().dropna() did
+    returns = close[1:] / close[:-1] - 1
+    returns = returns[np.isfinite(returns)]
+    if len(returns) < 2:
+        raise LookupError("Not enough historical data available for simulation.")
+    mu, sigma = returns.mean(), returns.std(ddof=1)
+
+    # Monte Carlo Simulation
+    price_paths = np.zeros((T, simulations))
+    price_paths[0] = current_price
+
+    for t in range(1, T):
+        random_shocks = np.random.normal(loc=mu, scale=sigma, size=simulations)
+        price_paths[t] = price_paths[t - 1] * (1 + random_shocks)
+
+    # Compute percentiles
+    percentiles = np.percentile(price_paths, [5, 50, 95], axis=1)
+    expected_price = round(percentiles[1, -1], 2)
+    price_range = [round(percentiles[0, -1], 2), round(percentiles[2, -1], 2)]
+
+    # Create Plotly graph JSON
+    import plotly.graph_objects as go
+    fig = go.Figure()
+    for i in range(10):
+        fig.add_trace(go.Scatter(
+            x=list(range(T)),
+            y=price_paths[:, i],
+            mode="lines",
+            opacity=0.3,
+            name=f"Possible Stock Price Trajectory {i+1}"  # Renamed traces
+        ))
+
+    fig.update_layout(
+        title=f"Monte Carlo Simulation for {ticker}",
+        xaxis_title="Trading Days",
+        yaxis_title="Stock Price",
+        template="plotly_dark"
+    )
+
+    return {
+        "ticker": ticker,
+        "current_price": float(current_price),  # Added current price
+        "expected_price": float(expected_price),
+        "price_range": [float(price) for price in price_range],
+        "plot_data": fig.to_json()
+    }
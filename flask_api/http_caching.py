@@ -0,0 +1,139 @@
+import hashlib
+import os
+from datetime import datetime, time, timedelta, timezone
+from functools import wraps
+from zoneinfo import ZoneInfo
+
+from flask import make_response, request
+
+MARKET_TIMEZONE = ZoneInfo("America/New_York")
+MARKET_OPEN = time(9, 30)
+MARKET_CLOSE = time(16, 0)
+INTRADAY_BUCKET = 60  # seconds; validators roll over at most this often while the market is open
+
+DEFAULT_MAX_AGE_OPEN = 60
+DEFAULT_MAX_AGE_CLOSED = 60 * 60
+
+
+def market_is_open(now=None):
+    """True during regular NYSE hours (weekdays 09:30-16:00 New York time; holidays are not modelled)."""
+    local = (now or datetime.now(timezone.utc)).astimezone(MARKET_TIMEZONE)
+    return local.weekday() < 5 and MARKET_OPEN <= local.time() < MARKET_CLOSE
+
+
+def last_market_close(now=None):
+    """Returns the most recent weekday 16:00 New York close at or before now, in UTC."""
+    local = (now or datetime.now(timezone.utc)).astimezone(MARKET_TIMEZONE)
+    day = local.date()
+    if local.time() < MARKET_CLOSE:
+        day -= timedelta(days=1)
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    return datetime.combine(day, MARKET_CLOSE, MARKET_TIMEZONE).astimezone(timezone.utc)
+
+
+def next_market_open(now=None):
+    """Returns the next weekday 09:30 New York open after now, in UTC."""
+    local = (now or datetime.now(timezone.utc)).astimezone(MARKET_TIMEZONE)
+    day = local.date()
+    if local.time() >= MARKET_OPEN:
+        day += timedelta(days=1)
+    while day.weekday() >= 5:
+        day += timedelta(days=1)
+    return datetime.combine(day, MARKET_OPEN, MARKET_TIMEZONE).astimezone(timezone.utc)
+
+
+def market_data_last_modified(now=None):
+    """
+    Validator for endpoints backed by daily bars.
+
+    Outside market hours nothing changes after the last close, so that is the
+    validator. During market hours the current bar moves, so the validator is
+    the current INTRADAY_BUCKET.
+    """
+    now = now or datetime.now(timezone.utc)
+    if market_is_open(now):
+        return datetime.fromtimestamp(int(now.timestamp()) // INTRADAY_BUCKET * INTRADAY_BUCKET, timezone.utc)
+    return last_market_close(now)
+
+
+def market_max_age(max_age_open=DEFAULT_MAX_AGE_OPEN, max_age_closed=DEFAULT_MAX_AGE_CLOSED, now=None):
+    """Max-age for market data: short while open, otherwise long but never past the next open."""
+    now = now or datetime.now(timezone.utc)
+    if market_is_open(now):
+        return max_age_open
+    return max(0, min(max_age_closed, int((next_market_open(now) - now).total_seconds())))
+
+
+def file_last_modified(path):
+    """Validator from a file's mtime, or None when the file does not exist yet."""
+    try:
+        return datetime.fromtimestamp(int(os.path.getmtime(path)), timezone.utc)
+    except (OSError, TypeError):
+        return None
+
+
+def make_etag(last_modified):
+    """Strong ETag over the URL, the negotiated representation and the validator."""
+    seed = "|".join([
+        request.full_path,
+        request.headers.get("Accept", ""),
+        request.headers.get("Accept-Encoding", ""),
+        str(int(last_modified.timestamp())),
+    ])
+    return hashlib.sha1(seed.encode("utf-8")).hexdigest()
+
+
+def is_not_modified(etag, last_modified):
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    if request.if_modified_since is not None:
+        return int(last_modified.timestamp()) <= int(request.if_modified_since.timestamp())
+    return False
+
+
+def no_store(response):
+    """Marks a response (e.g. a 200 whose body reports a failed part) as not cacheable."""
+    response = make_response(response)
+    response.cache_control.no_store = True
+    return response
+
+
+def conditional_get(last_modified=market_data_last_modified, max_age_open=DEFAULT_MAX_AGE_OPEN,
+                    max_age_closed=DEFAULT_MAX_AGE_CLOSED):
+    """
+    Adds ETag, Last-Modified and Cache-Control to a GET view and answers
+    If-None-Match / If-Modified-Since with 304 before the view runs.
+    Only 200 responses get them; a view opts a 200 out with no_store().
+
+    Args:
+        last_modified (callable): Returns the validator datetime for the current
+            request, or None to skip caching (e.g. a file not generated yet).
+        max_age_open (int): Cache-Control max-age while the market is open.
+        max_age_closed (int): Cache-Control max-age outside market hours
+            (capped at the time left until the next open).
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            modified = last_modified() if request.method == "GET" else None
+            if modified is None:
+                return view(*args, **kwargs)
+
+            etag = make_etag(modified)
+            max_age = market_max_age(max_age_open, max_age_closed)
+            if is_not_modified(etag, modified):
+                response = make_response("", 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200 or response.cache_control.no_store:
+                    return response
+
+            response.last_modified = modified
+            response.set_etag(etag)
+            response.cache_control.public = True
+            response.cache_control.max_age = max_age
+            response.vary.update(["Accept", "Accept-Encoding"])
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,236 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import sqlite3
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from threading import Lock
+
+DEFAULT_RESULT_TTL = 15 * 60  # seconds a finished job's result is kept and reused
+
+# Separate pools per lane, so interactive jobs never queue behind bulk RDF work.
+# "process" lanes need picklable top-level callables.
+DEFAULT_LANES = {
+    "interactive": ("thread", 4),
+    "bulk": ("thread", 2),
+    "cpu": ("process", 2),
+}
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+def job_key(kind, params):
+    """Normalized dedupe key: job kind plus sorted, stringified parameters."""
+    normalized = json.dumps({str(k): str(v) for k, v in (params or {}).items()}, sort_keys=True)
+    return hashlib.sha256(f"{kind}\0{normalized}".encode("utf-8")).hexdigest()
+
+
+class JobStore:
+    def __init__(self, path):
+        """
+        SQLite-backed job table holding status, timings and JSON results.
+
+        Rows are tagged with the instance that created them; queued or running
+        jobs of another (restarted) instance are reported as interrupted.
+        """
+        self.instance = uuid.uuid4().hex
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY,"
+            " kind TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " lane TEXT NOT NULL,"
+            " instance TEXT NOT NULL,"
+            " params TEXT NOT NULL,"
+            " status TEXT NOT NULL,"
+            " submitted_at REAL NOT NULL,"
+            " started_at REAL,"
+            " finished_at REAL,"
+            " expires_at REAL,"
+            " result TEXT,"
+            " error TEXT)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_key ON jobs (key, status)")
+        self._conn.commit()
+
+    def _execute(self, sql, params=()):
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            self._conn.commit()
+            return cursor
+
+    def find_reusable(self, key, now=None):
+        """Returns an active job, or a finished one whose result has not expired, for a key."""
+        now = now or time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM jobs WHERE key = ? AND ((status IN ('queued', 'running') AND instance = ?)"
+                " OR (status = 'done' AND expires_at > ?)) ORDER BY submitted_at DESC LIMIT 1",
+                (key, self.instance, now),
+            ).fetchone()
+        return self._row_to_job(row)
+
+    def create(self, kind, key, lane, params):
+        job_id = uuid.uuid4().hex
+        self._execute(
+            "INSERT INTO jobs (id, kind, key, lane, instance, params, status, submitted_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, 'queued', ?)",
+            (job_id, kind, key, lane, self.instance, json.dumps(params, default=str), time.time()),
+        )
+        return job_id
+
+    def mark_running(self, job_id):
+        self._execute("UPDATE jobs SET status = 'running', started_at = ? WHERE id = ?", (time.time(), job_id))
+
+    def finish(self, job_id, result=None, error=None, ttl=DEFAULT_RESULT_TTL):
+        now = time.time()
+        self._execute(
+            "UPDATE jobs SET status = ?, finished_at = ?, expires_at = ?, result = ?, error = ? WHERE id = ?",
+            (
+                "failed" if error is not None else "done",
+                now,
+                now + ttl,
+                json.dumps(result, default=str) if error is None else None,
+                error,
+                job_id,
+            ),
+        )
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row)
+
+    def purge_expired(self, now=None):
+        now = now or time.time()
+        return self._execute(
+            "DELETE FROM jobs WHERE (status NOT IN ('queued', 'running') AND expires_at <= ?)"
+            " OR (status IN ('queued', 'running') AND instance != ? AND submitted_at <= ?)",
+            (now, self.instance, now - DEFAULT_RESULT_TTL),
+        ).rowcount
+
+    def counts(self):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM jobs WHERE instance = ? OR status NOT IN ('queued', 'running')"
+                " GROUP BY status",
+                (self.instance,),
+            ).fetchall()
+        return {status: count for status, count in rows}
+
+    def _row_to_job(self, row):
+        if row is None:
+            return None
+        job = dict(row)
+        if job["status"] in ACTIVE_STATUSES and job["instance"] != self.instance:
+            job["status"], job["error"] = "failed", "Interrupted by restart"
+        job["params"] = json.loads(job["params"])
+        job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+        return job
+
+
+class JobQueue:
+    def __init__(self, store, lanes=None, result_ttl=DEFAULT_RESULT_TTL):
+        """
+        Bounded in-process job runner.
+
+        Identical submissions (same kind and parameters) share one job while it
+        is queued or running, and reuse its result until the TTL runs out.
+        """
+        self.store = store
+        self.lanes = dict(lanes or DEFAULT_LANES)
+        self.result_ttl = result_ttl
+        self._executors = {}
+        self._lock = Lock()
+
+    def _executor(self, lane):
+        if lane not in self._executors:
+            kind, workers = self.lanes[lane]
+            if kind == "process":
+                # spawn, not fork: the Flask process is multi-threaded
+                self._executors[lane] = ProcessPoolExecutor(
+                    max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._executors[lane] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"jobs-{lane}")
+        return self._executors[lane]
+
+    def submit(self, kind, lane, func, *args, params=None, **kwargs):
+        """
+        Queues func(*args, **kwargs) on a lane, or returns the matching existing job.
+
+        Args:
+            kind (str): Job type, e.g. "monte-carlo"; part of the dedupe key.
+            lane (str): One of self.lanes.
+            params (dict): Parameters that identify the job (for dedupe and display).
+
+        Returns:
+            tuple: (job dict, True if an existing job was reused)
+        """
+        if lane not in self.lanes:
+            raise ValueError(f"Unknown job lane: {lane}")
+        key = job_key(kind, params)
+        with self._lock:
+            existing = self.store.find_reusable(key)
+            if existing is not None:
+                return existing, True
+            self.store.purge_expired()
+            job_id = self.store.create(kind, key, lane, params or {})
+
+            if self.lanes[lane][0] == "thread":
+                future = self._executor(lane).submit(self._run_tracked, job_id, func, args, kwargs)
+            else:
+                # Process workers cannot update the store, so the job is marked running on submission
+                self.store.mark_running(job_id)
+                future = self._executor(lane).submit(func, *args, **kwargs)
+            future.add_done_callback(lambda done: self._finish(job_id, done))
+        return self.store.get(job_id), False
+
+    def _run_tracked(self, job_id, func, args, kwargs):
+        self.store.mark_running(job_id)
+        return func(*args, **kwargs)
+
+    def _finish(self, job_id, future):
+        try:
+            result = future.result()
+        except Exception as e:
+            print(f"ERROR job {job_id}: {e}")
+            self.store.finish(job_id, error=f"{type(e).__name__}: {e}", ttl=self.result_ttl)
+        else:
+            self.store.finish(job_id, result=result, ttl=self.result_ttl)
+
+    def get(self, job_id):
+        return self.store.get(job_id)
+
+    def stats(self):
+        return {"jobs": self.store.counts(), "lanes": {lane: {"type": t, "workers": w} for lane, (t, w) in self.lanes.items()}}
+
+    def shutdown(self, wait=True):
+        for executor in self._executors.values():
+            executor.shutdown(wait=wait)
+        self._executors.clear()
+
+
+def job_summary(job):
+    """Job fields returned by the status endpoint (everything except the result body)."""
+    return {
+        "job_id": job["id"],
+        "kind": job["kind"],
+        "lane": job["lane"],
+        "params": job["params"],
+        "status": job["status"],
+        "submitted_at": job["submitted_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"],
+        "expires_at": job["expires_at"],
+        "error": job["error"],
+    }
@@ -0,0 +1,37 @@
+import time
+
+from flask import Response, g, request
+
+from data_etl_pipeline.instrumentation import CONTENT_TYPE, HTTP_REQUEST_SECONDS, render_metrics
+
+
+def instrument_app(app, app_name):
+    """
+    Records a latency histogram sample for every request and adds GET /metrics.
+
+    Requests are labelled with the route template (e.g. /jobs/<job_id>), not
+    the concrete path, so label cardinality stays bounded.
+    """
+    @app.before_request
+    def start_request_timer():
+        g.metrics_start = time.perf_counter()
+
+    @app.after_request
+    def observe_request(response):
+        start = g.pop("metrics_start", None)
+        if start is not None:
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - start,
+                app=app_name,
+                endpoint=request.url_rule.rule if request.url_rule is not None else "unmatched",
+                method=request.method,
+                status=response.status_code,
+            )
+        return response
+
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        """Prometheus scrape endpoint."""
+        return Response(render_metrics(), content_type=CONTENT_TYPE)
+
+    return app
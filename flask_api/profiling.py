@@ -0,0 +1,232 @@
+"""
+Opt-in sampling profiler for the Flask apps.
+
+A request is profiled when it carries the profiling token, as the
+X-Profile-Token header or ?profile=<token>, or when it is picked by the
+random sample rate. While it runs, a single background thread samples its
+call stack every few milliseconds; afterwards the stacks are written in
+collapsed ("folded") format, ready for flamegraph.pl or speedscope, next to a
+JSON file with the endpoint, parameters, status and timings.
+
+    VILCORP_PROFILE_TOKEN     secret enabling per-request profiling (unset: disabled)
+    VILCORP_PROFILE_RATE      fraction of requests profiled at random, e.g. 0.001 (default 0)
+    VILCORP_PROFILE_DIR       output directory (default <tmp>/vilcorp-profiles)
+    VILCORP_PROFILE_MAX_FILES profiles kept; older ones are deleted (default 200)
+    VILCORP_PROFILE_INTERVAL  sampling interval in milliseconds (default 5)
+
+Unprofiled requests only pay for a header lookup and a random number.
+"""
+import hmac
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+from flask import abort, g, jsonify, request, send_from_directory
+
+PROFILE_HEADER = "X-Profile-Token"
+PROFILE_QUERY_PARAM = "profile"
+
+DEFAULT_INTERVAL_MS = 5
+DEFAULT_MAX_FILES = 200
+MAX_STACK_DEPTH = 128
+MAX_TAG_LENGTH = 120
+
+
+def frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ",")
+
+
+def collapse_stack(frame, depth=MAX_STACK_DEPTH):
+    """Root-first, ;-joined stack of a frame, the line format flamegraph tools expect."""
+    labels = []
+    while frame is not None and len(labels) < depth:
+        labels.append(frame_label(frame.f_code))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class SamplingProfiler:
+    def __init__(self, interval=DEFAULT_INTERVAL_MS / 1000):
+        """
+        Samples the stacks of registered threads from one shared daemon thread,
+        which only runs while at least one thread is being profiled.
+        """
+        self.interval = interval
+        self._targets = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self, thread_id=None):
+        thread_id = thread_id or threading.get_ident()
+        with self._lock:
+            self._targets[thread_id] = Counter()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self._thread.start()
+        return thread_id
+
+    def stop(self, thread_id=None):
+        """Stops sampling a thread and returns its Counter of collapsed stacks."""
+        with self._lock:
+            return self._targets.pop(thread_id or threading.get_ident(), Counter())
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while True:
+            # Sample under the lock so stop() never hands out a Counter still being updated
+            with self._lock:
+                if not self._targets:
+                    self._thread = None
+                    return
+                frames = sys._current_frames()
+                for thread_id, stacks in self._targets.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None and thread_id != own_id:
+                        stacks[collapse_stack(frame)] += 1
+                frames = frame = None  # drop frame references before sleeping
+            time.sleep(self.interval)
+
+
+def _slug(value):
+    return re.sub(r"[^A-Za-z0-9.=-]+", "-", str(value)).strip("-")
+
+
+class ProfileWriter:
+    def __init__(self, directory, max_files=DEFAULT_MAX_FILES):
+        """Writes profiles into a directory, keeping only the newest max_files."""
+        self.directory = directory
+        self.max_files = max_files
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, endpoint, params, stacks, metadata):
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        tag = "_".join(_slug(part) for part in [endpoint.strip("/") or "root"] + [f"{k}={v}" for k, v in params])
+        name = f"{stamp}_{tag[:MAX_TAG_LENGTH]}"
+
+        with open(os.path.join(self.directory, name + ".folded"), "w", encoding="utf-8") as handle:
+            for stack, count in stacks.most_common():
+                handle.write(f"{stack} {count}\n")
+        with open(os.path.join(self.directory, name + ".json"), "w", encoding="utf-8") as handle:
+            json.dump(dict(metadata, endpoint=endpoint, params=dict(params), samples=sum(stacks.values())),
+                      handle, default=str)
+        self.rotate()
+        return name
+
+    def list(self):
+        names = sorted(entry[:-len(".folded")] for entry in os.listdir(self.directory) if entry.endswith(".folded"))
+        return names[::-1]
+
+    def rotate(self):
+        with self._lock:
+            for name in self.list()[self.max_files:]:
+                for suffix in (".folded", ".json"):
+                    try:
+                        os.remove(os.path.join(self.directory, name + suffix))
+                    except OSError:
+                        pass
+
+
+class RequestProfiling:
+    def __init__(self, token=None, rate=0.0, directory=None, max_files=DEFAULT_MAX_FILES,
+                 interval_ms=DEFAULT_INTERVAL_MS):
+        self.token = token or None
+        self.rate = rate
+        self.profiler = SamplingProfiler(interval_ms / 1000)
+        self.writer = ProfileWriter(directory or os.path.join(tempfile.gettempdir(), "vilcorp-profiles"), max_files)
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            token=os.environ.get("VILCORP_PROFILE_TOKEN"),
+            rate=float(os.environ.get("VILCORP_PROFILE_RATE", 0) or 0),
+            directory=os.environ.get("VILCORP_PROFILE_DIR"),
+            max_files=int(os.environ.get("VILCORP_PROFILE_MAX_FILES", DEFAULT_MAX_FILES)),
+            interval_ms=float(os.environ.get("VILCORP_PROFILE_INTERVAL", DEFAULT_INTERVAL_MS)),
+        )
+
+    def token_matches(self, supplied):
+        return bool(self.token and supplied) and hmac.compare_digest(str(supplied), self.token)
+
+    def requested_by(self):
+        """Returns "token", "sampled" or None for the current request."""
+        supplied = request.headers.get(PROFILE_HEADER) or request.args.get(PROFILE_QUERY_PARAM)
+        if supplied and self.token_matches(supplied):
+            return "token"
+        if self.rate > 0 and random.random() < self.rate:
+            return "sampled"
+        return None
+
+
+def enable_profiling(app, profiling=None):
+    """
+    Hooks request profiling into an app and adds token-protected
+    GET /profiles (list) and GET /profiles/<name> (download) endpoints.
+    """
+    profiling = profiling or RequestProfiling.from_env()
+
+    @app.before_request
+    def start_profile():
+        if request.path.startswith("/profiles"):
+            return
+        trigger = profiling.requested_by()
+        if trigger:
+            g.profile = (trigger, time.perf_counter(), profiling.profiler.start())
+
+    @app.after_request
+    def finish_profile(response):
+        state = g.pop("profile", None)
+        if state is None:
+            return response
+        trigger, start, thread_id = state
+        stacks = profiling.profiler.stop(thread_id)
+        params = sorted((k, v) for k, v in request.args.items(multi=True) if k != PROFILE_QUERY_PARAM)
+        try:
+            name = profiling.writer.write(
+                request.url_rule.rule if request.url_rule is not None else request.path,
+                params,
+                stacks,
+                {
+                    "method": request.method,
+                    "status": response.status_code,
+                    "trigger": trigger,
+                    "seconds": round(time.perf_counter() - start, 4),
+                    "interval_ms": profiling.profiler.interval * 1000,
+                    "recorded_at": datetime.now(timezone.utc).isoformat(),
+                },
+            )
+            response.headers["X-Profile-Id"] = name
+        except OSError as e:
+            print(f"ERROR writing profile: {e}")
+        return response
+
+    @app.teardown_request
+    def discard_profile(error=None):
+        # after_request does not run if the response could not be built
+        state = g.pop("profile", None)
+        if state is not None:
+            profiling.profiler.stop(state[2])
+
+    def require_token():
+        if not profiling.token_matches(request.headers.get(PROFILE_HEADER) or request.args.get(PROFILE_QUERY_PARAM)):
+            abort(403)
+
+    @app.route('/profiles', methods=['GET'])
+    def list_profiles():
+        require_token()
+        return jsonify({"directory": profiling.writer.directory, "profiles": profiling.writer.list()})
+
+    @app.route('/profiles/<name>', methods=['GET'])
+    def get_profile(name):
+        require_token()
+        suffix = ".json" if request.args.get("meta") else ".folded"
+        return send_from_directory(profiling.writer.directory, name + suffix, mimetype="text/plain")
+
+    return profiling
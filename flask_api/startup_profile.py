@@ -0,0 +1,120 @@
+"""
+Startup profiling for the API processes.
+
+Set VILCORP_PROFILE_STARTUP=1 and the app records how long every module takes
+to import (self time, excluding the modules it imports in turn) and how long
+each initialization phase takes, then prints a report before serving:
+
+    VILCORP_PROFILE_STARTUP=1 python flask_api/app.py
+"""
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+PROFILE_STARTUP_ENV = "VILCORP_PROFILE_STARTUP"
+PROJECT_PACKAGES = ("data_etl_pipeline", "flask_api")  # reported per module; libraries per top-level package
+
+
+class _ImportTimer:
+    """Meta path finder that times exec_module of every module found by the other finders."""
+
+    def __init__(self, profile):
+        self.profile = profile
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                loader = spec.loader
+                # Builtin/frozen importers are classes shared by every module; their cost is negligible
+                if loader is not None and not isinstance(loader, type) and hasattr(loader, "exec_module"):
+                    loader.exec_module = self.profile.timed_exec(fullname, loader.exec_module)
+                return spec
+        return None
+
+
+class StartupProfile:
+    def __init__(self):
+        """Import and initialization timings for one process start."""
+        self.enabled = False
+        self.started = time.perf_counter()
+        self.imports = {}
+        self.phases = []
+        self._stack = threading.local()
+        self._finder = None
+
+    def start(self):
+        """Starts timing imports; call before the heavy imports of the entry module."""
+        if self._finder is None:
+            self.enabled = True
+            self.started = time.perf_counter()
+            self._finder = _ImportTimer(self)
+            sys.meta_path.insert(0, self._finder)
+
+    def start_from_env(self):
+        if os.environ.get(PROFILE_STARTUP_ENV, "").lower() in ("1", "true", "yes"):
+            self.start()
+        return self.enabled
+
+    def stop(self):
+        if self._finder is not None and self._finder in sys.meta_path:
+            sys.meta_path.remove(self._finder)
+        self._finder = None
+
+    def timed_exec(self, name, exec_module):
+        def wrapper(module):
+            stack = self._stack.__dict__.setdefault("frames", [])
+            stack.append(0.0)  # time spent in nested imports
+            start = time.perf_counter()
+            try:
+                exec_module(module)
+            finally:
+                elapsed = time.perf_counter() - start
+                nested = stack.pop()
+                if stack:
+                    stack[-1] += elapsed
+                self.imports[name] = self.imports.get(name, 0.0) + elapsed - nested
+        return wrapper
+
+    @contextmanager
+    def phase(self, name):
+        """Times an initialization step (no-op unless profiling is enabled)."""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+
+    def report(self, top=20):
+        grouped = {}
+        for name, seconds in self.imports.items():
+            root = name.split(".")[0]
+            key = name if root in PROJECT_PACKAGES else root
+            grouped[key] = grouped.get(key, 0.0) + seconds
+        ranked = sorted(grouped.items(), key=lambda item: item[1], reverse=True)
+        return {
+            "total_seconds": round(time.perf_counter() - self.started, 4),
+            "import_seconds": round(sum(self.imports.values()), 4),
+            "modules_imported": len(self.imports),
+            "imports": [{"module": name, "seconds": round(seconds, 4)} for name, seconds in ranked[:top]],
+            "phases": [{"phase": name, "seconds": round(seconds, 4)} for name, seconds in self.phases],
+        }
+
+    def print_report(self, top=20):
+        report = self.report(top)
+        print(f" Startup: {report['total_seconds']:.3f}s total, {report['import_seconds']:.3f}s importing "
+              f"{report['modules_imported']} modules")
+        for entry in report["imports"]:
+            print(f"   import {entry['module']:<40} {entry['seconds'] * 1000:9.1f} ms")
+        for entry in report["phases"]:
+            print(f"   init   {entry['phase']:<40} {entry['seconds'] * 1000:9.1f} ms")
+
+
+startup_profile = StartupProfile()
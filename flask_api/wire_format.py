@@ -0,0 +1,173 @@
+import gzip
+import io
+import json
+
+import numpy as np
+import pandas as pd
+from flask import Response, jsonify, request
+
+from data_etl_pipeline.price_series import PriceSeries
+
+try:
+    import pyarrow as pa
+except ImportError:  # Arrow IPC is only offered when pyarrow is installed
+    pa = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+JSON_RECORDS = "application/json"
+JSON_COLUMNAR = "application/vnd.vilcorp.columnar+json"
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+MSGPACK = "application/msgpack"
+
+# ?format= shortcuts for clients that cannot set Accept (e.g. a browser address bar)
+FORMAT_ALIASES = {"json": JSON_RECORDS, "columnar": JSON_COLUMNAR, "arrow": ARROW_STREAM, "msgpack": MSGPACK}
+
+COMPRESSION_THRESHOLD = 1024  # bytes
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def available_formats():
+    formats = [JSON_RECORDS, JSON_COLUMNAR]
+    if pa is not None:
+        formats.append(ARROW_STREAM)
+    if msgpack is not None:
+        formats += [MSGPACK, "application/x-msgpack"]
+    return formats
+
+
+def negotiate_format():
+    """
+    Picks the response format from ?format= or the Accept header, defaulting to record JSON.
+
+    Returns None when ?format= names a known format whose optional package is not installed.
+    """
+    requested = FORMAT_ALIASES.get(request.args.get("format", "").lower())
+    if requested is not None:
+        return requested if requested in available_formats() else None
+    best = request.accept_mimetypes.best_match(available_formats(), default=JSON_RECORDS)
+    return MSGPACK if best == "application/x-msgpack" else best
+
+
+def frame_columns(frame):
+    """
+    Converts a DataFrame into parallel column lists of plain Python values.
+
+    Datetime columns become ISO strings (dates only when every value is
+    midnight) and NaN becomes None.
+    """
+    columns = {}
+    for name in frame.columns:
+        series = frame[name]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            if series.dt.tz is not None:
+                series = series.dt.tz_localize(None)
+            date_only = bool((series.dropna() == series.dropna().dt.normalize()).all())
+            values = series.dt.strftime("%Y-%m-%d" if date_only else "%Y-%m-%dT%H:%M:%S")
+            columns[str(name)] = values.where(series.notna(), None).tolist()
+        elif pd.api.types.is_float_dtype(series):
+            values = series.to_numpy(dtype=np.float64)
+            columns[str(name)] = [None if v != v else v for v in values.tolist()]
+        else:
+            columns[str(name)] = series.astype(object).where(series.notna(), None).tolist()
+    return columns
+
+
+def columnar_payload(frame):
+    return {"columns": [str(name) for name in frame.columns], "length": len(frame), "data": frame_columns(frame)}
+
+
+def _json_default(value):
+    if isinstance(value, (pd.Timestamp, np.datetime64)):
+        return pd.Timestamp(value).isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def _arrow_body(frame, envelope):
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    if envelope:
+        metadata = dict(table.schema.metadata or {})
+        metadata[b"envelope"] = json.dumps(envelope, default=_json_default).encode("utf-8")
+        table = table.replace_schema_metadata(metadata)
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+def frame_response(frame, envelope=None, key=None):
+    """
+    Serializes a DataFrame in the negotiated format.
+
+    Args:
+        frame (DataFrame | PriceSeries): Rows to send.
+        envelope (dict): Other response fields; the frame is placed under `key`.
+            Arrow responses carry the envelope as JSON in the schema metadata.
+        key (str): Envelope field that holds the frame.
+
+    Returns:
+        Response: Record JSON (the original layout), columnar JSON, Arrow IPC
+        stream or MessagePack, compressed when large enough. 406 when
+        ?format= asks for Arrow or MessagePack and pyarrow or msgpack is not
+        installed.
+    """
+    fmt = negotiate_format()
+    if fmt is None:
+        response = jsonify({
+            "error": f"Format {request.args['format']!r} is not available on this server.",
+            "available": [name for name, mimetype in FORMAT_ALIASES.items() if mimetype in available_formats()],
+        })
+        response.status_code = 406
+        return response
+    if isinstance(frame, PriceSeries):
+        frame = frame.to_frame()
+
+    def wrap(payload):
+        return dict(envelope, **{key: payload}) if envelope is not None else payload
+
+    if fmt == ARROW_STREAM:
+        response = Response(_arrow_body(frame, envelope), mimetype=ARROW_STREAM)
+    elif fmt == MSGPACK:
+        body = msgpack.packb(wrap(columnar_payload(frame)), default=_json_default, use_bin_type=True)
+        response = Response(body, mimetype=MSGPACK)
+    elif fmt == JSON_COLUMNAR:
+        body = json.dumps(wrap(columnar_payload(frame)), default=_json_default, separators=(",", ":"))
+        response = Response(body, mimetype=JSON_COLUMNAR)
+    else:
+        response = jsonify(wrap(frame.to_dict(orient="records")))
+
+    response.vary.add("Accept")
+    return compress_response(response)
+
+
+def compress_response(response):
+    """Compresses a response body with brotli or gzip (per Accept-Encoding) above COMPRESSION_THRESHOLD."""
+    response.vary.add("Accept-Encoding")
+    if response.direct_passthrough or response.status_code != 200 or "Content-Encoding" in response.headers:
+        return response
+
+    body = response.get_data()
+    if len(body) < COMPRESSION_THRESHOLD:
+        return response
+
+    encodings = ["br", "gzip"] if brotli is not None else ["gzip"]
+    encoding = request.accept_encodings.best_match(encodings)
+    if encoding == "br":
+        response.set_data(brotli.compress(body, quality=BROTLI_QUALITY))
+    elif encoding == "gzip":
+        response.set_data(gzip.compress(body, compresslevel=GZIP_LEVEL))
+    else:
+        return response
+    response.headers["Content-Encoding"] = encoding
+    return response
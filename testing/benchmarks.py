@@ -0,0 +1,532 @@
+"""
+Micro-benchmarks for the pipeline and API hot paths on synthetic data.
+
+yfinance is replaced by a stand-in that serves generated price history and
+fundamentals, so nothing touches the network and every run sees the same data.
+Each benchmark runs at several sizes (SIZES), caches are cleared before every
+timed run unless the benchmark measures the warm path, and results can be
+written as JSON and compared against a stored baseline.
+
+Usage (from the repository root):
+    python testing/benchmarks.py
+    python testing/benchmarks.py --only monte_carlo_forecast --sizes small medium
+    python testing/benchmarks.py --output benchmark_results.json --compare testing/benchmark_baselines.json
+    python testing/benchmarks.py --save-baseline testing/benchmark_baselines.json
+
+With --compare the exit status is 1 when any benchmark's fastest run exceeds
+its baseline's fastest run by more than the threshold and by more than
+MIN_REGRESSION_MS. The minimum is compared rather than the median because it
+is the least affected by scheduling noise. --save-baseline sets each
+benchmark's threshold from the spread of its own runs (never below the
+default), so noisy benchmarks get more headroom than steady ones. Baselines
+are machine-specific: regenerate them on the machine that runs the comparison.
+
+The API is imported with VILCORP_RDF_DIR pointing at a temporary directory,
+so runs leave no RDF files, job database or analytics behind in rdf_data/.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import types
+import zlib
+from contextlib import contextmanager
+from functools import lru_cache
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, REPO_ROOT)
+
+DEFAULT_REPEAT = 11
+DEFAULT_THRESHOLD = 1.5  # fail when the fastest run > 1.5x the baseline's fastest run
+MIN_REGRESSION_MS = 1.0  # ...and slower by at least this much, so sub-millisecond noise never fails
+NOISE_HEADROOM = 3  # saved thresholds allow this many times a benchmark's own spread above the baseline
+MAX_THRESHOLD = 3.0
+
+# days of price history, news articles and forecast horizon per size
+SIZES = {
+    "small": {"days": 252, "news": 25, "years": 1},
+    "medium": {"days": 1260, "news": 250, "years": 5},
+    "large": {"days": 2520, "news": 1000, "years": 10},
+}
+
+BENCH_TICKER = "BENCH"
+BENCH_COMPANY = "Bench Corp"
+
+HEADLINE_SUBJECTS = ["Bench Corp", "Bench Corp shares", "Chipmakers", "Tech stocks", "Bench Corp CEO", "Regulators"]
+HEADLINE_VERBS = ["beat", "miss", "raise", "cut", "surge past", "slump below", "reaffirm", "warn on"]
+HEADLINE_OBJECTS = ["quarterly estimates", "full-year guidance", "analyst targets", "record revenue",
+                    "weak demand", "strong growth", "supply concerns", "a great quarter"]
+
+
+def _seed(name):
+    return zlib.crc32(name.encode("utf-8"))
+
+
+def synthetic_price_history(days, seed=0, end=None):
+    """yfinance-style daily history: tz-aware DatetimeIndex named Date, OHLCV columns, geometric random walk."""
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp(end) if end is not None else pd.Timestamp.today().normalize()
+    index = pd.bdate_range(end=end, periods=days, name="Date", tz="America/New_York")
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0004, 0.015, days)))
+    open_ = close * (1 + rng.normal(0, 0.004, days))
+    spread = np.abs(rng.normal(0, 0.006, days))
+    return pd.DataFrame({
+        "Open": open_,
+        "High": np.maximum(open_, close) * (1 + spread),
+        "Low": np.minimum(open_, close) * (1 - spread),
+        "Close": close,
+        "Volume": rng.integers(1_000_000, 50_000_000, days),
+        "Dividends": 0.0,
+        "Stock Splits": 0.0,
+    }, index=index)
+
+
+def synthetic_news(count, company=BENCH_COMPANY, seed=0):
+    """NewsAPIExtractor-style articles; about 10% repeat an earlier headline, as real feeds do."""
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp.today().normalize()
+    articles = []
+    for i in range(count):
+        if articles and rng.random() < 0.1:
+            articles.append(dict(articles[int(rng.integers(len(articles)))]))
+            continue
+        title = " ".join([
+            str(rng.choice(HEADLINE_SUBJECTS)).replace("Bench Corp", company),
+            str(rng.choice(HEADLINE_VERBS)),
+            str(rng.choice(HEADLINE_OBJECTS)),
+            f"({i})",
+        ])
+        published = end - pd.Timedelta(minutes=int(rng.integers(0, 365 * 24 * 60)))
+        articles.append({
+            "title": f"  {title} ",
+            "url": f"https://news.example.com/{i}",
+            "publicationDate": published.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        })
+    return articles
+
+
+def synthetic_info(ticker, seed=0):
+    """Fundamentals with the yfinance info keys the extractors and API read."""
+    rng = np.random.default_rng(seed)
+    revenue = float(rng.uniform(1e9, 4e11))
+    return {
+        "symbol": ticker,
+        "shortName": f"{ticker} Corp",
+        "longName": f"{ticker} Corporation",
+        "currentPrice": float(rng.uniform(20, 500)),
+        "marketCap": revenue * float(rng.uniform(1, 12)),
+        "trailingPE": float(rng.uniform(8, 60)),
+        "forwardPE": float(rng.uniform(8, 50)),
+        "trailingEps": float(rng.uniform(0.5, 15)),
+        "totalRevenue": revenue,
+        "profitMargins": float(rng.uniform(0.02, 0.35)),
+        "returnOnAssets": float(rng.uniform(0.01, 0.2)),
+        "returnOnEquity": float(rng.uniform(0.05, 0.6)),
+        "netIncomeToCommon": revenue * 0.1,
+        "totalCash": revenue * 0.2,
+        "debtToEquity": float(rng.uniform(10, 250)),
+        "freeCashflow": revenue * 0.08,
+        "recommendationKey": str(rng.choice(["buy", "hold", "sell"])),
+    }
+
+
+@lru_cache(maxsize=32)
+def _ticker_data(ticker, days):
+    # generated once per ticker and size, so generation stays out of the timings
+    return synthetic_price_history(days, seed=_seed(ticker)), synthetic_info(ticker, seed=_seed(ticker))
+
+
+class SyntheticTicker:
+    def __init__(self, ticker, days):
+        """Stands in for yfinance.Ticker, serving `days` bars of generated history."""
+        self.ticker = ticker
+        self._history, self._info = _ticker_data(ticker, days)
+
+    def history(self, period=None, start=None, end=None, **kwargs):
+        frame = self._history
+        tz = frame.index.tz
+        if start is not None:
+            frame = frame[frame.index >= pd.Timestamp(start).tz_localize(tz)]
+        if end is not None:
+            frame = frame[frame.index < pd.Timestamp(end).tz_localize(tz)]
+        if period and period != "max":
+            offsets = {"y": pd.DateOffset(years=1), "mo": pd.DateOffset(months=1), "d": pd.Timedelta(days=1)}
+            unit = next(unit for unit in ("mo", "y", "d") if period.endswith(unit))
+            start = frame.index[-1] - offsets[unit] * int(period[:-len(unit)]) if len(frame) else None
+            frame = frame[frame.index > start] if start is not None else frame
+        return frame.copy()
+
+    def get_info(self):
+        return dict(self._info)
+
+    @property
+    def info(self):
+        return self.get_info()
+
+
+# Stand-in module used when yfinance is not imported yet. It is one object for
+# the whole run because modules imported under the patch keep a reference to it.
+_synthetic_yfinance = types.ModuleType("yfinance")
+
+
+@contextmanager
+def patched_yfinance(days):
+    """Routes yfinance.Ticker to SyntheticTicker for the duration of the block."""
+    def make_ticker(ticker, *args, **kwargs):
+        return SyntheticTicker(ticker, days)
+
+    module = sys.modules.get("yfinance")
+    installed = module is None
+    if installed:
+        # Lazily bound `yf` names (data_etl_pipeline.lazy_imports) resolve through sys.modules
+        module = sys.modules["yfinance"] = _synthetic_yfinance
+    original = getattr(module, "Ticker", None)
+    module.Ticker = make_ticker
+    try:
+        yield
+    finally:
+        module.Ticker = original
+        if installed:
+            sys.modules.pop("yfinance", None)
+
+
+def price_frame(days):
+    """Prices in the StockPriceExtractor output format (isRecordedOn, priceValue, volume)."""
+    history = synthetic_price_history(days, seed=_seed(BENCH_TICKER)).reset_index()
+    history["Date"] = history["Date"].dt.tz_localize(None)
+    return history.rename(columns={"Date": "isRecordedOn", "Close": "priceValue", "Volume": "volume"})[
+        ["isRecordedOn", "priceValue", "volume"]
+    ]
+
+
+def financial_metric_rows(ticker=BENCH_TICKER):
+    info = synthetic_info(ticker, seed=_seed(ticker))
+    return [{"metricName": name, "metricValue": info[key]} for name, key in [
+        ("PE Ratio", "forwardPE"), ("EPS", "trailingEps"), ("Market Cap", "marketCap"),
+        ("Revenue", "totalRevenue"), ("Profit Margin", "profitMargins"),
+    ]]
+
+
+def company_graph(size):
+    from data_etl_pipeline.data_transformation import create_rdf_graph
+
+    news = [dict(article, sentimentScore=0.1) for article in synthetic_news(size["news"], seed=1)]
+    return create_rdf_graph(price_frame(size["days"]), news, financial_metric_rows(), None, BENCH_COMPANY,
+                            ticker=BENCH_TICKER)
+
+
+# name -> (prepare(size) returning the callable to time, clear caches before each run)
+BENCHMARKS = {}
+
+
+def benchmark(name, cold=True):
+    def register(prepare):
+        BENCHMARKS[name] = (prepare, cold)
+        return prepare
+    return register
+
+
+def api():
+    import flask_api.app as app_module
+    return app_module
+
+
+@benchmark("generate_rdf_for_stock")
+def bench_generate_rdf(size):
+    from data_etl_pipeline.generate_rdf import generate_rdf_for_stock
+    return lambda: generate_rdf_for_stock(BENCH_TICKER, size["years"])
+
+
+@benchmark("create_rdf_graph")
+def bench_create_rdf_graph(size):
+    from data_etl_pipeline.data_transformation import create_rdf_graph
+
+    prices = price_frame(size["days"])
+    news = [dict(article, sentimentScore=0.1) for article in synthetic_news(size["news"], seed=1)]
+    metrics = financial_metric_rows()
+    return lambda: create_rdf_graph(prices, news, metrics, None, BENCH_COMPANY, ticker=BENCH_TICKER)
+
+
+@benchmark("parse_rdf_to_json")
+def bench_parse_rdf_to_json(size):
+    graph = company_graph(size)
+    return lambda: api().parse_rdf_to_json(graph)
+
+
+@benchmark("parse_rdf_file")
+def bench_parse_rdf_file(size):
+    from data_etl_pipeline.graph_funcations import parse_rdf_file
+
+    handle = tempfile.NamedTemporaryFile("w", suffix=".ttl", delete=False, encoding="utf-8")
+    with handle:
+        handle.write(company_graph(size).serialize(format="turtle"))
+    return lambda: parse_rdf_file(handle.name)
+
+
+@benchmark("clean_news_articles")
+def bench_clean_news_articles(size):
+    news = synthetic_news(size["news"], seed=2)
+    clean_news_articles = api().clean_news_articles
+    # cleaning mutates the articles, so each run gets fresh copies (a small part of the timing)
+    return lambda: clean_news_articles([dict(article) for article in news], BENCH_COMPANY)
+
+
+@benchmark("monte_carlo_forecast")
+def bench_monte_carlo(size):
+    return lambda: api().monte_carlo_forecast(BENCH_TICKER, size["years"])
+
+
+@benchmark("rolling_analytics_build")
+def bench_rolling_analytics_build(size):
+    from data_etl_pipeline.price_series import PriceSeries
+    from data_etl_pipeline.rolling_analytics import TickerAnalytics
+
+    prices = PriceSeries.from_history(synthetic_price_history(size["days"], seed=_seed(BENCH_TICKER)))
+    benchmark_prices = PriceSeries.from_history(synthetic_price_history(size["days"], seed=_seed("SPY")))
+    return lambda: TickerAnalytics.from_series(BENCH_TICKER, prices, benchmark_prices)
+
+
+def check_incremental_analytics(prices, benchmark_prices, incremental_bars=100):
+    """
+    Raises when folding the last bars in with extend() (and revising the newest one)
+    disagrees with a full from_series() build over the same history.
+    """
+    from data_etl_pipeline.price_series import PriceSeries
+    from data_etl_pipeline.rolling_analytics import TickerAnalytics
+
+    split = max(len(prices) - incremental_bars, 1)
+    head = PriceSeries(prices.days[:split], prices.close[:split], prices.volume[:split])
+    analytics = TickerAnalytics.from_series(BENCH_TICKER, head, benchmark_prices)
+    revised = prices.close.copy()
+    revised[-1] *= 1.01
+    analytics.extend(prices, benchmark_prices)
+    analytics.append(prices.days[-1], revised[-1])
+    full = TickerAnalytics.from_series(BENCH_TICKER, PriceSeries(prices.days, revised, prices.volume), benchmark_prices)
+    for name in ["close", "benchmark_close"] + full.indicators:
+        if not np.allclose(analytics.column(name), full.column(name), rtol=1e-9, atol=1e-12, equal_nan=True):
+            raise RuntimeError(f"Incremental {name} diverges from the full build")
+
+
+@benchmark("rolling_analytics_append")
+def bench_rolling_analytics_append(size):
+    from data_etl_pipeline.price_series import PriceSeries
+    from data_etl_pipeline.rolling_analytics import TickerAnalytics
+
+    # one new bar (the next day each run) folded into a fully materialized history
+    prices = PriceSeries.from_history(synthetic_price_history(size["days"], seed=_seed(BENCH_TICKER)))
+    benchmark_prices = PriceSeries.from_history(synthetic_price_history(size["days"], seed=_seed("SPY")))
+    check_incremental_analytics(prices, benchmark_prices)
+    analytics = TickerAnalytics.from_series(BENCH_TICKER, prices, prices)
+    close = float(prices.close[-1])
+
+    def run():
+        analytics.append(analytics.last_day + 1, close, close)
+    return run
+
+
+def _api_get(path):
+    client = api().app.test_client()
+
+    def run():
+        response = client.get(path)
+        if response.status_code != 200:
+            raise RuntimeError(f"GET {path} returned {response.status_code}: {response.get_data(as_text=True)[:200]}")
+    return run
+
+
+@benchmark("predict_linear")
+def bench_predict_linear(size):
+    return _api_get(f"/predict-stock-prices/linear?ticker={BENCH_TICKER}&days=365")
+
+
+@benchmark("predict_polynomial")
+def bench_predict_polynomial(size):
+    return _api_get(f"/predict-stock-prices/polynomial?ticker={BENCH_TICKER}&days=365")
+
+
+def _load_company_graph(size):
+    """Resets the API's knowledge graph to the ontology plus one synthetic company."""
+    from data_etl_pipeline.fuseki_loader import ticker_graph_uri
+    from data_etl_pipeline.query_cache import LOCAL_GRAPH, bump_graph_version
+    from data_etl_pipeline.rdfs_materializer import RDFSMaterializer
+
+    app_module = api()
+    app_module.rdfs_materializer = RDFSMaterializer(app_module.load_rdf_graph())
+    app_module.rdf_graph = app_module.rdfs_materializer.dataset
+    app_module.rdfs_materializer.add(company_graph(size), ticker_graph_uri(BENCH_TICKER))
+    bump_graph_version(LOCAL_GRAPH)
+
+    end = pd.Timestamp.today().normalize()
+    return {"start_date": (end - pd.DateOffset(years=1)).date(), "end_date": end.date()}
+
+
+@benchmark("run_sparql_query")
+def bench_run_sparql_query(size):
+    bindings = _load_company_graph(size)
+    return lambda: api().run_sparql_query("stock_prices", bindings)
+
+
+@benchmark("run_sparql_query_cached", cold=False)
+def bench_run_sparql_query_cached(size):
+    bindings = _load_company_graph(size)
+    api().run_sparql_query("stock_prices", bindings)
+    return lambda: api().run_sparql_query("stock_prices", bindings)
+
+
+def clear_caches():
+    from data_etl_pipeline.cache_backend import get_cache_backend
+    from data_etl_pipeline.query_cache import query_result_cache
+
+    get_cache_backend().clear()
+    query_result_cache.clear()
+
+
+def run_benchmark(name, size_name, repeat):
+    prepare, cold = BENCHMARKS[name]
+    size = SIZES[size_name]
+    with patched_yfinance(size["days"]):
+        clear_caches()  # nothing cached for the previous size leaks into this one
+        run = prepare(size)
+        run()  # warm-up: lazy imports, query preparation
+        timings = []
+        for _ in range(repeat):
+            if cold:
+                clear_caches()
+            start = time.perf_counter()
+            run()
+            timings.append((time.perf_counter() - start) * 1000)
+    return {
+        "name": name,
+        "size": size_name,
+        "params": size,
+        "runs_ms": [round(t, 3) for t in timings],
+        "median_ms": round(statistics.median(timings), 3),
+        "min_ms": round(min(timings), 3),
+        "max_ms": round(max(timings), 3),
+        # How far a typical run sits above the fastest; unlike the stdev, one outlier barely moves it
+        "spread": round((statistics.median(timings) - min(timings)) / min(timings), 4) if min(timings) > 0 else 0.0,
+    }
+
+
+def result_key(result):
+    return f"{result['name']}[{result['size']}]"
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def noise_threshold(result, default=DEFAULT_THRESHOLD):
+    """Regression threshold for a baseline entry: the default, widened for benchmarks whose runs vary a lot."""
+    return round(min(max(default, 1 + NOISE_HEADROOM * result.get("spread", 0.0)), MAX_THRESHOLD), 2)
+
+
+def compare_to_baseline(results, baseline):
+    """Returns (rows, regressions); rows are (key, min, baseline min, ratio, threshold, status)."""
+    default_threshold = baseline.get("threshold", DEFAULT_THRESHOLD)
+    rows, regressions = [], []
+    for result in results:
+        key = result_key(result)
+        entry = baseline.get("benchmarks", {}).get(key)
+        if entry is None:
+            rows.append((key, result["min_ms"], None, None, None, "new"))
+            continue
+        threshold = entry.get("threshold", default_threshold)
+        base = entry.get("min_ms", entry.get("median_ms"))
+        ratio = result["min_ms"] / base if base else float("inf")
+        regressed = ratio > threshold and result["min_ms"] - base > MIN_REGRESSION_MS
+        status = "REGRESSION" if regressed else "ok"
+        rows.append((key, result["min_ms"], base, ratio, threshold, status))
+        if status == "REGRESSION":
+            regressions.append(key)
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the synthetic-data micro-benchmarks.")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="Benchmarks to run (default: all).")
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=list(SIZES))
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Timed runs per benchmark and size.")
+    parser.add_argument("--output", help="Write results as JSON to this path.")
+    parser.add_argument("--compare", help="Baseline JSON to compare against; exit 1 on regressions.")
+    parser.add_argument("--save-baseline", help="Write the results as a baseline file.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Minimum regression threshold stored by --save-baseline.")
+    args = parser.parse_args(argv)
+
+    os.chdir(REPO_ROOT)  # the API loads ontology/ relative to the working directory
+    results = []
+    with tempfile.TemporaryDirectory(prefix="vilcorp-bench-") as rdf_dir:
+        os.environ["VILCORP_RDF_DIR"] = rdf_dir
+        for name in args.only or list(BENCHMARKS):
+            for size_name in args.sizes:
+                result = run_benchmark(name, size_name, args.repeat)
+                results.append(result)
+                print(f"{result_key(result):<40} median {result['median_ms']:>10.2f} ms   "
+                      f"min {result['min_ms']:>10.2f} ms   max {result['max_ms']:>10.2f} ms   spread {result['spread']:.3f}")
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.save_baseline:
+        baseline = {
+            "created_at": report["created_at"],
+            "commit": report["commit"],
+            "platform": report["platform"],
+            "threshold": args.threshold,
+            "repeat": args.repeat,
+            "benchmarks": {
+                result_key(result): {
+                    "min_ms": result["min_ms"],
+                    "median_ms": result["median_ms"],
+                    "threshold": noise_threshold(result, args.threshold),
+                }
+                for result in results
+            },
+        }
+        with open(args.save_baseline, "w", encoding="utf-8") as handle:
+            json.dump(baseline, handle, indent=2)
+        print(f"Baseline written to {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        rows, regressions = compare_to_baseline(results, baseline)
+        print(f"\nComparison against {args.compare}:")
+        for key, fastest, base, ratio, threshold, status in rows:
+            if base is None:
+                print(f"  {key:<40} {fastest:>10.2f} ms   (no baseline)")
+            else:
+                print(f"  {key:<40} {fastest:>10.2f} ms vs {base:>10.2f} ms   x{ratio:.2f} (limit x{threshold:.2f})  {status}")
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+            return 1
+        print("\nNo regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
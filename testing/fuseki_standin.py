@@ -0,0 +1,180 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from rdflib import Dataset, URIRef
+
+from data_etl_pipeline.query_catalogue import sparql_term
+
+### Local stand-in for an Apache Jena Fuseki dataset, backed by rdflib.
+# Supports the endpoints the pipeline uses:
+#   /{dataset}/query   SPARQL SELECT/ASK/CONSTRUCT (JSON, CSV or TSV results)
+#   /{dataset}/update  SPARQL Update
+#   /{dataset}/data    Graph Store upload (Turtle or N-Triples, optional ?graph=)
+
+CONTENT_FORMATS = {
+    "text/turtle": "turtle",
+    "application/n-triples": "nt",
+    "text/plain": "nt",
+    "application/rdf+xml": "xml",
+}
+
+
+def serialize_tsv(result):
+    """Serializes a SELECT result as SPARQL TSV (rdflib has no TSV serializer)."""
+    lines = ["\t".join(f"?{var}" for var in result.vars)]
+    for row in result:
+        lines.append("\t".join("" if value is None else sparql_term(value) for value in row))
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+class FusekiStandIn:
+    def __init__(self, dataset_name="vilcorp_data", host="127.0.0.1", port=0, latency=0.0):
+        """Initializes an in-process Fuseki stand-in serving one rdflib Dataset; latency (seconds) is added to every request."""
+        self.dataset_name = dataset_name
+        self.latency = latency
+        self.dataset = Dataset(default_union=True)
+        self.lock = threading.Lock()
+        self.request_count = 0
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _handler_class(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, body=b"", content_type="text/plain"):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _route(self):
+                parsed = urlparse(self.path)
+                parts = parsed.path.strip("/").split("/")
+                if len(parts) != 2 or parts[0] != standin.dataset_name:
+                    return None, None
+                return parts[1], parse_qs(parsed.query)
+
+            def _body(self):
+                length = int(self.headers.get("Content-Length", 0))
+                return self.rfile.read(length).decode("utf-8") if length else ""
+
+            def do_GET(self):
+                service, params = self._route()
+                if standin.latency:
+                    time.sleep(standin.latency)
+                if service == "query" and "query" in params:
+                    return self._query(params["query"][0])
+                self._send(404, b"Not found")
+
+            def do_POST(self):
+                service, params = self._route()
+                content_type = self.headers.get("Content-Type", "").split(";")[0].strip()
+                body = self._body()
+                standin.request_count += 1
+                if standin.latency:
+                    time.sleep(standin.latency)
+
+                if content_type == "application/x-www-form-urlencoded":
+                    params.update(parse_qs(body))
+                    body = None
+
+                if service == "query":
+                    return self._query(body if body is not None else params.get("query", [""])[0])
+                if service == "update":
+                    return self._update(body if body is not None else params.get("update", [""])[0])
+                if service == "data":
+                    return self._data(body, content_type, params.get("graph", [None])[0])
+                self._send(404, b"Not found")
+
+            def _query(self, query):
+                accept = self.headers.get("Accept", "application/sparql-results+json")
+                try:
+                    with standin.lock:
+                        result = standin.dataset.query(query)
+                        if result.type in ("CONSTRUCT", "DESCRIBE"):
+                            return self._send(200, result.serialize(format="nt"), "application/n-triples")
+                        if "tab-separated-values" in accept and result.type == "SELECT":
+                            return self._send(200, serialize_tsv(result), "text/tab-separated-values")
+                        if "text/csv" in accept and result.type == "SELECT":
+                            return self._send(200, result.serialize(format="csv"), "text/csv")
+                        return self._send(200, result.serialize(format="json"), "application/sparql-results+json")
+                except Exception as e:
+                    self._send(400, f"Query failed: {e}".encode("utf-8"))
+
+            def _update(self, update):
+                try:
+                    with standin.lock:
+                        standin.dataset.update(update)
+                    self._send(204)
+                except Exception as e:
+                    self._send(400, f"Update failed: {e}".encode("utf-8"))
+
+            def _data(self, body, content_type, graph_uri):
+                rdf_format = CONTENT_FORMATS.get(content_type)
+                if rdf_format is None:
+                    return self._send(415, b"Unsupported media type")
+                try:
+                    with standin.lock:
+                        target = standin.dataset.graph(URIRef(graph_uri)) if graph_uri else standin.dataset.default_graph
+                        target.parse(data=body, format=rdf_format)
+                    self._send(200, b'{"status": "ok"}', "application/json")
+                except Exception as e:
+                    self._send(400, f"Upload failed: {e}".encode("utf-8"))
+
+        return Handler
+
+
+# Example Usage
+if __name__ == "__main__":
+    from data_etl_pipeline.fuseki_client import FusekiClient
+
+    with FusekiStandIn() as standin:
+        standin.dataset.default_graph.parse(data="""
+            @prefix vilcorp: <http://www.semanticweb.org/viljo/ontologies/2024/10/untitled-ontology-3/> .
+            @prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+            vilcorp:p1 a vilcorp:StockPrice ; vilcorp:isRecordedOn "2024-11-05"^^xsd:date ;
+                vilcorp:priceValue "101.5"^^xsd:float ; vilcorp:volume 1200 .
+            vilcorp:p2 a vilcorp:StockPrice ; vilcorp:isRecordedOn "2024-11-06"^^xsd:date ;
+                vilcorp:priceValue "103.25"^^xsd:float ; vilcorp:volume 900 .
+        """, format="turtle")
+
+        client = FusekiClient(base_url=standin.url, dataset=standin.dataset_name)
+        query = """
+        PREFIX vilcorp: <http://www.semanticweb.org/viljo/ontologies/2024/10/untitled-ontology-3/>
+        SELECT ?date ?price ?volume WHERE {
+            ?s vilcorp:isRecordedOn ?date ; vilcorp:priceValue ?price ; vilcorp:volume ?volume
+        } ORDER BY ?date
+        """
+        for result_format in ("tsv", "csv", "json"):
+            print(result_format, list(client.select(query, result_format)))
+        print(client.select_frame(query))
+        print(len(client.select_many([query] * 8)), "batched results")
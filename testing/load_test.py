@@ -0,0 +1,322 @@
+"""
+End-to-end load test for the Flask APIs, runnable fully offline.
+
+By default both apps (flask_api.app and flask_api.finnhub_api) are served
+in-process on threaded werkzeug servers, with every external dependency
+replaced by a local stand-in:
+
+    yfinance, NewsAPI   synthetic data plugged into data_etl_pipeline.providers
+    Finnhub, Wikidata   testing/provider_standins.py HTTP servers
+    Fuseki              testing/fuseki_standin.py
+
+With --replay DIR, yfinance/NewsAPI/Finnhub/Wikidata responses come from a
+directory captured earlier with VILCORP_PROVIDER_MODE=record instead. --latency
+adds upstream latency, in the VILCORP_REPLAY_LATENCY_MS format ("150" or
+"yfinance=150,finnhub=80,*=20").
+
+Worker threads send a weighted mix of requests for --duration seconds (or
+--requests in total) and the report gives throughput and p50/p95/p99 latency
+per endpoint. The load generator shares the interpreter with in-process
+servers; for capacity numbers of a deployment, start the apps separately and
+pass --url/--finnhub-url. In-process apps get VILCORP_RDF_DIR pointing at a
+temporary directory, so the synthetic data never reaches rdf_data/.
+
+Usage (from the repository root):
+    python testing/load_test.py --concurrency 16 --duration 60 --output load_report.json
+    python testing/load_test.py --latency "yfinance=150,*=50" --mix stock_prices=5 finnhub_data=1
+    python testing/load_test.py --replay provider_recordings --tickers AAPL MSFT
+    python testing/load_test.py --url http://api:5000 --finnhub-url http://api:5002
+"""
+import argparse
+import itertools
+import json
+import logging
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+import numpy as np
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, REPO_ROOT)
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_DURATION = 30  # seconds
+DEFAULT_TICKERS = ["AAPL", "MSFT", "GOOGL", "AMZN", "NVDA"]
+DEFAULT_HISTORY_DAYS = 1260  # synthetic price history per ticker (5 years of trading days)
+REQUEST_TIMEOUT = 120
+
+# name -> (app, path template, default weight)
+ENDPOINTS = {
+    "stock_prices": ("api", "/stock-prices/dynamic?ticker={ticker}&period=1y", 4),
+    "financial_statistics": ("api", "/financial-statistics?ticker={ticker}", 2),
+    "predict_linear": ("api", "/predict-stock-prices/linear?ticker={ticker}", 2),
+    "monte_carlo": ("api", "/predict-stock-prices/monte-carlo?ticker={ticker}&years=1", 1),
+    "rdf_stock_prices": ("api", "/rdf-stock-prices?ticker={ticker}&years=1", 1),
+    "analytics": ("api", "/analytics?ticker={ticker}&indicators=sma_50,volatility_20,max_drawdown", 1),
+    "finnhub_data": ("finnhub", "/finnhub-data?ticker={ticker}", 2),
+}
+
+
+def synthetic_providers(days):
+    """Routes yfinance and NewsAPI calls to generated data, with the configured replay latency."""
+    from data_etl_pipeline.providers import replay_latency, set_override
+    from testing.benchmarks import SyntheticTicker, synthetic_news
+
+    def with_latency(provider, handler):
+        def serve(operation, params):
+            delay = replay_latency(provider, None)
+            if delay > 0:
+                time.sleep(delay)
+            return handler(operation, params)
+        return serve
+
+    def yfinance(operation, params):
+        ticker = SyntheticTicker(params.pop("ticker"), days)
+        if operation == "history":
+            return ticker.history(**params)
+        if operation == "info":
+            return ticker.get_info()
+        raise ValueError(f"Unsupported yfinance operation: {operation}")
+
+    def newsapi(operation, params):
+        query = params.get("q") or params.get("qInTitle") or "market"
+        articles = synthetic_news(50, company=query)
+        return {"status": "ok", "totalResults": len(articles), "articles": [
+            {"title": article["title"], "url": article["url"], "publishedAt": article["publicationDate"]}
+            for article in articles
+        ]}
+
+    set_override("yfinance", with_latency("yfinance", yfinance))
+    set_override("newsapi", with_latency("newsapi", newsapi))
+
+
+class InProcessServer:
+    def __init__(self, app):
+        """Serves a WSGI app on a free local port from a background thread."""
+        from werkzeug.serving import make_server
+
+        self.server = make_server("127.0.0.1", 0, app, threaded=True)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_port}"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+
+
+def start_local_stack(args):
+    """Starts the stand-ins and both apps; returns (base urls by app, things to stop)."""
+    from data_etl_pipeline.providers import PROVIDER_DIR_ENV, PROVIDER_MODE_ENV, replay_latency
+    from testing.fuseki_standin import FusekiStandIn
+    from testing.provider_standins import FinnhubStandIn, WikidataStandIn
+
+    fuseki = FusekiStandIn(latency=replay_latency("fuseki", None)).start()
+    running = [fuseki]
+    os.environ["VILCORP_FUSEKI_URL"] = fuseki.url
+    os.environ["VILCORP_FUSEKI_ENDPOINT"] = f"{fuseki.url}/{fuseki.dataset_name}"
+
+    if args.replay:
+        # recordings are keyed by the real provider URLs, so those stay in place
+        os.environ[PROVIDER_MODE_ENV] = "replay"
+        os.environ[PROVIDER_DIR_ENV] = args.replay
+    else:
+        finnhub = FinnhubStandIn(latency=replay_latency("finnhub", None)).start()
+        wikidata = WikidataStandIn(latency=replay_latency("wikidata", None)).start()
+        running += [finnhub, wikidata]
+        os.environ["VILCORP_FINNHUB_URL"] = finnhub.base_url
+        os.environ["VILCORP_WIKIDATA_ENDPOINT"] = f"{wikidata.base_url}/sparql"
+        synthetic_providers(args.history_days)
+
+    # imported only now: endpoint URLs are read from the environment at import time
+    from flask_api.app import app as api_app
+    from flask_api.finnhub_api import app as finnhub_app
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)  # no per-request access log
+    servers = [InProcessServer(api_app).start(), InProcessServer(finnhub_app).start()]
+    return {"api": servers[0].url, "finnhub": servers[1].url}, running + servers
+
+
+def parse_mix(entries):
+    """["stock_prices=5", "monte_carlo=1"] -> {name: weight}; None -> the default weights."""
+    if not entries:
+        return {name: weight for name, (_, _, weight) in ENDPOINTS.items()}
+    mix = {}
+    for entry in entries:
+        name, _, weight = entry.partition("=")
+        if name not in ENDPOINTS:
+            raise SystemExit(f"Unknown endpoint '{name}' (choose from {', '.join(ENDPOINTS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+class LoadTest:
+    def __init__(self, base_urls, mix, tickers, concurrency, duration=None, total_requests=None, seed=0):
+        self.base_urls = base_urls
+        self.names = list(mix)
+        self.weights = [mix[name] for name in self.names]
+        self.tickers = tickers
+        self.concurrency = concurrency
+        self.duration = duration
+        self.total_requests = total_requests
+        self.seed = seed
+        self.samples = defaultdict(list)  # endpoint -> [(seconds, status)]
+        self._lock = threading.Lock()
+        self._issued = itertools.count()
+
+    def url(self, name, ticker):
+        app_name, template, _ = ENDPOINTS[name]
+        return self.base_urls[app_name] + template.format(ticker=ticker)
+
+    def warm_up(self, rounds=1):
+        """Requests every endpoint/ticker pair once, untimed, so one-off work (RDF generation) is excluded."""
+        import requests
+
+        with requests.Session() as session:
+            for _ in range(rounds):
+                for name in self.names:
+                    for ticker in self.tickers:
+                        session.get(self.url(name, ticker), timeout=REQUEST_TIMEOUT)
+
+    def _worker(self, index, deadline):
+        import requests
+
+        rng = random.Random(self.seed + index)
+        with requests.Session() as session:
+            while time.perf_counter() < deadline:
+                if self.total_requests is not None and next(self._issued) >= self.total_requests:
+                    return
+                name = rng.choices(self.names, self.weights)[0]
+                start = time.perf_counter()
+                try:
+                    status = session.get(self.url(name, rng.choice(self.tickers)), timeout=REQUEST_TIMEOUT).status_code
+                except requests.RequestException:
+                    status = 0
+                elapsed = time.perf_counter() - start
+                with self._lock:
+                    self.samples[name].append((elapsed, status))
+
+    def run(self):
+        deadline = time.perf_counter() + (self.duration if self.duration is not None else float("inf"))
+        workers = [threading.Thread(target=self._worker, args=(i, deadline), daemon=True)
+                   for i in range(self.concurrency)]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return self.report(time.perf_counter() - start)
+
+    def report(self, elapsed):
+        def summarize(samples):
+            seconds = np.array([s for s, _ in samples]) * 1000
+            errors = sum(1 for _, status in samples if not 200 <= status < 400)
+            p50, p95, p99 = np.percentile(seconds, [50, 95, 99]) if len(seconds) else (0.0, 0.0, 0.0)
+            return {
+                "requests": len(samples),
+                "errors": errors,
+                "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+                "p50_ms": round(float(p50), 2),
+                "p95_ms": round(float(p95), 2),
+                "p99_ms": round(float(p99), 2),
+                "max_ms": round(float(seconds.max()), 2) if len(seconds) else 0.0,
+            }
+
+        everything = [sample for samples in self.samples.values() for sample in samples]
+        return {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "concurrency": self.concurrency,
+            "elapsed_seconds": round(elapsed, 2),
+            "mix": dict(zip(self.names, self.weights)),
+            "tickers": self.tickers,
+            "total": summarize(everything),
+            "endpoints": {name: summarize(self.samples[name]) for name in self.names},
+        }
+
+
+def print_report(report):
+    total = report["total"]
+    print(f"\n{total['requests']} requests in {report['elapsed_seconds']}s at concurrency {report['concurrency']}: "
+          f"{total['throughput_rps']} req/s, {total['errors']} errors")
+    print(f"{'endpoint':<24}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, row in list(report["endpoints"].items()) + [("total", total)]:
+        print(f"{name:<24}{row['requests']:>10}{row['errors']:>8}{row['throughput_rps']:>10}"
+              f"{row['p50_ms']:>10}{row['p95_ms']:>10}{row['p99_ms']:>10}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drive the Flask APIs at a target concurrency and report latency.")
+    parser.add_argument("--url", help="Base URL of a running main API (default: serve it in-process).")
+    parser.add_argument("--finnhub-url", help="Base URL of a running Finnhub API (required with --url to include it).")
+    parser.add_argument("--replay", metavar="DIR", help="Serve provider responses from recordings in DIR.")
+    parser.add_argument("--latency", help="Added upstream latency in ms, e.g. 100 or 'yfinance=150,*=20'.")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--duration", type=float, help=f"Seconds to run (default {DEFAULT_DURATION}).")
+    parser.add_argument("--requests", type=int, help="Stop after this many requests instead of a duration.")
+    parser.add_argument("--mix", nargs="+", metavar="ENDPOINT=WEIGHT",
+                        help=f"Weighted endpoint mix (endpoints: {', '.join(ENDPOINTS)}).")
+    parser.add_argument("--tickers", nargs="+", default=DEFAULT_TICKERS)
+    parser.add_argument("--history-days", type=int, default=DEFAULT_HISTORY_DAYS,
+                        help="Synthetic price history served per ticker.")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed rounds over every endpoint/ticker first.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the report as JSON to this path.")
+    args = parser.parse_args(argv)
+
+    mix = parse_mix(args.mix)
+    duration = args.duration if args.duration is not None else (None if args.requests else DEFAULT_DURATION)
+    if args.latency:
+        from data_etl_pipeline.providers import REPLAY_LATENCY_ENV
+        os.environ[REPLAY_LATENCY_ENV] = args.latency
+
+    running = []
+    rdf_dir = None
+    if args.url:
+        base_urls = {"api": args.url.rstrip("/"), "finnhub": (args.finnhub_url or "").rstrip("/")}
+        if not args.finnhub_url:
+            mix = {name: weight for name, weight in mix.items() if ENDPOINTS[name][0] != "finnhub"}
+    else:
+        os.chdir(REPO_ROOT)  # the API loads ontology/ relative to the working directory
+        # synthetic RDF files, sidecars, analytics and jobs must never land in rdf_data/, where they would be served as real data
+        rdf_dir = tempfile.TemporaryDirectory(prefix="vilcorp-load-")
+        os.environ["VILCORP_RDF_DIR"] = rdf_dir.name
+        base_urls, running = start_local_stack(args)
+
+    try:
+        test = LoadTest(base_urls, mix, args.tickers, args.concurrency, duration, args.requests, args.seed)
+        if args.warmup:
+            print("Warming up...")
+            test.warm_up(args.warmup)
+        print(f"Running {'%ss' % duration if duration else '%d requests' % args.requests} "
+              f"at concurrency {args.concurrency}...")
+        report = test.run()
+    finally:
+        for item in reversed(running):
+            item.stop()
+        if rdf_dir is not None:
+            rdf_dir.cleanup()
+
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+        print(f"Report written to {args.output}")
+    return 1 if report["total"]["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
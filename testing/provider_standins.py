@@ -0,0 +1,196 @@
+import hashlib
+import json
+import re
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+### Local stand-ins for the Finnhub REST API and the Wikidata SPARQL endpoint.
+# Both serve deterministic synthetic JSON (the same ticker always gets the same
+# answer) with optional added latency, so the API can be load tested offline:
+#   VILCORP_FINNHUB_URL=<FinnhubStandIn.base_url>  VILCORP_WIKIDATA_ENDPOINT=<WikidataStandIn.base_url>/sparql
+# Paths match the real services (Finnhub under /api/v1), so calls recorded
+# against a stand-in replay against the real endpoints and vice versa.
+
+
+def _seed(value):
+    return int(hashlib.sha256(str(value).encode("utf-8")).hexdigest()[:8], 16)
+
+
+class JSONStandIn:
+    routes = {}
+    prefix = ""
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0):
+        """Serves GET routes (path -> method name) as JSON; latency (seconds) is added to every request."""
+        self.latency = latency
+        self.request_count = 0
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def base_url(self):
+        return self.url + self.prefix
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _handler_class(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, payload):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                standin.request_count += 1
+                if standin.latency:
+                    time.sleep(standin.latency)
+                parsed = urlparse(self.path)
+                path = parsed.path.rstrip("/")
+                if standin.prefix and path.startswith(standin.prefix):
+                    path = path[len(standin.prefix):]
+                route = standin.routes.get(path)
+                if route is None:
+                    return self._send(404, {"error": "Not found"})
+                params = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+                status, payload = getattr(standin, route)(params)
+                self._send(status, payload)
+
+        return Handler
+
+
+class FinnhubStandIn(JSONStandIn):
+    prefix = "/api/v1"
+    routes = {
+        "/stock/profile2": "profile",
+        "/stock/financials-reported": "financials",
+        "/stock/filings": "filings",
+        "/stock/insider-transactions": "insider_transactions",
+        "/company-news": "company_news",
+    }
+
+    def profile(self, params):
+        symbol = params.get("symbol", "").upper()
+        if not symbol:
+            return 422, {"error": "Missing symbol"}
+        seed = _seed(symbol)
+        return 200, {
+            "ticker": symbol,
+            "name": f"{symbol} Holdings Inc",
+            "country": "US",
+            "currency": "USD",
+            "exchange": "NASDAQ NMS - GLOBAL MARKET",
+            "finnhubIndustry": ("Technology", "Banking", "Retail", "Energy")[seed % 4],
+            "ipo": str(date(1980, 1, 1) + timedelta(days=seed % 12000)),
+            "marketCapitalization": round(1000 + seed % 2_000_000, 2),
+            "shareOutstanding": round(50 + seed % 10_000, 2),
+            "weburl": f"https://www.{symbol.lower()}.example.com/",
+        }
+
+    def financials(self, params):
+        symbol = params.get("symbol", "").upper()
+        seed = _seed(symbol)
+        return 200, {"symbol": symbol, "data": [
+            {
+                "year": year,
+                "quarter": 0,
+                "form": "10-K",
+                "report": {"ic": [
+                    {"concept": "us-gaap_Revenues", "label": "Revenues", "unit": "usd",
+                     "value": (seed % 1000 + 100) * 1_000_000 * (1 + (year - 2015) / 10)},
+                    {"concept": "us-gaap_NetIncomeLoss", "label": "Net income", "unit": "usd",
+                     "value": (seed % 200 + 10) * 1_000_000 * (1 + (year - 2015) / 10)},
+                ]},
+            }
+            for year in range(2024, 2014, -1)
+        ]}
+
+    def filings(self, params):
+        symbol = params.get("symbol", "").upper()
+        return 200, [
+            {"symbol": symbol, "form": ("10-K", "10-Q", "8-K")[i % 3],
+             "filedDate": str(date(2024, 12, 31) - timedelta(days=30 * i)),
+             "reportUrl": f"https://www.sec.gov/Archives/{symbol}/{i}.htm"}
+            for i in range(25)
+        ]
+
+    def insider_transactions(self, params):
+        symbol = params.get("symbol", "").upper()
+        seed = _seed(symbol)
+        return 200, {"symbol": symbol, "data": [
+            {"name": f"Insider {i}", "share": 10_000 + (seed + i) % 50_000, "change": ((seed >> i) % 2000) - 1000,
+             "transactionDate": str(date(2024, 12, 31) - timedelta(days=7 * i)), "transactionCode": "S"}
+            for i in range(40)
+        ]}
+
+    def company_news(self, params):
+        symbol = params.get("symbol", "").upper()
+        end = date.fromisoformat(params.get("to", str(date.today())))
+        return 200, [
+            {"category": "company", "datetime": int(time.mktime((end - timedelta(days=i)).timetuple())),
+             "headline": f"{symbol} headline {i}", "id": _seed(f"{symbol}{i}"), "related": symbol,
+             "source": "Synthetic Wire", "summary": f"Synthetic summary {i} for {symbol}.",
+             "url": f"https://news.example.com/{symbol}/{i}"}
+            for i in range(100)
+        ]
+
+
+class WikidataStandIn(JSONStandIn):
+    routes = {"/sparql": "sparql"}
+
+    def sparql(self, params):
+        """Answers the label lookups the API makes with a single synthetic binding."""
+        match = re.search(r'"([^"]+)"@en', params.get("query", ""))
+        if match is None:
+            return 200, {"head": {"vars": []}, "results": {"bindings": []}}
+        label = match.group(1)
+        entity = f"http://www.wikidata.org/entity/Q{_seed(label) % 10_000_000}"
+        row = {
+            "entity": {"type": "uri", "value": entity},
+            "item": {"type": "uri", "value": entity},
+            "itemLabel": {"type": "literal", "value": label, "xml:lang": "en"},
+            "headquartersLabel": {"type": "literal", "value": "Springfield", "xml:lang": "en"},
+            "inception": {"type": "literal", "value": "1990-01-01T00:00:00Z",
+                          "datatype": "http://www.w3.org/2001/XMLSchema#dateTime"},
+        }
+        return 200, {"head": {"vars": list(row)}, "results": {"bindings": [row]}}
+
+
+# Example Usage
+if __name__ == "__main__":
+    import requests
+
+    with FinnhubStandIn(latency=0.05) as finnhub, WikidataStandIn() as wikidata:
+        profile = requests.get(f"{finnhub.base_url}/stock/profile2", params={"symbol": "AAPL", "token": "x"}).json()
+        print(profile)
+        print(requests.get(f"{wikidata.base_url}/sparql", params={"query": f'?item rdfs:label "{profile["name"]}"@en'}).json())
@@ -1,7 +1,16 @@
-from rdflib import Graph
-from rdflib.namespace import RDF
+import os
+import sys
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from rdflib import Graph, Literal
+from rdflib.namespace import OWL, RDF, RDFS, XSD
 from rdflib.util import guess_format
 
+MAX_EXAMPLES = 10
+
 class RDFValidator:
     @staticmethod
     def validate_rdf_syntax(rdf_file):
@@ -54,15 +63,202 @@ class RDFValidator:
         except Exception as e:
             print(f"Ontology Validation Failed: {e}")
 
+class OntologyRules:
+    def __init__(self, ontology_file):
+        """
+        Precomputes the ontology's class, domain and range rules as hash lookups.
+
+        Args:
+            ontology_file (str): Path to the ontology file.
+        """
+        ontology = Graph()
+        ontology.parse(ontology_file, format=guess_format(ontology_file))
+
+        self.classes = set(ontology.subjects(RDF.type, OWL.Class)) | set(ontology.subjects(RDF.type, RDFS.Class))
+        self.domains = defaultdict(set)
+        self.ranges = defaultdict(set)
+        for prop, domain in ontology.subject_objects(RDFS.domain):
+            self.domains[prop].add(domain)
+        for prop, range_ in ontology.subject_objects(RDFS.range):
+            self.ranges[prop].add(range_)
+        # Frozen so they can key the validator's pending checks
+        self.domains = {prop: frozenset(classes) for prop, classes in self.domains.items()}
+        self.ranges = {prop: frozenset(classes) for prop, classes in self.ranges.items()}
+
+        # Every class a node belongs to once its asserted types are known.
+        parents = defaultdict(set)
+        for child, parent in ontology.subject_objects(RDFS.subClassOf):
+            parents[child].add(parent)
+        self.superclasses = {}
+        for cls in self.classes | set(parents):
+            closure, stack = {cls}, [cls]
+            while stack:
+                for parent in parents.get(stack.pop(), ()):
+                    if parent not in closure:
+                        closure.add(parent)
+                        stack.append(parent)
+            self.superclasses[cls] = frozenset(closure)
+
+    def expand(self, types):
+        expanded = set()
+        for cls in types:
+            expanded |= self.superclasses.get(cls, {cls})
+        return expanded
+
+
+@lru_cache(maxsize=None)
+def load_rules(ontology_file):
+    return OntologyRules(ontology_file)
+
+
+class _ValidatingSink(Graph):
+    """Graph stand-in that checks triples as the parser emits them instead of storing them."""
+
+    def __init__(self, rules):
+        super().__init__()
+        self.rules = rules
+        self.triples = 0
+        self.types = defaultdict(set)
+        # (rule, node, required classes) -> [triples needing it, first such triple], resolved once all types are known
+        self.pending = {}
+        self.violations = Counter()
+        self.examples = []
+
+    def violation(self, rule, triple, count=1):
+        self.violations[rule] += count
+        if len(self.examples) < MAX_EXAMPLES:
+            self.examples.append({"rule": rule, "triple": [str(term) for term in triple]})
+
+    def add(self, triple):
+        s, p, o = triple
+        rules = self.rules
+        self.triples += 1
+
+        if p == RDF.type:
+            self.types[s].add(o)
+            if o not in rules.classes:
+                self.violation("undeclared_class", triple)
+            return self
+
+        if p in rules.domains:
+            self._defer("domain", s, rules.domains[p], triple)
+
+        if p in rules.ranges:
+            if isinstance(o, Literal):
+                datatypes = {cls for cls in rules.ranges[p] if str(cls).startswith(str(XSD))}
+                if not datatypes or (o.datatype or XSD.string) not in datatypes:
+                    self.violation("range", triple)
+            else:
+                self._defer("range", o, rules.ranges[p], triple)
+        return self
+
+    def _defer(self, rule, node, required, triple):
+        entry = self.pending.get((rule, node, required))
+        if entry is None:
+            self.pending[(rule, node, required)] = [1, triple]
+        else:
+            entry[0] += 1
+
+    def resolve(self):
+        for (rule, node, required), (count, triple) in self.pending.items():
+            if not required <= self.rules.expand(self.types.get(node, ())):
+                self.violation(rule, triple, count)
+        self.pending = {}
+
+
+class StreamingRDFValidator:
+    @staticmethod
+    def validate_file(rdf_file, ontology_file):
+        """
+        Parse an RDF file once, checking syntax and ontology rules as triples stream in.
+
+        Triples are not stored. The rdf:type assertions are kept, plus one
+        pending domain/range check per (rule, node, required classes) with a
+        count and an example triple, since types may be asserted after use.
+
+        Args:
+            rdf_file (str): Path to the RDF file (N-Triples, Turtle, ...).
+            ontology_file (str): Path to the ontology file.
+
+        Returns:
+            dict: Report with triple count, throughput and violation counts.
+        """
+        sink = _ValidatingSink(load_rules(os.path.abspath(ontology_file)))
+        start = time.perf_counter()
+        report = {"file": rdf_file, "syntax_valid": True}
+
+        try:
+            sink.parse(rdf_file, format=guess_format(rdf_file) or "turtle")
+        except Exception as e:
+            report["syntax_valid"] = False
+            report["syntax_error"] = str(e)
+        sink.resolve()
+
+        seconds = time.perf_counter() - start
+        report.update({
+            "triples": sink.triples,
+            "seconds": round(seconds, 3),
+            "triples_per_second": round(sink.triples / seconds, 1) if seconds > 0 else None,
+            "violations": dict(sink.violations),
+            "violation_count": sum(sink.violations.values()),
+            "examples": sink.examples,
+        })
+        return report
+
+    @staticmethod
+    def validate_files(rdf_files, ontology_file, max_workers=None):
+        """
+        Validate many RDF files in parallel across a process pool.
+
+        Args:
+            rdf_files (list): Paths to RDF files.
+            ontology_file (str): Path to the ontology file.
+            max_workers (int): Number of worker processes (defaults to CPU count).
+
+        Returns:
+            dict: Per-file reports plus totals.
+        """
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            reports = list(executor.map(
+                StreamingRDFValidator.validate_file, rdf_files, [ontology_file] * len(rdf_files)
+            ))
+
+        seconds = time.perf_counter() - start
+        triples = sum(report["triples"] for report in reports)
+        violations = Counter()
+        for report in reports:
+            violations.update(report["violations"])
+
+        return {
+            "files": reports,
+            "file_count": len(reports),
+            "invalid_syntax": [report["file"] for report in reports if not report["syntax_valid"]],
+            "triples": triples,
+            "seconds": round(seconds, 3),
+            "triples_per_second": round(triples / seconds, 1) if seconds > 0 else None,
+            "violations": dict(violations),
+        }
+
 # Example Usage
 if __name__ == "__main__":
-    rdf_file = "VilCorpInvestingOntology_data.rdf"
-    ontology_file = "vilcorp_ontology.rdf"
+    rdf_dir = sys.argv[1] if len(sys.argv) > 1 else "rdf_data"
+    ontology_file = sys.argv[2] if len(sys.argv) > 2 else "ontology/financial_ontology.ttl"
 
-    validator = RDFValidator()
-    validator.validate_rdf_syntax(rdf_file)
+    rdf_files = sorted(
+        os.path.join(rdf_dir, name) for name in os.listdir(rdf_dir)
+        if name.endswith((".ttl", ".nt"))
+    )
+    summary = StreamingRDFValidator.validate_files(rdf_files, ontology_file)
 
-    graph = Graph()
-    graph.parse(rdf_file, format=guess_format(rdf_file))
+    for report in summary["files"]:
+        status = "OK" if report["syntax_valid"] and not report["violation_count"] else "ISSUES"
+        print(f"{status}: {report['file']} ({report['triples']} triples, "
+              f"{report['triples_per_second']} triples/s) {report['violations']}")
+        if not report["syntax_valid"]:
+            print(f"  Syntax error: {report['syntax_error']}")
 
-    validator.validate_ontology_alignment(graph, ontology_file)
\ No newline at end of file
+    print(f"\nValidated {summary['file_count']} files, {summary['triples']} triples in "
+          f"{summary['seconds']}s ({summary['triples_per_second']} triples/s)")
+    print("Violations:", summary["violations"] or "none")
+    sys.exit(1 if summary["invalid_syntax"] or summary["violations"] else 0)